@@ -0,0 +1,238 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from functools import wraps
+
+from ai.metrics import QUEUE_WAIT_SECONDS
+
+# Lane name -> (concurrent requests, queued requests, queue deadline in ms)
+LANE_DEFAULTS = {
+    'interactive': (8, 32, 15000),
+    'batch': (4, 64, 60000),
+    'deterministic': (32, 128, 2000)
+}
+
+# Bounds for the Retry-After hint, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+
+class AdmissionRejected(Exception):
+    def __init__(self, lane, status, reason, retry_after):
+        """Raised instead of queueing: 429 when the lane's queue is full, 503 when the deadline passed"""
+        super().__init__(f"{lane} lane rejected request: {reason}")
+        self.lane = lane
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def payload(self):
+        return {
+            'success': False,
+            'error': 'AI service overloaded, retry later',
+            'lane': self.lane,
+            'reason': self.reason,
+            'retry_after': self.retry_after
+        }
+
+class Ticket:
+    def __init__(self, lane):
+        """A held lane slot; release it exactly once (extra calls are ignored)"""
+        self.lane = lane
+        self.started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self.lane._release(time.monotonic() - self.started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class Lane:
+    def __init__(self, name, max_concurrent, max_queue, deadline_ms):
+        """A bounded pool of slots with a bounded FIFO queue in front of it
+
+        Waiters are plain futures, so threads (Flask) and coroutines (ASGI)
+        queue in the same line. A released slot is handed straight to the
+        oldest waiter; a request that cannot get a slot within the deadline
+        is rejected rather than served late.
+        """
+        self.name = name
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queue = max(0, int(max_queue))
+        self.deadline = max(0.0, float(deadline_ms)) / 1000.0
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()
+        self._waits = deque(maxlen=1024)
+        self._service_time = None
+        self._stats = {'admitted': 0, 'completed': 0, 'rejected_queue_full': 0, 'rejected_deadline': 0}
+
+    def _enter(self):
+        """A future resolved once the request holds a slot (already resolved when one is free)"""
+        future = Future()
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                self._stats['admitted'] += 1
+                self._waits.append(0.0)
+                QUEUE_WAIT_SECONDS.observe(0.0, queue=f'lane_{self.name}')
+                future.set_result(True)
+                return future, time.monotonic()
+            if len(self._waiters) >= self.max_queue:
+                self._stats['rejected_queue_full'] += 1
+                raise AdmissionRejected(self.name, 429, 'queue full', self._retry_after_locked())
+            self._waiters.append(future)
+        return future, time.monotonic()
+
+    def _abandon(self, future, queued_at):
+        """Deadline passed: leave the queue, unless the slot arrived in the meantime"""
+        with self._lock:
+            if not future.done():
+                self._waiters.remove(future)
+                self._stats['rejected_deadline'] += 1
+                raise AdmissionRejected(self.name, 503, 'queue deadline exceeded', self._retry_after_locked())
+        return self._admitted(queued_at)
+
+    def _cancel(self, future):
+        """The waiter went away (e.g. the client disconnected): leave the queue, or pass on a slot it was given"""
+        with self._lock:
+            if not future.done():
+                self._waiters.remove(future)
+            else:
+                self._hand_off_locked()
+
+    def _admitted(self, queued_at):
+        wait = time.monotonic() - queued_at
+        with self._lock:
+            self._stats['admitted'] += 1
+            self._waits.append(wait)
+        QUEUE_WAIT_SECONDS.observe(wait, queue=f'lane_{self.name}')
+        return Ticket(self)
+
+    def acquire(self):
+        """Block the calling thread until a slot is free; returns a Ticket or raises AdmissionRejected"""
+        future, queued_at = self._enter()
+        if future.done():
+            return Ticket(self)
+        try:
+            future.result(timeout=self.deadline)
+        except FutureTimeoutError:
+            return self._abandon(future, queued_at)
+        return self._admitted(queued_at)
+
+    async def acquire_async(self):
+        """Coroutine version of acquire() that waits without holding a thread"""
+        future, queued_at = self._enter()
+        if future.done():
+            return Ticket(self)
+        try:
+            # shield keeps the timeout from cancelling the slot future itself
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.deadline)
+        except asyncio.TimeoutError:
+            return self._abandon(future, queued_at)
+        except asyncio.CancelledError:
+            self._cancel(future)
+            raise
+        return self._admitted(queued_at)
+
+    def _release(self, duration):
+        with self._lock:
+            self._stats['completed'] += 1
+            if self._service_time is None:
+                self._service_time = duration
+            else:
+                self._service_time = 0.8 * self._service_time + 0.2 * duration
+            self._hand_off_locked()
+
+    def _hand_off_locked(self):
+        if self._waiters:
+            # Hand the slot over directly so nobody can jump the queue
+            self._waiters.popleft().set_result(True)
+        else:
+            self._active -= 1
+
+    def _retry_after_locked(self):
+        """Seconds until the queue ahead would drain at the recent service rate"""
+        service_time = self._service_time if self._service_time is not None else self.deadline
+        estimate = (len(self._waiters) + 1) * service_time / self.max_concurrent
+        return int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(estimate))))
+
+    def stats(self):
+        """Queue depth, in-flight count, rejections and recent queue wait times"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._active
+            stats['queue_depth'] = len(self._waiters)
+            waits = sorted(self._waits)
+            service_time = self._service_time
+        stats['wait_ms'] = {
+            'avg': round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+            'p95': round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+            'max': round(1000 * waits[-1], 2) if waits else 0.0
+        }
+        stats['service_ms_avg'] = round(1000 * service_time, 2) if service_time is not None else None
+        stats['limits'] = {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'deadline_ms': self.deadline * 1000.0
+        }
+        return stats
+
+class AdmissionController:
+    def __init__(self, lanes=None):
+        """Priority lanes for the AI service: interactive chat, batch analytics and deterministic calculators
+
+        Each lane owns its slots, so a pile-up of generation requests can
+        only exhaust its own lane: calculators and interactive chat keep
+        their capacity while batch work waits or is shed. Limits come from
+        AI_LANE_<NAME>_CONCURRENCY, AI_LANE_<NAME>_QUEUE and
+        AI_LANE_<NAME>_DEADLINE_MS unless passed in as
+        {name: (concurrency, queue, deadline_ms)}.
+        """
+        if lanes is None:
+            lanes = {}
+            for name, (concurrency, queue_size, deadline_ms) in LANE_DEFAULTS.items():
+                prefix = f'AI_LANE_{name.upper()}_'
+                lanes[name] = (
+                    int(os.getenv(prefix + 'CONCURRENCY', str(concurrency))),
+                    int(os.getenv(prefix + 'QUEUE', str(queue_size))),
+                    float(os.getenv(prefix + 'DEADLINE_MS', str(deadline_ms)))
+                )
+        self.lanes = {name: Lane(name, *limits) for name, limits in lanes.items()}
+
+    def lane(self, name):
+        if name not in self.lanes:
+            raise ValueError(f"Unknown admission lane '{name}', expected one of {', '.join(self.lanes)}")
+        return self.lanes[name]
+
+    def acquire(self, name):
+        return self.lane(name).acquire()
+
+    async def acquire_async(self, name):
+        return await self.lane(name).acquire_async()
+
+    def admitted(self, name):
+        """Decorator holding a slot in the named lane for the duration of a (non-streaming) view"""
+        self.lane(name)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                with self.lane(name).acquire():
+                    return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        return {name: lane.stats() for name, lane in self.lanes.items()}
@@ -0,0 +1,219 @@
+import bisect
+
+import numpy as np
+
+# Investment profile per age band: display text for the templates and stable codes for structured results
+TIME_HORIZONS = ('long-term', 'medium-term', 'shorter-term')
+RISK_RECOMMENDATIONS = ('higher risk tolerance', 'moderate risk tolerance', 'lower risk tolerance')
+TIME_HORIZON_CODES = ('long_term', 'medium_term', 'shorter_term')
+RISK_PROFILE_CODES = ('higher', 'moderate', 'lower')
+# Ages at which the investment profile moves to the next horizon/risk code
+PROFILE_AGE_BOUNDS = (30, 50)
+
+# Savings rate (%) the budget analysis measures against
+TARGET_SAVINGS_RATE = 20
+
+# Insight codes of each structured result, in the order the text presents them
+INSIGHT_CODES = {
+    'plan_achievable': ('automatic_transfers', 'track_progress_weekly', 'celebrate_milestones'),
+    'plan_too_aggressive': ('extend_timeline', 'reduce_goal'),
+    'budget_below_target': ('track_expenses_30_days', 'cut_non_essentials', 'rule_50_30_20'),
+    'budget_on_target': ('grow_emergency_fund', 'invest_for_retirement', 'save_for_more_goals', 'treat_yourself'),
+    'investment_guidance': ('index_funds', 'consider_time_horizon', 'keep_short_term_money_out',
+                            'emergency_fund_first', 'general_advice_disclaimer')
+}
+
+def _savings_plan_too_aggressive_text(goal_amount, timeline_months, monthly_savings_needed, available_for_savings,
+                                      adjusted_timeline):
+    return f"""
+🎯 Your Savings Goal: ${goal_amount:,}
+⏰ Original Timeline: {timeline_months} months
+💰 Monthly Savings Needed: ${monthly_savings_needed:,.2f}
+💸 Available Monthly: ${available_for_savings:,.2f}
+
+⚠️ This goal is too aggressive for your current budget.
+💡 Recommended Timeline: {adjusted_timeline:.1f} months
+💡 Alternative: Reduce goal to ${(available_for_savings * timeline_months):,.2f}
+
+Would you like me to help you adjust your goal or create a more realistic timeline?
+"""
+
+def _savings_plan_achievable_text(goal_amount, timeline_months, monthly_savings_needed, available_for_savings):
+    return f"""
+🎯 Your Savings Goal: ${goal_amount:,}
+⏰ Timeline: {timeline_months} months
+💰 Monthly Savings Needed: ${monthly_savings_needed:,.2f}
+💸 Available Monthly: ${available_for_savings:,.2f}
+
+✅ This goal is achievable! Here's your plan:
+
+📅 Monthly Savings: ${monthly_savings_needed:,.2f}
+💪 Extra Available: ${available_for_savings - monthly_savings_needed:,.2f}
+🎉 You'll reach your goal in {timeline_months} months!
+
+💡 Tips:
+- Set up automatic transfers on payday
+- Track your progress weekly
+- Celebrate small milestones
+"""
+
+def _budget_below_target_text(income, total_expenses, savings_rate):
+    return f"""
+📊 Budget Analysis:
+💰 Monthly Income: ${income:,.2f}
+💸 Monthly Expenses: ${total_expenses:,.2f}
+💾 Current Savings Rate: {savings_rate:.1f}%
+
+⚠️ Your savings rate is below the recommended 20%.
+
+💡 Recommendations:
+1. Track all expenses for 30 days
+2. Identify non-essential spending
+3. Use the 50/30/20 rule:
+   - 50% for needs (rent, food, utilities)
+   - 30% for wants (entertainment, shopping)
+   - 20% for savings and debt repayment
+
+🎯 Target: Increase savings to ${income * 0.2:,.2f} per month
+"""
+
+def _budget_on_target_text(income, total_expenses, savings_rate):
+    return f"""
+📊 Budget Analysis:
+💰 Monthly Income: ${income:,.2f}
+💸 Monthly Expenses: ${total_expenses:,.2f}
+💾 Current Savings Rate: {savings_rate:.1f}%
+
+🎉 Excellent! You're saving above the recommended 20%.
+
+💡 You could:
+- Increase emergency fund
+- Invest in retirement accounts
+- Save for additional goals
+- Treat yourself (you've earned it!)
+"""
+
+def _investment_guidance_text(age, time_horizon, risk_recommendation, investment_amount):
+    return f"""
+📈 Investment Guidance for Age {age}:
+⏰ Time Horizon: {time_horizon}
+🎯 Risk Profile: {risk_recommendation}
+💰 Investment Amount: ${investment_amount:,.2f}
+
+💡 Recommendations:
+- Start with index funds (low fees, diversified)
+- Consider your time horizon: {time_horizon}
+- Don't invest money you'll need in 3-5 years
+- Emergency fund first, then invest
+
+⚠️ Disclaimer: This is general advice. Consider consulting a financial advisor for personalized guidance.
+"""
+
+def render_savings_plan(goal_amount, timeline_months, monthly_income, monthly_expenses):
+    """The savings plan text for one scenario"""
+    monthly_savings_needed = goal_amount / timeline_months
+    available_for_savings = monthly_income - monthly_expenses
+    if monthly_savings_needed > available_for_savings:
+        # Goal is too aggressive
+        return _savings_plan_too_aggressive_text(
+            goal_amount, timeline_months, monthly_savings_needed, available_for_savings,
+            goal_amount / available_for_savings
+        )
+    return _savings_plan_achievable_text(goal_amount, timeline_months, monthly_savings_needed, available_for_savings)
+
+def render_budget_advice(income, total_expenses):
+    """The budget analysis text for an income and its total expenses"""
+    savings_rate = ((income - total_expenses) / income) * 100
+    if savings_rate < TARGET_SAVINGS_RATE:
+        return _budget_below_target_text(income, total_expenses, savings_rate)
+    return _budget_on_target_text(income, total_expenses, savings_rate)
+
+def profile_code(age):
+    """Index into TIME_HORIZONS/RISK_RECOMMENDATIONS for an array of ages"""
+    return np.searchsorted(PROFILE_AGE_BOUNDS, age, side='right')
+
+def render_investment_guidance(age, investment_amount):
+    """The investment guidance text for one scenario"""
+    code = bisect.bisect_right(PROFILE_AGE_BOUNDS, age)
+    return _investment_guidance_text(age, TIME_HORIZONS[code], RISK_RECOMMENDATIONS[code], investment_amount)
+
+def savings_plan_result(goal_amount, timeline_months, monthly_income, monthly_expenses):
+    """Structured savings plan: typed amounts, a status and insight codes instead of prose
+
+    Amounts are rounded to the precision the text shows; the inputs are
+    kept as given so render_result reproduces the text exactly.
+    """
+    monthly_savings_needed = goal_amount / timeline_months
+    available_for_savings = monthly_income - monthly_expenses
+    result = {
+        'type': 'savings_plan',
+        'goal_amount': goal_amount,
+        'timeline_months': timeline_months,
+        'monthly_income': monthly_income,
+        'monthly_expenses': monthly_expenses,
+        'monthly_savings_needed': round(monthly_savings_needed, 2),
+        'available_for_savings': round(available_for_savings, 2),
+        'extra_available': None,
+        'recommended_timeline_months': None,
+        'reduced_goal': None
+    }
+    if available_for_savings <= 0:
+        # Nothing left over each month, so no timeline reaches the goal
+        result.update(status='no_capacity', insights=[])
+    elif monthly_savings_needed > available_for_savings:
+        result.update(
+            status='too_aggressive',
+            recommended_timeline_months=round(goal_amount / available_for_savings, 1),
+            reduced_goal=round(available_for_savings * timeline_months, 2),
+            insights=list(INSIGHT_CODES['plan_too_aggressive'])
+        )
+    else:
+        result.update(
+            status='achievable',
+            extra_available=round(available_for_savings - monthly_savings_needed, 2),
+            insights=list(INSIGHT_CODES['plan_achievable'])
+        )
+    return result
+
+def budget_advice_result(income, expenses):
+    """Structured budget analysis: totals, savings rate against the target and insight codes"""
+    total_expenses = sum(expenses.values())
+    savings_rate = ((income - total_expenses) / income) * 100
+    below_target = savings_rate < TARGET_SAVINGS_RATE
+    return {
+        'type': 'budget_analysis',
+        'status': 'below_target' if below_target else 'on_target',
+        'income': income,
+        'total_expenses': total_expenses,
+        'savings_rate': round(savings_rate, 1),
+        'target_savings_rate': TARGET_SAVINGS_RATE,
+        'target_monthly_savings': round(income * TARGET_SAVINGS_RATE / 100, 2) if below_target else None,
+        'insights': list(INSIGHT_CODES['budget_below_target' if below_target else 'budget_on_target'])
+    }
+
+def investment_advice_result(age, investment_amount):
+    """Structured investment guidance: horizon and risk profile codes for the age band"""
+    code = bisect.bisect_right(PROFILE_AGE_BOUNDS, age)
+    return {
+        'type': 'investment_guidance',
+        'age': age,
+        'investment_amount': investment_amount,
+        'time_horizon': TIME_HORIZON_CODES[code],
+        'risk_profile': RISK_PROFILE_CODES[code],
+        'insights': list(INSIGHT_CODES['investment_guidance'])
+    }
+
+def render_result(result):
+    """Text for a structured result, rendered only when asked for (None when there is no text to show)"""
+    kind = result['type']
+    if kind == 'savings_plan':
+        if result['status'] == 'no_capacity':
+            return None
+        return render_savings_plan(
+            result['goal_amount'], result['timeline_months'], result['monthly_income'], result['monthly_expenses']
+        )
+    if kind == 'budget_analysis':
+        return render_budget_advice(result['income'], result['total_expenses'])
+    if kind == 'investment_guidance':
+        return render_investment_guidance(result['age'], result['investment_amount'])
+    raise ValueError(f"Unknown result type '{kind}'")
@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from ai.metrics import QUEUE_WAIT_SECONDS
+
+class BatchScheduler:
+    def __init__(self, process_batch, max_batch_size=8, max_wait_ms=10):
+        """Queue generation requests and run them through process_batch in dynamic batches
+
+        process_batch receives a list of submitted items and must return one
+        result per item, in the same order.
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._stats = {'requests': 0, 'batches': 0, 'largest_batch': 0}
+
+        self._worker = threading.Thread(target=self._run, name='advisor-batch-scheduler', daemon=True)
+        self._worker.start()
+
+    def submit(self, item):
+        """Enqueue one item and return a Future resolved with its own result"""
+        if self._stopped:
+            raise RuntimeError("Batch scheduler has been shut down")
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def run(self, item, timeout=None):
+        """Submit an item and block until its result is ready"""
+        return self.submit(item).result(timeout=timeout)
+
+    def stats(self):
+        """Counters describing how requests have been grouped so far"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        stats['average_batch_size'] = round(stats['requests'] / stats['batches'], 2) if stats['batches'] else 0
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = self.max_wait * 1000.0
+        return stats
+
+    def shutdown(self):
+        """Stop accepting work and let the worker drain the queue"""
+        self._stopped = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect_batch(self, first):
+        """Gather queued requests until the batch is full or the wait deadline passes"""
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Keep the shutdown sentinel for the main loop
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect_batch(first)
+            items = [item for item, _, _ in batch]
+            futures = [future for _, future, _ in batch]
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                QUEUE_WAIT_SECONDS.observe(started - enqueued, queue='batch_scheduler')
+
+            with self._lock:
+                self._stats['requests'] += len(batch)
+                self._stats['batches'] += 1
+                self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+
+            try:
+                results = self.process_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"Batch returned {len(results)} results for {len(items)} requests")
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
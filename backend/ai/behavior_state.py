@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+# Fields that identify a goal across events, in order of preference
+GOAL_ID_FIELDS = ('goalId', 'goal_id', '_id', 'id')
+TIMESTAMP_FIELDS = ('timestamp', 'createdAt', 'date')
+
+# Range of epoch seconds parse_timestamp accepts: 0001-01-01 to 9999-12-31 UTC
+MIN_EPOCH_SECONDS = datetime(1, 1, 1, tzinfo=timezone.utc).timestamp()
+MAX_EPOCH_SECONDS = datetime(9999, 12, 31, tzinfo=timezone.utc).timestamp()
+
+# Most events a single incremental update may carry
+MAX_DELTA_EVENTS = int(os.getenv('AI_BEHAVIOR_MAX_DELTA_EVENTS', '100000'))
+
+def read_events(events, limit=MAX_DELTA_EVENTS):
+    """Materialize an event iterable (e.g. a streamed request body) before any lock is taken"""
+    collected = []
+    for event in events or ():
+        if len(collected) >= limit:
+            raise ValueError(f"At most {limit} events per update")
+        collected.append(event)
+    return collected
+
+def parse_timestamp(value):
+    """Epoch seconds for an event timestamp, or None when it cannot be read
+
+    Accepts ISO-8601 strings (with or without a Z/offset; naive ones are
+    taken as UTC), datetimes, and epoch numbers in seconds or, past the
+    year 5000, milliseconds as JavaScript sends them.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            value = float(value)
+        except ValueError:
+            try:
+                value = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith(('Z', 'z')) else value)
+            except ValueError:
+                return None
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if abs(value) > 1e11 else float(value)
+        # Only times a datetime can show (years 1-9999); also rules out NaN
+        return seconds if MIN_EPOCH_SECONDS <= seconds <= MAX_EPOCH_SECONDS else None
+    return None
+
+class BehaviorState:
+    def __init__(self, user_id=None):
+        """Compact per-user aggregate of behavioral history, updated one delta at a time
+
+        Goals that carry an id keep only their latest status, so re-sending a
+        goal when it completes moves it from active to completed. Goals without
+        an id are tallied per event, as the full-history analysis does.
+        Status tallies are kept as events arrive, so applying a delta and
+        summarizing cost O(delta), not O(goals).
+        """
+        self.user_id = user_id
+        self.version = 0
+        self.events = 0
+        self.contributions = 0
+        self.goal_statuses = {}
+        self.anonymous_goals = {}
+        # Goals with an id per status and the number of goals without one, kept in
+        # step with goal_statuses/anonymous_goals so summary() never iterates them
+        self._status_counts = {}
+        self._anonymous_goal_count = 0
+        # Latest event time per event type, as UTC ISO strings and as epoch seconds for comparing
+        self.last_seen = {}
+        self._last_seen_at = {}
+
+    def apply(self, events):
+        """Fold new events into the state in one pass; returns how many were applied"""
+        applied = 0
+        for event in events or ():
+            applied += 1
+            event_type = event.get('type')
+            if event_type == 'contribution':
+                self.contributions += 1
+            elif event_type == 'goal':
+                goal_id = next((event[field] for field in GOAL_ID_FIELDS if event.get(field) is not None), None)
+                status = event.get('status')
+                key = status if isinstance(status, str) else ''
+                if goal_id is None:
+                    self.anonymous_goals[key] = self.anonymous_goals.get(key, 0) + 1
+                    self._anonymous_goal_count += 1
+                else:
+                    self._set_goal_status(str(goal_id), key)
+
+            timestamp = next((event[field] for field in TIMESTAMP_FIELDS if event.get(field)), None)
+            seen_at = parse_timestamp(timestamp) if timestamp else None
+            self._see(str(event_type), time.time() if seen_at is None else seen_at)
+
+        if applied:
+            self.events += applied
+            self.version += 1
+        return applied
+
+    def _set_goal_status(self, goal_id, status):
+        previous = self.goal_statuses.get(goal_id)
+        if previous == status:
+            return
+        if previous is not None:
+            self._status_counts[previous] -= 1
+        self.goal_statuses[goal_id] = status
+        self._status_counts[status] = self._status_counts.get(status, 0) + 1
+
+    def _see(self, event_type, seen_at):
+        if seen_at > self._last_seen_at.get(event_type, float('-inf')):
+            self._last_seen_at[event_type] = seen_at
+            self.last_seen[event_type] = datetime.fromtimestamp(seen_at, timezone.utc).isoformat()
+
+    def summary(self):
+        """Counters in the shape BehavioralAnalyzer._summarizeHistory produces"""
+        return {
+            'events': self.events,
+            'contributions': self.contributions,
+            'goals': len(self.goal_statuses) + self._anonymous_goal_count,
+            'active_goals': self._status_counts.get('active', 0) + self.anonymous_goals.get('active', 0),
+            'completed_goals': self._status_counts.get('completed', 0) + self.anonymous_goals.get('completed', 0)
+        }
+
+    def snapshot(self):
+        """JSON-serializable copy of the state"""
+        return {
+            'user_id': self.user_id,
+            'version': self.version,
+            'events': self.events,
+            'contributions': self.contributions,
+            'goal_statuses': dict(self.goal_statuses),
+            'anonymous_goals': dict(self.anonymous_goals),
+            'last_seen': dict(self.last_seen)
+        }
+
+    @classmethod
+    def restore(cls, snapshot):
+        """Rebuild a state from snapshot()"""
+        state = cls(snapshot.get('user_id'))
+        state.version = int(snapshot.get('version', 0))
+        state.events = int(snapshot.get('events', 0))
+        state.contributions = int(snapshot.get('contributions', 0))
+        for goal_id, status in (snapshot.get('goal_statuses') or {}).items():
+            state._set_goal_status(str(goal_id), status if isinstance(status, str) else '')
+        state.anonymous_goals = dict(snapshot.get('anonymous_goals') or {})
+        state._anonymous_goal_count = sum(state.anonymous_goals.values())
+        for event_type, timestamp in (snapshot.get('last_seen') or {}).items():
+            seen_at = parse_timestamp(timestamp)
+            if seen_at is not None:
+                state._see(str(event_type), seen_at)
+        return state
+
+class InMemoryStateStore:
+    def __init__(self):
+        """Behavior states kept as live objects in this process, updated in place"""
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def load(self, user_id):
+        """A copy of the user's state, safe to read while updates continue"""
+        with self._lock:
+            state = self._states.get(str(user_id))
+            snapshot = state.snapshot() if state else None
+        return BehaviorState.restore(snapshot) if snapshot else BehaviorState(user_id)
+
+    def save(self, state):
+        state = BehaviorState.restore(state.snapshot())
+        with self._lock:
+            self._states[str(state.user_id)] = state
+
+    def update(self, user_id, events):
+        """Apply events to a user's state atomically and return the new state
+
+        The returned state is the stored object; its summary() and version
+        only read counters, so they can be used after the lock is released.
+        """
+        # Read a streamed body first, so a slow upload does not hold the lock
+        events = read_events(events)
+        with self._lock:
+            state = self._states.get(str(user_id))
+            if state is None:
+                state = self._states[str(user_id)] = BehaviorState(user_id)
+            state.apply(events)
+        return state
+
+    def delete(self, user_id):
+        with self._lock:
+            self._states.pop(str(user_id), None)
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memory', 'users': len(self._states)}
+
+class SQLiteStateStore:
+    def __init__(self, path=None):
+        """Behavior states persisted in a local SQLite file, shared by every worker process
+
+        Updates run inside an immediate transaction, so concurrent deltas for
+        the same user from different processes are applied one after another.
+        """
+        self.path = path or os.path.join(tempfile.gettempdir(), 'loopfund-behavior-state.sqlite')
+        self._local = threading.local()
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS behavior_state ("
+            "user_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+
+    def _connection(self):
+        """Per-thread connection, reopened after a fork"""
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _read(self, db, user_id):
+        row = db.execute("SELECT state FROM behavior_state WHERE user_id = ?", (str(user_id),)).fetchone()
+        return BehaviorState.restore(json.loads(row[0])) if row else BehaviorState(user_id)
+
+    def _write(self, db, state):
+        db.execute(
+            "INSERT OR REPLACE INTO behavior_state (user_id, state, updated_at) VALUES (?, ?, ?)",
+            (str(state.user_id), json.dumps(state.snapshot()), datetime.now().isoformat())
+        )
+
+    def load(self, user_id):
+        return self._read(self._connection(), user_id)
+
+    def save(self, state):
+        self._write(self._connection(), state)
+
+    def update(self, user_id, events):
+        """Apply events to a user's state atomically and return the new state"""
+        # Read a streamed body first, so a slow upload does not hold the write transaction
+        events = read_events(events)
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            state = self._read(db, user_id)
+            state.apply(events)
+            self._write(db, state)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return state
+
+    def delete(self, user_id):
+        self._connection().execute("DELETE FROM behavior_state WHERE user_id = ?", (str(user_id),))
+
+    def stats(self):
+        users = self._connection().execute("SELECT COUNT(*) FROM behavior_state").fetchone()[0]
+        return {'backend': 'sqlite', 'users': users, 'path': self.path}
+
+def create_state_store():
+    """Build the store selected by AI_BEHAVIOR_STORE (memory or sqlite)"""
+    if os.getenv('AI_BEHAVIOR_STORE', 'memory').lower() == 'sqlite':
+        return SQLiteStateStore(os.getenv('AI_BEHAVIOR_STORE_PATH'))
+    return InMemoryStateStore()
@@ -2,52 +2,99 @@ import json
 import re
 from datetime import datetime, timedelta
 
+from ai.behavior_state import BehaviorState, create_state_store
+from ai.keyword_matcher import KeywordMatcher
+from ai.metrics import ERRORS, timed
+
+# Component label for this module's stage metrics
+COMPONENT = 'behavioral_analyzer'
+
+# Keyword categories scanned in a single pass by _analyzeSpendingPatterns
+SPENDING_MATCHER = KeywordMatcher({
+    'spending': ['spend', 'bought', 'purchase', 'expense', 'cost', 'price', 'shopping'],
+    'saving': ['save', 'budget', 'cut', 'reduce', 'limit'],
+    'emotional': ['stress', 'bored', 'sad', 'excited', 'impulse', 'treat'],
+    'budget_awareness': ['budget', 'plan', 'track']
+})
+
 class BehavioralAnalyzer:
-    def __init__(self):
+    def __init__(self, state_store=None):
         """Initialize the AI Behavioral Analyzer"""
+        self.state_store = state_store or create_state_store()
         print("✅ AI Behavioral Analyzer initialized successfully!")
     
     def analyze(self, userText, userHistory):
         """Analyze user behavior patterns and provide insights"""
         try:
-            # Analyze spending patterns from text
-            spending_insights = self._analyzeSpendingPatterns(userText)
-            
-            # Analyze savings behavior
-            savings_insights = self._analyzeSavingsBehavior(userHistory)
-            
-            # Generate behavioral recommendations
-            recommendations = self._generateRecommendations(spending_insights, savings_insights)
+            with timed(COMPONENT, 'history_summary'):
+                summary = self._summarizeHistory(userHistory)
+            return self._buildAnalysis(userText, summary)
             
+        except Exception as e:
+            ERRORS.inc(component=COMPONENT)
             return {
-                "success": True,
-                "analysis": {
-                    "spending_patterns": spending_insights,
-                    "savings_behavior": savings_insights,
-                    "recommendations": recommendations,
-                    "timestamp": datetime.now().isoformat()
-                }
+                "success": False,
+                "error": f"Error analyzing behavior: {str(e)}"
             }
+    
+    def analyzeIncremental(self, userId, userText, newEvents=None):
+        """Analyze a user from their stored behavior state after applying only the new events"""
+        try:
+            with timed(COMPONENT, 'state_update'):
+                state = self.state_store.update(userId, newEvents)
+            result = self._buildAnalysis(userText, state.summary())
+            result["analysis"]["state_version"] = state.version
+            return result
             
         except Exception as e:
+            ERRORS.inc(component=COMPONENT)
             return {
                 "success": False,
                 "error": f"Error analyzing behavior: {str(e)}"
             }
     
+    def snapshotState(self, userId):
+        """Serializable behavior state for a user"""
+        return self.state_store.load(userId).snapshot()
+    
+    def restoreState(self, snapshot):
+        """Replace a user's behavior state with a snapshot"""
+        self.state_store.save(BehaviorState.restore(snapshot))
+    
+    def _buildAnalysis(self, userText, historySummary):
+        """Full analysis response from user text and a history summary"""
+        # Analyze spending patterns from text
+        with timed(COMPONENT, 'spending_patterns'):
+            spending_insights = self._analyzeSpendingPatterns(userText)
+        
+        # Analyze savings behavior
+        with timed(COMPONENT, 'savings_behavior'):
+            savings_insights = self._savingsInsights(historySummary)
+        
+        # Generate behavioral recommendations
+        with timed(COMPONENT, 'recommendations'):
+            recommendations = self._generateRecommendations(spending_insights, savings_insights)
+        
+        return {
+            "success": True,
+            "analysis": {
+                "spending_patterns": spending_insights,
+                "savings_behavior": savings_insights,
+                "recommendations": recommendations,
+                "timestamp": datetime.now().isoformat()
+            }
+        }
+    
     def _analyzeSpendingPatterns(self, userText):
         """Analyze spending patterns from user text"""
         insights = []
         
-        # Look for spending-related keywords
-        spending_keywords = ['spend', 'bought', 'purchase', 'expense', 'cost', 'price', 'shopping']
-        saving_keywords = ['save', 'budget', 'cut', 'reduce', 'limit']
-        
-        text_lower = userText.lower()
+        # Count distinct keywords per category (whole words, one pass over the text)
+        counts = SPENDING_MATCHER.count(userText, distinct=True)
         
         # Analyze spending vs saving language
-        spending_count = sum(1 for word in spending_keywords if word in text_lower)
-        saving_count = sum(1 for word in saving_keywords if word in text_lower)
+        spending_count = counts['spending']
+        saving_count = counts['saving']
         
         if spending_count > saving_count:
             insights.append("💸 Your language suggests a spending-focused mindset")
@@ -59,54 +106,67 @@ class BehavioralAnalyzer:
             insights.append("⚖️ Balanced approach to spending and saving")
         
         # Look for emotional spending indicators
-        emotional_words = ['stress', 'bored', 'sad', 'excited', 'impulse', 'treat']
-        emotional_count = sum(1 for word in emotional_words if word in text_lower)
-        
-        if emotional_count > 0:
+        if counts['emotional'] > 0:
             insights.append("😊 Be mindful of emotional spending triggers")
             insights.append("💡 Try the 24-hour rule for non-essential purchases")
         
         # Look for budget awareness
-        if any(word in text_lower for word in ['budget', 'plan', 'track']):
+        if counts['budget_awareness'] > 0:
             insights.append("📊 You're showing good budget awareness")
         else:
             insights.append("📝 Consider tracking your spending to identify patterns")
         
         return insights
     
+    def _summarizeHistory(self, userHistory):
+        """Count contributions and goal statuses in one pass over any iterable of history events"""
+        summary = {'events': 0, 'contributions': 0, 'goals': 0, 'active_goals': 0, 'completed_goals': 0}
+        
+        for event in userHistory or ():
+            summary['events'] += 1
+            event_type = event.get('type')
+            if event_type == 'contribution':
+                summary['contributions'] += 1
+            elif event_type == 'goal':
+                summary['goals'] += 1
+                status = event.get('status')
+                if status == 'active':
+                    summary['active_goals'] += 1
+                elif status == 'completed':
+                    summary['completed_goals'] += 1
+        
+        return summary
+    
     def _analyzeSavingsBehavior(self, userHistory):
-        """Analyze savings behavior from user history"""
+        """Analyze savings behavior from user history (a list, generator or NDJSON stream of events)"""
+        return self._savingsInsights(self._summarizeHistory(userHistory))
+    
+    def _savingsInsights(self, summary):
+        """Savings behavior insights from a history summary"""
         insights = []
         
-        if not userHistory or len(userHistory) == 0:
+        if summary['events'] == 0:
             insights.append("🆕 Welcome! Let's start building your savings habits")
             return insights
         
         # Analyze contribution frequency
-        recent_contributions = [h for h in userHistory if h.get('type') == 'contribution']
-        
-        if len(recent_contributions) >= 3:
+        if summary['contributions'] >= 3:
             insights.append("🎯 Consistent savings behavior detected")
             insights.append("💪 You're building great financial habits")
-        elif len(recent_contributions) >= 1:
+        elif summary['contributions'] >= 1:
             insights.append("👍 Good start with savings")
             insights.append("🔄 Try to make savings a regular habit")
         else:
             insights.append("💡 Consider setting up automatic savings transfers")
         
         # Analyze goal progress
-        goals = [h for h in userHistory if h.get('type') == 'goal']
-        if goals:
-            active_goals = [g for g in goals if g.get('status') == 'active']
-            completed_goals = [g for g in goals if g.get('status') == 'completed']
-            
-            if completed_goals:
-                insights.append("🏆 You've successfully completed financial goals")
-                insights.append("🌟 Celebrate your achievements!")
-            
-            if active_goals:
-                insights.append(f"🎯 You have {len(active_goals)} active savings goals")
-                insights.append("📈 Keep pushing toward your targets")
+        if summary['completed_goals']:
+            insights.append("🏆 You've successfully completed financial goals")
+            insights.append("🌟 Celebrate your achievements!")
+        
+        if summary['active_goals']:
+            insights.append(f"🎯 You have {summary['active_goals']} active savings goals")
+            insights.append("📈 Keep pushing toward your targets")
         
         return insights
     
@@ -0,0 +1,43 @@
+import os
+import time
+
+# How long past its deadline a caller waits for a generation cut off at that deadline
+DEADLINE_GRACE = float(os.getenv('AI_DEADLINE_GRACE_MS', '250')) / 1000.0
+
+def deadline_after(budget_ms):
+    """Monotonic deadline budget_ms from now; None (no deadline) for an empty or non-positive budget"""
+    if budget_ms is None or budget_ms <= 0:
+        return None
+    return time.monotonic() + budget_ms / 1000.0
+
+def remaining_seconds(deadline, grace=0.0):
+    """Seconds left before the deadline (never negative), or None when there is no deadline"""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic() + grace)
+
+def expired(deadline):
+    return deadline is not None and time.monotonic() >= deadline
+
+def latest(deadlines):
+    """The deadline a shared batch has to respect: the latest one, or None if any item has none"""
+    deadlines = list(deadlines)
+    if not deadlines or any(deadline is None for deadline in deadlines):
+        return None
+    return max(deadlines)
+
+class DeadlineStoppingCriteria:
+    def __init__(self, deadline):
+        """Stopping criterion for generate(): stop decoding once the deadline has passed
+
+        A plain callable is all transformers' StoppingCriteriaList needs, so
+        this module does not have to import transformers. `triggered`
+        records whether the deadline cut the generation short.
+        """
+        self.deadline = deadline
+        self.triggered = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if expired(self.deadline):
+            self.triggered = True
+        return self.triggered
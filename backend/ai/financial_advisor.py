@@ -1,71 +1,509 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
-import torch
 import json
+import os
 import re
+import threading
+import time
+import zlib
 from datetime import datetime, timedelta
 
+from ai.advice_results import (
+    RISK_RECOMMENDATIONS, TIME_HORIZONS, budget_advice_result, investment_advice_result, render_budget_advice,
+    render_investment_guidance, render_savings_plan, savings_plan_result
+)
+from ai.batch_scheduler import BatchScheduler
+from ai.deadline import DEADLINE_GRACE, DeadlineStoppingCriteria, deadline_after, expired, latest, remaining_seconds
+from ai.goal_recommender import DEFAULT_TOP_K, load_cohort_index
+from ai.metrics import ERRORS, REGISTRY, count_new_tokens, record_generation, timed
+from ai.model_server import ModelServer
+from ai.prefix_cache import PrefixKVCache
+from ai.prompt_builder import PromptBuilder
+from ai.response_cache import cached_response, create_response_cache
+from ai.scenario_grid import (
+    DEFAULT_ANNUAL_RETURN, PLAN_STATUS_CODES, grid_payload, investment_grid, render_investment_cells,
+    render_savings_plan_cells, savings_plan_grid
+)
+from ai.semantic_cache import create_semantic_cache
+
+DEFAULT_MODEL = "mistralai/Mistral-7B-Instruct"
+
+# Component label for this module's stage metrics
+COMPONENT = 'financial_advisor'
+
+# Base financial advisor instructions
+BASE_INSTRUCTIONS = """You are LoopFund AI, a professional financial advisor specializing in savings, budgeting, and financial planning. 
+
+Your role is to provide:
+- Clear, actionable financial advice
+- Specific savings calculations and timelines
+- Motivational and encouraging responses
+- Practical tips for achieving financial goals
+- Risk-aware recommendations
+
+Always respond in a friendly, professional tone and provide specific numbers when possible."""
+
+# Financial knowledge base
+FINANCIAL_KNOWLEDGE = """
+Financial Knowledge Base:
+- Emergency Fund: 3-6 months of expenses
+- 50/30/20 Rule: 50% needs, 30% wants, 20% savings
+- Compound Interest: Money grows exponentially over time
+- Diversification: Don't put all eggs in one basket
+- Pay Yourself First: Save before spending
+"""
+
+# Canned advice served when the model cannot answer within the latency budget
+FALLBACK_ADVICE = {
+    "savings_plan": [
+        "Start by saving 20% of your income each month. Create an emergency fund first, then focus on specific goals.",
+        "Use the 50/30/20 rule: 50% needs, 30% wants, 20% savings. Automate your savings to make it easier.",
+        "Set SMART goals: Specific, Measurable, Achievable, Relevant, and Time-bound savings targets."
+    ],
+    "goal_setting": [
+        "Break down large goals into smaller, achievable milestones. Celebrate each milestone to stay motivated.",
+        "Prioritize your goals: emergency fund first, then short-term goals, then long-term investments.",
+        "Review and adjust your goals monthly. Life changes, so your financial goals should adapt too."
+    ],
+    "budget_advice": [
+        "Track every expense for a month to understand your spending patterns. Use apps or spreadsheets.",
+        "Create a zero-based budget where every dollar has a purpose. Include savings as a fixed expense.",
+        "Use the envelope method for variable expenses like groceries and entertainment."
+    ],
+    "general": [
+        "Start small and build momentum. Even $10 a week adds up to $520 a year.",
+        "Automate your savings to remove the temptation to spend. Out of sight, out of mind.",
+        "Focus on building good financial habits rather than trying to save large amounts immediately."
+    ]
+}
+
+# Degradation paths reported with each answer (None means a complete model answer)
+DEGRADATION_PARTIAL = 'partial'
+DEGRADATION_FALLBACK = 'fallback'
+
+# Model loading states reported by /api/health
+STATUS_IDLE = 'idle'
+STATUS_LOADING = 'loading'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
 class FinancialAdvisor:
-    def __init__(self):
-        """Initialize the AI Financial Advisor with Mistral-7B-Instruct"""
-        try:
-            # Load pre-trained models
-            self.conversation_model = pipeline(
-                "text-generation", 
-                model="mistralai/Mistral-7B-Instruct",
-                torch_dtype=torch.float16,
-                device_map="auto"
+    def __init__(self, model_name=None, max_batch_size=None, batch_wait_ms=None, prefix_cache=None,
+                 response_cache=None, semantic_cache=None, backend=None, model_workers=None, draft_model=None,
+                 latency_budget_ms=None, goal_cohorts=None):
+        """Set up the AI Financial Advisor; the model itself is loaded by load()"""
+        self.model_name = model_name or os.getenv('AI_MODEL', DEFAULT_MODEL)
+        # auto, fp16, bf16, fp32, or int8/int4 quantized weights on CPU (see ai/inference_backend.py)
+        self.backend = backend or os.getenv('AI_BACKEND', 'auto')
+        # Small model with the same tokenizer that drafts tokens for assisted decoding (opt-in)
+        self.draft_model_name = draft_model or os.getenv('AI_DRAFT_MODEL') or None
+        # New-token cap, so the prompt length never eats into the answer
+        self.generation_kwargs = {
+            'max_new_tokens': int(os.getenv('AI_MAX_NEW_TOKENS', '128')),
+            'temperature': 0.7,
+            'do_sample': True
+        }
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv('AI_MAX_BATCH_SIZE', '8'))
+        if batch_wait_ms is None:
+            batch_wait_ms = float(os.getenv('AI_BATCH_MAX_WAIT_MS', '10'))
+        if prefix_cache is None:
+            prefix_cache = os.getenv('AI_PREFIX_CACHE', 'true').lower() in ('1', 'true', 'yes')
+        if model_workers is None:
+            model_workers = int(os.getenv('AI_MODEL_WORKERS', '0'))
+        if latency_budget_ms is None:
+            latency_budget_ms = float(os.getenv('AI_LATENCY_BUDGET_MS', '20000'))
+        self.max_batch_size = max_batch_size
+        self.batch_wait_ms = batch_wait_ms
+        # Forked generation processes sharing the loaded weights (0 generates in this process)
+        self.model_workers = model_workers
+        self.use_prefix_cache = prefix_cache
+        # Longest a generation call may take before it degrades (0 disables the budget)
+        self.latency_budget_ms = latency_budget_ms
+        # Memoizes the deterministic calculators (see cached_response)
+        self.response_cache = response_cache if response_cache is not None else create_response_cache()
+        # Reuses generated answers for repeated or near-identical questions
+        self.semantic_cache = semantic_cache if semantic_cache is not None else create_semantic_cache()
+        # Cohort statistics behind recommendGoals (None keeps the fixed age brackets)
+        self.goal_cohorts = goal_cohorts if goal_cohorts is not None else load_cohort_index()
+
+        # Keeps chat history, context and questions within token budgets
+        self.prompt_builder = PromptBuilder()
+
+        self.conversation_model = None
+        self.scheduler = None
+        self.model_server = None
+        self.speculative = None
+        self.prefix_cache = None
+        self.status = STATUS_IDLE
+        self.load_error = None
+        self._load_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._degradation_lock = threading.Lock()
+        self._degradations = {'complete': 0, DEGRADATION_PARTIAL: 0, DEGRADATION_FALLBACK: 0, 'reasons': {}}
+
+    def start_loading(self):
+        """Load the model on a background thread so callers are not blocked"""
+        if self.status != STATUS_IDLE:
+            return
+        self.status = STATUS_LOADING
+        threading.Thread(target=self.load, name='advisor-model-loader', daemon=True).start()
+
+    def load(self):
+        """Load the text-generation model; safe to call more than once"""
+        with self._load_lock:
+            if self._loaded.is_set():
+                return self.status == STATUS_READY
+            self.status = STATUS_LOADING
+            try:
+                # Heavy imports are deferred until a model is actually needed
+                from transformers import pipeline
+                from ai.inference_backend import load_causal_lm
+
+                # Load pre-trained models in the precision the configured backend calls for
+                model, tokenizer, self.backend = load_causal_lm(self.model_name, self.backend)
+                self.conversation_model = pipeline("text-generation", model=model, tokenizer=tokenizer)
+                # Decoder-only models must be left-padded when prompts are batched
+                tokenizer = self.conversation_model.tokenizer
+                tokenizer.padding_side = 'left'
+                if tokenizer.pad_token_id is None:
+                    tokenizer.pad_token = tokenizer.eos_token
+                self.prompt_builder.attach_tokenizer(tokenizer)
+
+                if self.draft_model_name:
+                    self.speculative = self._load_draft_model(model, tokenizer)
+                if self.model_workers > 0 and threading.current_thread() is not threading.main_thread():
+                    print("⚠️ AI_MODEL_WORKERS needs the model loaded on the main thread before serving "
+                          "(keep AI_PRELOAD on); generating in this process instead")
+                elif self.model_workers > 0:
+                    # Fork before any forward pass or scheduler thread; each worker batches its own requests
+                    self.model_server = ModelServer(self, self.model_workers).start()
+                self._attach_prefix_cache()
+                if not self.model_server and self.max_batch_size > 1:
+                    self.scheduler = BatchScheduler(self._generate_items, self.max_batch_size, self.batch_wait_ms)
+                self.status = STATUS_READY
+                print(f"✅ AI Financial Advisor initialized successfully! (backend: {self.backend})")
+            except Exception as e:
+                print(f"❌ Error initializing AI: {e}")
+                self.conversation_model = None
+                self.load_error = str(e)
+                self.status = STATUS_FAILED
+            finally:
+                self._loaded.set()
+            return self.status == STATUS_READY
+
+    def _attach_prefix_cache(self):
+        """Precompute the shared prompt prefix state (model workers do this after they are forked)"""
+        # Assisted decoding re-reads the whole prompt, so the prefix state would go unused
+        if self.use_prefix_cache and not self.speculative and self.prefix_cache is None:
+            self.prefix_cache = PrefixKVCache(
+                self.conversation_model.model,
+                self.conversation_model.tokenizer,
+                self._build_prompt_prefix()
             )
-            print("✅ AI Financial Advisor initialized successfully!")
+
+    def _load_draft_model(self, model, tokenizer):
+        """Speculative decoder around the draft model, or None when it cannot pair with the main model"""
+        from ai.inference_backend import load_causal_lm
+        from ai.speculative import SpeculativeDecoder, tokenizers_compatible
+        
+        try:
+            draft_model, draft_tokenizer, _ = load_causal_lm(self.draft_model_name, self.backend)
         except Exception as e:
-            print(f"❌ Error initializing AI: {e}")
-            # Fallback to a simpler model if needed
-            self.conversation_model = None
+            print(f"⚠️ Could not load draft model {self.draft_model_name}: {e}")
+            return None
+        
+        if not tokenizers_compatible(tokenizer, draft_tokenizer):
+            print(f"⚠️ Draft model {self.draft_model_name} does not share the tokenizer of {self.model_name}; "
+                  "speculative decoding disabled")
+            return None
+        
+        print(f"✅ Speculative decoding enabled with draft model {self.draft_model_name}")
+        return SpeculativeDecoder(model, draft_model, tokenizer)
     
-    def getAdvice(self, user_query, user_profile=None):
+    def ensure_loaded(self, timeout=None):
+        """Block until the model is usable, loading it now if nobody has started to"""
+        if self.status == STATUS_IDLE:
+            return self.load()
+        self._loaded.wait(timeout)
+        return self.status == STATUS_READY
+    
+    def getAdvice(self, user_query, user_profile=None, endpoint='advice', budget_ms=None):
         """Generate personalized financial advice based on user query and profile"""
-        if not self.conversation_model:
-            return "AI service temporarily unavailable. Please try again later."
+        return self.generateAdvice(user_query, user_profile, endpoint, budget_ms)['advice']
+    
+    def generateAdvice(self, user_query, user_profile=None, endpoint='advice', budget_ms=None):
+        """Advice within a latency budget, as {'advice', 'degradation', 'degradation_reason'}
+
+        degradation is None for a complete answer, 'partial' when decoding was
+        cut off at the deadline, or 'fallback' for canned advice when the
+        request waited out its budget in the queue (or the model failed).
+        """
+        deadline = self._deadline(budget_ms)
+        if self.semantic_cache:
+            with timed(COMPONENT, 'cache_lookup'):
+                cached = self.semantic_cache.lookup(endpoint, user_query, user_profile)
+            if cached is not None:
+                return self._advice_result(cached)
+        
+        if not self.ensure_loaded(timeout=remaining_seconds(deadline)):
+            return self._fallback_result(user_query, 'model_unavailable')
         
         try:
             # Build context-aware prompt
-            context = self._build_context_prompt(user_query, user_profile)
-            
-            # Generate response
-            response = self.conversation_model(
-                context,
-                max_length=300,
-                temperature=0.7,
-                do_sample=True,
-                pad_token_id=self.conversation_model.tokenizer.eos_token_id
-            )
-            
-            # Extract and clean the response
-            advice = self._clean_response(response[0]['generated_text'])
-            return advice
+            with timed(COMPONENT, 'prompt_build'):
+                item = (self._build_prompt(user_query, user_profile), deadline)
+            wait = remaining_seconds(deadline, DEADLINE_GRACE)
             
+            # Generate response, sharing a forward pass with concurrent requests when batching
+            with timed(COMPONENT, 'generate'):
+                if self.model_server:
+                    result = self.model_server.run(item, timeout=wait)
+                elif self.scheduler:
+                    result = self.scheduler.run(item, timeout=wait)
+                else:
+                    result = self._generate_items([item])[0]
+        except TimeoutError:
+            return self._fallback_result(user_query, 'queue_timeout')
         except Exception as e:
             print(f"Error generating advice: {e}")
-            return "I'm having trouble processing your request. Please try again."
+            ERRORS.inc(component=COMPONENT)
+            return self._fallback_result(user_query, 'error')
+        
+        if result is None:
+            # The deadline passed before its batch reached the model
+            return self._fallback_result(user_query, 'queue_timeout')
+        advice, stopped = result
+        if stopped:
+            if not advice:
+                return self._fallback_result(user_query, 'decode_deadline')
+            return self._advice_result(advice, DEGRADATION_PARTIAL, 'decode_deadline')
+        
+        if self.semantic_cache:
+            self.semantic_cache.store(endpoint, user_query, user_profile, advice)
+        return self._advice_result(advice)
+    
+    def _deadline(self, budget_ms):
+        """Deadline for one call; callers may tighten the configured budget but not extend it"""
+        try:
+            budget_ms = float(budget_ms) if budget_ms is not None else None
+        except (TypeError, ValueError):
+            budget_ms = None
+        if not self.latency_budget_ms:
+            return deadline_after(budget_ms)
+        if budget_ms is None or budget_ms <= 0:
+            return deadline_after(self.latency_budget_ms)
+        return deadline_after(min(budget_ms, self.latency_budget_ms))
+    
+    def _advice_result(self, advice, degradation=None, reason=None):
+        with self._degradation_lock:
+            self._degradations[degradation or 'complete'] += 1
+            if reason:
+                self._degradations['reasons'][reason] = self._degradations['reasons'].get(reason, 0) + 1
+        return {'advice': advice, 'degradation': degradation, 'degradation_reason': reason}
     
-    def get_financial_advice(self, user_query, user_profile=None):
+    def _fallback_result(self, user_query, reason):
+        return self._advice_result(self._get_fallback_advice(user_query), DEGRADATION_FALLBACK, reason)
+    
+    def _get_fallback_advice(self, query, context_type=None):
+        """Fallback advice when the model cannot answer in time; stable for a given query"""
+        if context_type is None:
+            query_lower = (query or '').lower()
+            if 'budget' in query_lower or 'expense' in query_lower:
+                context_type = 'budget_advice'
+            elif 'goal' in query_lower:
+                context_type = 'goal_setting'
+            elif 'save' in query_lower or 'saving' in query_lower:
+                context_type = 'savings_plan'
+            else:
+                context_type = 'general'
+        responses = FALLBACK_ADVICE.get(context_type, FALLBACK_ADVICE['general'])
+        return responses[zlib.crc32((query or '').encode('utf-8')) % len(responses)]
+    
+    def degradation_stats(self):
+        """How many answers were complete, partial or fallback, and why"""
+        with self._degradation_lock:
+            stats = dict(self._degradations, reasons=dict(self._degradations['reasons']))
+        stats['latency_budget_ms'] = self.latency_budget_ms
+        return stats
+    
+    def generateBatch(self, prompts):
+        """Run several prompts through the model in one batched generate call"""
+        return self._generate_texts(prompts)[0]
+    
+    def _generate_items(self, items):
+        """Batch entry point for (prompt, deadline) items, used by the scheduler and model workers
+
+        Returns (text, stopped_at_deadline) per item, or None for an item whose
+        deadline passed while it was queued. The shared generate call stops
+        at the latest live deadline.
+        """
+        results = [None] * len(items)
+        live = [index for index, (_, deadline) in enumerate(items) if not expired(deadline)]
+        if live:
+            texts, stopped = self._generate_texts(
+                [items[index][0] for index in live],
+                latest(items[index][1] for index in live)
+            )
+            for index, text in zip(live, texts):
+                results[index] = (text, stopped)
+        return results
+    
+    def _generate_texts(self, prompts, deadline=None):
+        """Cleaned texts for prompts, plus whether decoding was stopped by the deadline"""
+        generation_kwargs = dict(self.generation_kwargs)
+        criteria = None
+        if deadline is not None:
+            criteria = DeadlineStoppingCriteria(deadline)
+            generation_kwargs['stopping_criteria'] = [criteria]
+        
+        # Only the per-request tail of each prompt needs a forward pass when the prefix state applies
+        inputs = self.prefix_cache.build_inputs(prompts) if self.prefix_cache and not self.speculative else None
+        if self.speculative:
+            # Assisted decoding verifies one sequence at a time
+            with timed(COMPONENT, 'decode'):
+                texts = self.speculative.generate(prompts, **generation_kwargs)
+        elif inputs is not None:
+            texts = self.prefix_cache.generate(inputs, **generation_kwargs)
+        else:
+            # The pipeline tokenizes inside this stage as well
+            tokenizer = self.conversation_model.tokenizer
+            started = time.perf_counter()
+            with timed(COMPONENT, 'decode'):
+                responses = self.conversation_model(
+                    prompts,
+                    batch_size=len(prompts),
+                    pad_token_id=tokenizer.pad_token_id,
+                    return_full_text=False,
+                    **generation_kwargs
+                )
+            texts = [response[0]['generated_text'] for response in responses]
+            if REGISTRY.enabled:
+                # The pipeline only hands back text, so its new tokens are re-tokenized from it (close, not exact)
+                tokens = sum(len(tokenizer(text, add_special_tokens=False).input_ids) for text in texts)
+                record_generation('pipeline', tokens, time.perf_counter() - started)
+        
+        # Extract and clean each response
+        with timed(COMPONENT, 'clean_response'):
+            cleaned = [self._clean_response(text) for text in texts]
+        return cleaned, criteria is not None and criteria.triggered
+    
+    def streamAdvice(self, user_query, user_profile=None, endpoint='advice', budget_ms=None):
+        """Yield advice events while tokens are decoded, ending with the cleaned answer
+
+        Events are dicts: {'event': 'token', 'text': ...} for each decoded chunk,
+        then {'event': 'done', 'advice': ..., 'degradation': ...} (or
+        {'event': 'error', ...}). When the latency budget runs out the stream
+        ends with what was decoded so far ('partial'), or with fallback advice
+        if nothing was. Streams run one sequence at a time in this process,
+        outside the batch scheduler and the model server workers.
+        """
+        deadline = self._deadline(budget_ms)
+        if self.semantic_cache:
+            with timed(COMPONENT, 'cache_lookup'):
+                cached = self.semantic_cache.lookup(endpoint, user_query, user_profile)
+            if cached is not None:
+                yield dict(self._advice_result(cached), event='done')
+                return
+        
+        if not self.ensure_loaded(timeout=remaining_seconds(deadline)):
+            yield {'event': 'error', 'error': "AI service temporarily unavailable. Please try again later."}
+            return
+        
+        from queue import Empty
+        from transformers import TextIteratorStreamer
+        
+        with timed(COMPONENT, 'prompt_build'):
+            prompt = self._build_prompt(user_query, user_profile)
+        tokenizer = self.conversation_model.tokenizer
+        # Stop waiting for tokens once the budget (plus the grace for the last step) is spent
+        streamer = TextIteratorStreamer(
+            tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=remaining_seconds(deadline, DEADLINE_GRACE)
+        )
+        generation_kwargs = dict(self.generation_kwargs)
+        criteria = None
+        if deadline is not None:
+            criteria = DeadlineStoppingCriteria(deadline)
+            generation_kwargs['stopping_criteria'] = [criteria]
+        failure = []
+        
+        def run_generation():
+            try:
+                inputs = self._generation_inputs(prompt)
+                with timed(COMPONENT, 'decode'):
+                    if self.speculative:
+                        self.speculative.generate_ids(inputs, streamer=streamer, pad_token_id=tokenizer.pad_token_id, **generation_kwargs)
+                        return
+                    started = time.perf_counter()
+                    outputs = self.conversation_model.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        pad_token_id=tokenizer.pad_token_id,
+                        **generation_kwargs
+                    )
+                new_tokens = outputs[:, inputs['input_ids'].shape[1]:]
+                record_generation('stream', count_new_tokens(new_tokens, tokenizer.pad_token_id), time.perf_counter() - started)
+            except Exception as e:
+                failure.append(e)
+                # Unblock the consumer loop below
+                streamer.end()
+        
+        worker = threading.Thread(target=run_generation, name='advisor-stream', daemon=True)
+        worker.start()
+        
+        generated = []
+        timed_out = False
+        try:
+            for text in streamer:
+                if text:
+                    generated.append(text)
+                    yield {'event': 'token', 'text': text}
+        except Empty:
+            # No token arrived in time; the stopping criteria ends the worker shortly
+            timed_out = True
+        if not timed_out:
+            worker.join()
+        
+        if failure:
+            print(f"Error streaming advice: {failure[0]}")
+            ERRORS.inc(component=COMPONENT)
+            yield {'event': 'error', 'error': "I'm having trouble processing your request. Please try again."}
+            return
+        
+        advice = self._clean_response(''.join(generated))
+        if timed_out or (criteria and criteria.triggered):
+            if advice:
+                yield dict(self._advice_result(advice, DEGRADATION_PARTIAL, 'decode_deadline'), event='done')
+            else:
+                yield dict(self._fallback_result(user_query, 'decode_deadline'), event='done')
+            return
+        
+        if self.semantic_cache:
+            self.semantic_cache.store(endpoint, user_query, user_profile, advice)
+        yield dict(self._advice_result(advice), event='done')
+    
+    def _generation_inputs(self, prompt):
+        """Model inputs for a single prompt, reusing the cached prefix state when possible"""
+        inputs = self.prefix_cache.build_inputs([prompt]) if self.prefix_cache else None
+        if inputs is not None:
+            return inputs
+        
+        model = self.conversation_model.model
+        with timed(COMPONENT, 'tokenize'):
+            return dict(self.conversation_model.tokenizer(prompt, return_tensors='pt', return_token_type_ids=False).to(model.device))
+    
+    def get_financial_advice(self, user_query, user_profile=None, endpoint='advice'):
         """Legacy method for backward compatibility"""
-        return self.getAdvice(user_query, user_profile)
+        return self.getAdvice(user_query, user_profile, endpoint)
+    
+    def _build_prompt_prefix(self):
+        """Static part of every prompt: advisor instructions and knowledge base"""
+        return f"{BASE_INSTRUCTIONS}\n\n{FINANCIAL_KNOWLEDGE}\n\n"
     
     def _build_context_prompt(self, user_query, user_profile):
         """Build a comprehensive prompt with financial context and instructions"""
         
-        # Base financial advisor instructions
-        base_instructions = """You are LoopFund AI, a professional financial advisor specializing in savings, budgeting, and financial planning. 
-
-Your role is to provide:
-- Clear, actionable financial advice
-- Specific savings calculations and timelines
-- Motivational and encouraging responses
-- Practical tips for achieving financial goals
-- Risk-aware recommendations
-
-Always respond in a friendly, professional tone and provide specific numbers when possible."""
-
         # User profile context
         profile_context = ""
         if user_profile:
@@ -78,21 +516,17 @@ User Profile:
 - Risk Tolerance: {user_profile.get('risk_tolerance', 'Not specified')}
 """
 
-        # Financial knowledge base
-        financial_knowledge = """
-Financial Knowledge Base:
-- Emergency Fund: 3-6 months of expenses
-- 50/30/20 Rule: 50% needs, 30% wants, 20% savings
-- Compound Interest: Money grows exponentially over time
-- Diversification: Don't put all eggs in one basket
-- Pay Yourself First: Save before spending
-"""
-
-        # Build the complete prompt
-        full_prompt = f"{base_instructions}\n\n{profile_context}\n\n{financial_knowledge}\n\nUser Question: {user_query}\n\nLoopFund AI Response:"
+        # Build the complete prompt. The constant instructions and knowledge base
+        # come first so their attention state can be computed once and reused.
+        full_prompt = f"{self._build_prompt_prefix()}{profile_context}\n\nUser Question: {user_query}\n\nLoopFund AI Response:"
         
         return full_prompt
     
+    def _build_prompt(self, user_query, user_profile):
+        """Context prompt with the query trimmed to what is left of the prompt token budget"""
+        reserved = self.prompt_builder.count_tokens(self._build_context_prompt('', user_profile))
+        return self._build_context_prompt(self.prompt_builder.fit_query(user_query, reserved), user_profile)
+    
     def _clean_response(self, response):
         """Clean and format the AI response"""
         # Remove the original prompt from the response
@@ -109,135 +543,86 @@ Financial Knowledge Base:
         
         return response.strip()
     
+    @cached_response('savings_plan')
     def get_savings_plan(self, goal_amount, timeline_months, monthly_income, monthly_expenses):
         """Generate a detailed savings plan"""
         try:
-            # Calculate basic savings plan
-            monthly_savings_needed = goal_amount / timeline_months
-            available_for_savings = monthly_income - monthly_expenses
-            
-            if monthly_savings_needed > available_for_savings:
-                # Goal is too aggressive
-                adjusted_timeline = goal_amount / available_for_savings
-                advice = f"""
-🎯 Your Savings Goal: ${goal_amount:,}
-⏰ Original Timeline: {timeline_months} months
-💰 Monthly Savings Needed: ${monthly_savings_needed:,.2f}
-💸 Available Monthly: ${available_for_savings:,.2f}
-
-⚠️ This goal is too aggressive for your current budget.
-💡 Recommended Timeline: {adjusted_timeline:.1f} months
-💡 Alternative: Reduce goal to ${(available_for_savings * timeline_months):,.2f}
-
-Would you like me to help you adjust your goal or create a more realistic timeline?
-"""
-            else:
-                # Goal is achievable
-                advice = f"""
-🎯 Your Savings Goal: ${goal_amount:,}
-⏰ Timeline: {timeline_months} months
-💰 Monthly Savings Needed: ${monthly_savings_needed:,.2f}
-💸 Available Monthly: ${available_for_savings:,.2f}
-
-✅ This goal is achievable! Here's your plan:
-
-📅 Monthly Savings: ${monthly_savings_needed:,.2f}
-💪 Extra Available: ${available_for_savings - monthly_savings_needed:,.2f}
-🎉 You'll reach your goal in {timeline_months} months!
-
-💡 Tips:
-- Set up automatic transfers on payday
-- Track your progress weekly
-- Celebrate small milestones
-"""
-            
-            return advice
+            return render_savings_plan(goal_amount, timeline_months, monthly_income, monthly_expenses)
             
         except Exception as e:
             return f"Error calculating savings plan: {e}"
     
+    def get_savings_plan_result(self, goal_amount, timeline_months, monthly_income, monthly_expenses):
+        """get_savings_plan as typed fields and insight codes; render_result turns it into the same text"""
+        return savings_plan_result(goal_amount, timeline_months, monthly_income, monthly_expenses)
+    
+    def get_savings_plan_grid(self, goal_amounts, timeline_months, monthly_income, monthly_expenses, render=None):
+        """Savings plans for every goal amount x timeline, as arrays plus text for the `render` cells only"""
+        with timed(COMPONENT, 'savings_plan_grid'):
+            grid = savings_plan_grid(goal_amounts, timeline_months, monthly_income, monthly_expenses)
+            payload = grid_payload(grid)
+            payload['status_codes'] = PLAN_STATUS_CODES
+            if render:
+                payload['rendered'] = render_savings_plan_cells(grid, render)
+            return payload
+    
+    @cached_response('budget_advice', ignore=('goals',))
     def get_budget_advice(self, income, expenses, goals):
         """Provide budget optimization advice"""
         try:
-            total_expenses = sum(expenses.values())
-            savings_rate = ((income - total_expenses) / income) * 100
-            
-            if savings_rate < 20:
-                advice = f"""
-📊 Budget Analysis:
-💰 Monthly Income: ${income:,.2f}
-💸 Monthly Expenses: ${total_expenses:,.2f}
-💾 Current Savings Rate: {savings_rate:.1f}%
-
-⚠️ Your savings rate is below the recommended 20%.
-
-💡 Recommendations:
-1. Track all expenses for 30 days
-2. Identify non-essential spending
-3. Use the 50/30/20 rule:
-   - 50% for needs (rent, food, utilities)
-   - 30% for wants (entertainment, shopping)
-   - 20% for savings and debt repayment
-
-🎯 Target: Increase savings to ${income * 0.2:,.2f} per month
-"""
-            else:
-                advice = f"""
-📊 Budget Analysis:
-💰 Monthly Income: ${income:,.2f}
-💸 Monthly Expenses: ${total_expenses:,.2f}
-💾 Current Savings Rate: {savings_rate:.1f}%
-
-🎉 Excellent! You're saving above the recommended 20%.
-
-💡 You could:
-- Increase emergency fund
-- Invest in retirement accounts
-- Save for additional goals
-- Treat yourself (you've earned it!)
-"""
-            
-            return advice
+            return render_budget_advice(income, sum(expenses.values()))
             
         except Exception as e:
             return f"Error analyzing budget: {e}"
     
+    def get_budget_advice_result(self, income, expenses):
+        """get_budget_advice as typed fields and insight codes"""
+        return budget_advice_result(income, expenses)
+    
+    @cached_response('investment_advice', ignore=('risk_tolerance',))
     def get_investment_advice(self, age, risk_tolerance, investment_amount):
         """Provide basic investment guidance"""
         try:
-            if age < 30:
-                time_horizon = "long-term"
-                risk_recommendation = "higher risk tolerance"
-            elif age < 50:
-                time_horizon = "medium-term"
-                risk_recommendation = "moderate risk tolerance"
-            else:
-                time_horizon = "shorter-term"
-                risk_recommendation = "lower risk tolerance"
-            
-            advice = f"""
-📈 Investment Guidance for Age {age}:
-⏰ Time Horizon: {time_horizon}
-🎯 Risk Profile: {risk_recommendation}
-💰 Investment Amount: ${investment_amount:,.2f}
-
-💡 Recommendations:
-- Start with index funds (low fees, diversified)
-- Consider your time horizon: {time_horizon}
-- Don't invest money you'll need in 3-5 years
-- Emergency fund first, then invest
-
-⚠️ Disclaimer: This is general advice. Consider consulting a financial advisor for personalized guidance.
-"""
-            
-            return advice
+            return render_investment_guidance(age, investment_amount)
             
         except Exception as e:
             return f"Error providing investment advice: {e}"
+    
+    def get_investment_advice_result(self, age, investment_amount):
+        """get_investment_advice as horizon/risk profile codes and insight codes"""
+        return investment_advice_result(age, investment_amount)
+    
+    def get_investment_grid(self, ages, investment_amounts, years, annual_return=DEFAULT_ANNUAL_RETURN, render=None):
+        """Investment profiles per age and amount x horizon projections, plus text for the `render` cells only"""
+        with timed(COMPONENT, 'investment_grid'):
+            grid = investment_grid(ages, investment_amounts, years, annual_return)
+            payload = grid_payload(grid)
+            payload['time_horizons'] = TIME_HORIZONS
+            payload['risk_recommendations'] = RISK_RECOMMENDATIONS
+            if render:
+                payload['rendered'] = render_investment_cells(grid, render)
+            return payload
 
-    def recommendGoals(self, user_profile):
-        """Recommend financial goals based on user profile"""
+    @cached_response('recommend_goals')
+    def recommendGoals(self, user_profile, top_k=DEFAULT_TOP_K):
+        """Recommend financial goals based on user profile
+
+        With a cohort index loaded (AI_GOAL_COHORTS) these are the top_k goals
+        of users with a similar age and income, sized to this user's income;
+        otherwise they come from fixed age brackets.
+        """
         try:
+            if self.goal_cohorts is not None:
+                recommendations, cohort = self.goal_cohorts.recommend(
+                    float(user_profile.get('age', 25)), float(user_profile.get('income', 50000)), top_k
+                )
+                return {
+                    'success': True,
+                    'recommendations': recommendations,
+                    'user_profile': user_profile,
+                    'cohort': cohort
+                }
+
             # Basic goal recommendations based on age and income
             age = user_profile.get('age', 25)
             income = user_profile.get('income', 50000)
@@ -311,6 +696,7 @@ Would you like me to help you adjust your goal or create a more realistic timeli
 # Example usage and testing
 if __name__ == "__main__":
     advisor = FinancialAdvisor()
+    advisor.load()
     
     # Test basic advice
     test_query = "How much should I save each month if my goal is $5,000 in 10 months?"
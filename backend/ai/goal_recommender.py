@@ -0,0 +1,369 @@
+"""
+LoopFund Goal Recommender
+Goal recommendations from what similar users actually save for. Goal and
+contribution exports are aggregated offline into cohorts (age band x
+income band x goal type); each cohort's ranked goal list is stored in a
+small index, so serving a recommendation is one array lookup.
+
+Usage:
+    python -m ai.goal_recommender build --users users.csv --goals goals.csv \\
+        [--contributions contributions.csv] --out cohorts.json
+    python -m ai.goal_recommender score --index cohorts.json --users users.parquet --out recommendations.jsonl
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+from datetime import datetime
+
+import numpy as np
+
+from ai.metrics import instrumented
+
+# Component label for this module's stage metrics
+COMPONENT = 'goal_recommender'
+
+# Band boundaries: ages in years, incomes annual; a value equal to an edge starts the next band
+AGE_BAND_EDGES = (25, 30, 35, 40, 45, 50, 55, 60, 65)
+INCOME_BAND_EDGES = (25000, 50000, 75000, 100000, 150000, 200000)
+
+# Goal categories as stored on Goal documents; anything else counts as 'other'
+GOAL_TYPES = ('personal', 'business', 'education', 'travel', 'emergency', 'family', 'other')
+GOAL_DETAILS = {
+    'personal': ('Personal Goal', 'Save for something that matters to you'),
+    'business': ('Business Fund', 'Build capital for a business or side project'),
+    'education': ('Education Fund', 'Save for courses, tuition or certifications'),
+    'travel': ('Travel Fund', 'Plan and pay for a trip without debt'),
+    'emergency': ('Emergency Fund', 'Build a safety net for unexpected expenses'),
+    'family': ('Family Fund', 'Save for family needs and milestones'),
+    'other': ('Savings Goal', 'Put money aside for a goal of your own')
+}
+
+# Which cohort a cell's recommendations came from, finest first
+COHORT_LEVELS = ('age_income', 'age', 'all')
+
+# Cohorts with fewer users fall back to the next coarser level
+MIN_COHORT_USERS = 30
+DEFAULT_TOP_K = 3
+# Used when a cohort has neither contribution pace nor completed goals to learn a timeline from
+DEFAULT_TIMELINE_MONTHS = 12
+MAX_TIMELINE_MONTHS = 600
+DAYS_PER_MONTH = 30.44
+
+INDEX_VERSION = 1
+
+def _band_labels(edges, unit=''):
+    labels = [f"<{unit}{edges[0]:,}"]
+    labels += [f"{unit}{low:,}-{unit}{high - 1:,}" for low, high in zip(edges, edges[1:])]
+    return labels + [f"{unit}{edges[-1]:,}+"]
+
+AGE_BANDS = _band_labels(AGE_BAND_EDGES)
+INCOME_BANDS = _band_labels(INCOME_BAND_EDGES, '$')
+
+def read_table(path):
+    """DataFrame from a CSV or Parquet export, chosen by file extension"""
+    import pandas as pd
+
+    if path.lower().endswith(('.parquet', '.pq')):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def write_table(frame, path):
+    """Write a DataFrame as CSV, Parquet or JSON lines, chosen by file extension"""
+    lowered = path.lower()
+    if lowered.endswith(('.parquet', '.pq')):
+        frame.to_parquet(path, index=False)
+    elif lowered.endswith(('.jsonl', '.ndjson')):
+        frame.to_json(path, orient='records', lines=True)
+    else:
+        frame.to_csv(path, index=False)
+
+def _cell_ids(ages, incomes):
+    """Flat (age band, income band) cell index for arrays of ages and annual incomes"""
+    age_band = np.searchsorted(AGE_BAND_EDGES, ages, side='right')
+    income_band = np.searchsorted(INCOME_BAND_EDGES, incomes, side='right')
+    return age_band * len(INCOME_BANDS) + income_band
+
+def _goal_frame(users, goals, contributions):
+    """One row per goal with its owner's cell, the target as a share of income and the observed pace"""
+    import pandas as pd
+
+    users = users[['user_id', 'age', 'income']].dropna()
+    users = users[users['income'] > 0]
+    frame = goals.merge(users, on='user_id', how='inner')
+
+    category = pd.Categorical(frame['category'].astype(str).str.lower(), categories=GOAL_TYPES).codes
+    frame['type'] = np.where(category < 0, GOAL_TYPES.index('other'), category)
+    frame['amount_ratio'] = frame['target_amount'].astype(float) / frame['income']
+    frame['completed'] = frame['status'].astype(str) == 'completed'
+
+    if 'completed_at' in frame and 'created_at' in frame:
+        days = (pd.to_datetime(frame['completed_at'], errors='coerce', utc=True)
+                - pd.to_datetime(frame['created_at'], errors='coerce', utc=True)).dt.days
+        frame['months_to_complete'] = np.where(frame['completed'], days / DAYS_PER_MONTH, np.nan)
+    else:
+        frame['months_to_complete'] = np.nan
+
+    frame['pace_ratio'] = np.nan
+    if contributions is not None and len(contributions):
+        paid = contributions.assign(paid_at=pd.to_datetime(contributions['paid_at'], errors='coerce', utc=True))
+        if 'status' in paid:
+            paid = paid[paid['status'].astype(str) == 'completed']
+        per_goal = paid.groupby('goal_id').agg(total=('amount', 'sum'), first=('paid_at', 'min'), last=('paid_at', 'max'))
+        months = np.maximum((per_goal['last'] - per_goal['first']).dt.days / DAYS_PER_MONTH, 1.0)
+        frame = frame.drop(columns='pace_ratio').merge(
+            (per_goal['total'] / months).rename('monthly_contribution'), left_on='goal_id', right_index=True, how='left'
+        )
+        # Monthly saving as a share of annual income, so pace and target compare without the income
+        frame['pace_ratio'] = frame['monthly_contribution'] / frame['income']
+
+    frame['cell'] = _cell_ids(frame['age'].to_numpy(), frame['income'].to_numpy())
+    return frame, users
+
+def _cohort_rows(goals, cohort_users):
+    """Ranked (type, amount_ratio, timeline, score, completion_rate, adoption) rows for one cohort's goals"""
+    rows = []
+    for type_code, group in goals.groupby('type'):
+        goal_count = len(group)
+        completed = int(group['completed'].sum())
+        adoption = group['user_id'].nunique() / cohort_users
+        # Smoothed so a type with one completed goal does not outrank well-established ones
+        completion_rate = (completed + 1) / (goal_count + 2)
+        amount_ratio = float(group['amount_ratio'].median())
+        pace_ratio = group['pace_ratio'].median()
+        months_to_complete = group['months_to_complete'].median()
+        if pace_ratio > 0:
+            timeline = amount_ratio / pace_ratio
+        elif months_to_complete > 0:
+            timeline = months_to_complete
+        else:
+            timeline = DEFAULT_TIMELINE_MONTHS
+        timeline = int(min(max(math.ceil(timeline), 1), MAX_TIMELINE_MONTHS))
+        rows.append((int(type_code), amount_ratio, timeline, adoption * completion_rate, completion_rate, adoption))
+    rows.sort(key=lambda row: -row[3])
+    return rows
+
+@instrumented(COMPONENT, 'build')
+def build_cohort_index(users, goals, contributions=None, min_cohort_users=MIN_COHORT_USERS):
+    """Aggregate goal and contribution exports into a CohortIndex
+
+    users has user_id, age and income (annual); goals has goal_id,
+    user_id, category, target_amount, status and, optionally, created_at
+    and completed_at; contributions (optional) has goal_id, amount,
+    paid_at and an optional status. Each cell ranks goal types by
+    adoption x completion rate within the finest cohort that has at least
+    min_cohort_users users.
+    """
+    frame, users = _goal_frame(users, goals, contributions)
+    frame = frame[np.isfinite(frame['amount_ratio']) & (frame['amount_ratio'] > 0)]
+    stride = len(INCOME_BANDS)
+    user_cells = _cell_ids(users['age'].to_numpy(), users['income'].to_numpy())
+    frame_age_band = frame['cell'].to_numpy() // stride
+
+    cell_users = np.bincount(user_cells, minlength=len(AGE_BANDS) * len(INCOME_BANDS))
+    age_users = np.bincount(user_cells // stride, minlength=len(AGE_BANDS))
+    by_cell = {cell: group for cell, group in frame.groupby('cell')}
+    by_age = {band: group for band, group in frame.groupby(frame_age_band)}
+    overall = _cohort_rows(frame, max(len(users), 1))
+    age_rows = {}
+
+    cells = []
+    for cell, users_in_cell in enumerate(cell_users):
+        age_band = cell // stride
+        if users_in_cell >= min_cohort_users and cell in by_cell:
+            cells.append((COHORT_LEVELS.index('age_income'), int(users_in_cell), _cohort_rows(by_cell[cell], users_in_cell)))
+        elif age_users[age_band] >= min_cohort_users and age_band in by_age:
+            if age_band not in age_rows:
+                age_rows[age_band] = _cohort_rows(by_age[age_band], age_users[age_band])
+            cells.append((COHORT_LEVELS.index('age'), int(age_users[age_band]), age_rows[age_band]))
+        else:
+            cells.append((COHORT_LEVELS.index('all'), len(users), overall))
+    return CohortIndex(cells, built_at=datetime.now().isoformat(), min_cohort_users=min_cohort_users)
+
+class CohortIndex:
+    def __init__(self, cells, built_at=None, min_cohort_users=MIN_COHORT_USERS):
+        """Ranked goal rows per (age band, income band) cell, packed into [cell, rank] arrays
+
+        cells holds (level code, cohort users, rows) per flat cell index,
+        with rows as built by build_cohort_index.
+        """
+        self.built_at = built_at
+        self.min_cohort_users = min_cohort_users
+        depth = max([len(rows) for _, _, rows in cells] + [1])
+        shape = (len(cells), depth)
+        self.types = np.full(shape, -1, dtype=np.int8)
+        self.amount_ratio = np.zeros(shape)
+        self.timeline_months = np.zeros(shape, dtype=np.int32)
+        self.scores = np.zeros(shape)
+        self.completion_rate = np.zeros(shape)
+        self.adoption = np.zeros(shape)
+        self.levels = np.array([level for level, _, _ in cells], dtype=np.int8)
+        self.cohort_users = np.array([users for _, users, _ in cells], dtype=np.int64)
+        for cell, (_, _, rows) in enumerate(cells):
+            for rank, row in enumerate(rows):
+                (self.types[cell, rank], self.amount_ratio[cell, rank], self.timeline_months[cell, rank],
+                 self.scores[cell, rank], self.completion_rate[cell, rank], self.adoption[cell, rank]) = row
+        self.depth = (self.types >= 0).sum(axis=1)
+        # Plain-Python copies for single lookups, which would otherwise pay for numpy scalar access
+        self._cohorts = [self.cohort(cell) for cell in range(len(cells))]
+        self._rows = [
+            [
+                (GOAL_TYPES[goal_type],) + GOAL_DETAILS[GOAL_TYPES[goal_type]]
+                + (float(amount_ratio), int(timeline), round(float(score), 4), round(float(completion_rate), 4),
+                   round(float(adoption), 4))
+                for goal_type, amount_ratio, timeline, score, completion_rate, adoption in rows
+            ]
+            for _, _, rows in cells
+        ]
+
+    def cohort(self, cell):
+        age_band, income_band = divmod(int(cell), len(INCOME_BANDS))
+        return {
+            'age_band': AGE_BANDS[age_band],
+            'income_band': INCOME_BANDS[income_band],
+            'level': COHORT_LEVELS[self.levels[cell]],
+            'users': int(self.cohort_users[cell])
+        }
+
+    def recommend(self, age, income, top_k=DEFAULT_TOP_K):
+        """Top-k goals for one user, with amounts and timelines scaled to their income"""
+        cell = bisect.bisect_right(AGE_BAND_EDGES, age) * len(INCOME_BANDS) + bisect.bisect_right(INCOME_BAND_EDGES, income)
+        recommendations = []
+        for rank, row in enumerate(self._rows[cell][:int(top_k)]):
+            goal_type, name, description, amount_ratio, timeline_months, score, completion_rate, adoption = row
+            # Rounded the way np.round does, so these match the batch scores to the cent
+            target_amount = round(amount_ratio * income * 100) / 100
+            recommendations.append({
+                'type': goal_type,
+                'name': name,
+                'target_amount': target_amount,
+                'timeline_months': timeline_months,
+                'monthly_savings': round(target_amount / timeline_months * 100) / 100,
+                'priority': 'high' if rank == 0 else 'medium',
+                'description': description,
+                'score': score,
+                'completion_rate': completion_rate,
+                'adoption': adoption
+            })
+        return recommendations, dict(self._cohorts[cell])
+
+    @instrumented(COMPONENT, 'score_batch')
+    def score(self, users, top_k=DEFAULT_TOP_K):
+        """Top-k recommendations for every row of a users DataFrame (user_id, age, income), one row per goal
+
+        Users without an age or a positive income get no rows.
+        """
+        import pandas as pd
+
+        users = users[['user_id', 'age', 'income']].dropna()
+        users = users[users['income'] > 0]
+        incomes = users['income'].to_numpy(dtype=float)
+        cells = _cell_ids(users['age'].to_numpy(), incomes)
+        top_k = max(1, min(int(top_k), self.types.shape[1]))
+
+        # [user, rank] gathers, flattened to the ranks each user's cell actually has
+        present = self.types[cells, :top_k] >= 0
+        user_index, rank = np.nonzero(present)
+        cell = cells[user_index]
+        target_amount = np.round(self.amount_ratio[cell, rank] * incomes[user_index], 2)
+        timeline_months = self.timeline_months[cell, rank]
+        return pd.DataFrame({
+            'user_id': users['user_id'].to_numpy()[user_index],
+            'rank': rank + 1,
+            'type': pd.Categorical.from_codes(self.types[cell, rank], GOAL_TYPES),
+            'target_amount': target_amount,
+            'timeline_months': timeline_months,
+            'monthly_savings': np.round(target_amount / timeline_months, 2),
+            'score': np.round(self.scores[cell, rank], 4),
+            'cohort_level': pd.Categorical.from_codes(self.levels[cell], COHORT_LEVELS)
+        })
+
+    def to_dict(self):
+        return {
+            'version': INDEX_VERSION,
+            'built_at': self.built_at,
+            'min_cohort_users': self.min_cohort_users,
+            'age_band_edges': list(AGE_BAND_EDGES),
+            'income_band_edges': list(INCOME_BAND_EDGES),
+            'goal_types': list(GOAL_TYPES),
+            'cells': [
+                {
+                    'level': COHORT_LEVELS[self.levels[cell]],
+                    'users': int(self.cohort_users[cell]),
+                    'goals': [
+                        [GOAL_TYPES[self.types[cell, rank]], float(self.amount_ratio[cell, rank]),
+                         int(self.timeline_months[cell, rank]), float(self.scores[cell, rank]),
+                         float(self.completion_rate[cell, rank]), float(self.adoption[cell, rank])]
+                        for rank in range(int(self.depth[cell]))
+                    ]
+                }
+                for cell in range(len(self.levels))
+            ]
+        }
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save(); it must match this module's bands and goal types"""
+        with open(path) as f:
+            data = json.load(f)
+        layout = (data.get('age_band_edges'), data.get('income_band_edges'), data.get('goal_types'))
+        if data.get('version') != INDEX_VERSION or layout != (list(AGE_BAND_EDGES), list(INCOME_BAND_EDGES), list(GOAL_TYPES)):
+            raise ValueError(f"{path} was built with a different index layout, rebuild it")
+        cells = [
+            (COHORT_LEVELS.index(cell['level']), cell['users'],
+             [(GOAL_TYPES.index(goal[0]),) + tuple(goal[1:]) for goal in cell['goals']])
+            for cell in data['cells']
+        ]
+        return cls(cells, built_at=data.get('built_at'), min_cohort_users=data.get('min_cohort_users'))
+
+def load_cohort_index(path=None):
+    """Load the index at AI_GOAL_COHORTS (None when unset or unreadable, which keeps the fixed brackets)"""
+    path = path or os.getenv('AI_GOAL_COHORTS')
+    if not path:
+        return None
+    try:
+        index = CohortIndex.load(path)
+        print(f"✅ Goal cohort index loaded from {path} (built {index.built_at})")
+        return index
+    except (OSError, KeyError, ValueError) as e:
+        print(f"⚠️ Could not load goal cohort index {path}: {e}")
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Aggregate goal/contribution exports into a cohort index')
+    build.add_argument('--users', required=True, help='user_id, age, income (CSV or Parquet)')
+    build.add_argument('--goals', required=True, help='goal_id, user_id, category, target_amount, status, created_at, completed_at')
+    build.add_argument('--contributions', help='goal_id, amount, paid_at[, status]')
+    build.add_argument('--min-cohort-users', type=int, default=MIN_COHORT_USERS)
+    build.add_argument('--out', required=True, help='Index file to write (JSON)')
+
+    score = commands.add_parser('score', help='Write top-k recommendations for every user')
+    score.add_argument('--index', required=True, help='Index written by build')
+    score.add_argument('--users', required=True, help='user_id, age, income (CSV or Parquet)')
+    score.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    score.add_argument('--out', required=True, help='.csv, .parquet or .jsonl, one row per recommended goal')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        contributions = read_table(args.contributions) if args.contributions else None
+        index = build_cohort_index(read_table(args.users), read_table(args.goals), contributions, args.min_cohort_users)
+        index.save(args.out)
+        levels = np.bincount(index.levels, minlength=len(COHORT_LEVELS))
+        print(f"✅ Cohort index written to {args.out}: "
+              + ', '.join(f"{count} cells from {level}" for level, count in zip(COHORT_LEVELS, levels)))
+    else:
+        recommendations = CohortIndex.load(args.index).score(read_table(args.users), args.top_k)
+        write_table(recommendations, args.out)
+        print(f"✅ {len(recommendations)} recommendations for {recommendations['user_id'].nunique()} users written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import ctypes
+import os
+
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+# Backends selectable through AI_BACKEND
+BACKENDS = ('auto', 'fp16', 'bf16', 'fp32', 'int8', 'int4')
+QUANTIZED_BACKENDS = ('int8', 'int4')
+
+# Layers left in full precision; the output projection dominates parity loss
+SKIP_MODULES = ('lm_head',)
+
+def resolve_backend(name=None):
+    """Concrete backend for a configured name ("auto" keeps fp16 on GPU and fp32 on CPU)"""
+    name = (name or os.getenv('AI_BACKEND', 'auto')).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown AI_BACKEND '{name}', expected one of {', '.join(BACKENDS)}")
+    if name == 'auto':
+        return 'fp16' if torch.cuda.is_available() else 'fp32'
+    return name
+
+class Int4Linear(nn.Module):
+    def __init__(self, linear, group_size=128):
+        """Weight-only int4 linear layer: symmetric per-group scales, two weights packed per byte
+
+        Weights are dequantized on the fly for each forward pass, trading some
+        speed for roughly a quarter of the fp16 weight memory.
+        """
+        super().__init__()
+        self.in_features = linear.in_features
+        self.out_features = linear.out_features
+        self.group_size = min(group_size, self.in_features)
+        if self.in_features % self.group_size or self.group_size % 2:
+            raise ValueError(f"in_features={self.in_features} is not divisible into groups of {self.group_size}")
+
+        weight = linear.weight.detach().float().reshape(self.out_features, -1, self.group_size)
+        scales = weight.abs().amax(dim=-1, keepdim=True).clamp(min=1e-8) / 7
+        quantized = torch.clamp(torch.round(weight / scales), -8, 7).to(torch.int8) + 8
+        quantized = quantized.reshape(self.out_features, -1).to(torch.uint8)
+
+        self.register_buffer('packed_weight', quantized[:, 0::2] | (quantized[:, 1::2] << 4))
+        self.register_buffer('scales', scales.squeeze(-1).to(torch.float16))
+        if linear.bias is not None:
+            self.bias = nn.Parameter(linear.bias.detach().float(), requires_grad=False)
+        else:
+            self.bias = None
+
+    def dequantize(self):
+        """Float32 weight matrix reconstructed from the packed nibbles"""
+        low = (self.packed_weight & 0x0F).to(torch.int8) - 8
+        high = (self.packed_weight >> 4).to(torch.int8) - 8
+        weight = torch.stack((low, high), dim=-1).reshape(self.out_features, -1, self.group_size)
+        return (weight.float() * self.scales.float().unsqueeze(-1)).reshape(self.out_features, self.in_features)
+
+    def forward(self, x):
+        return F.linear(x, self.dequantize().to(x.dtype), None if self.bias is None else self.bias.to(x.dtype))
+
+    def extra_repr(self):
+        return f"in_features={self.in_features}, out_features={self.out_features}, group_size={self.group_size}"
+
+def _int8_linear(linear):
+    """Dynamically quantized int8 linear (int8 weights, int8 matmul through fbgemm/onednn)"""
+    from torch.ao.nn.quantized.dynamic import Linear as DynamicQuantizedLinear
+    from torch.ao.quantization import default_dynamic_qconfig
+
+    linear = linear.float()
+    linear.qconfig = default_dynamic_qconfig
+    return DynamicQuantizedLinear.from_float(linear)
+
+def quantize_linear_layers(model, backend, group_size=128, skip=SKIP_MODULES):
+    """Replace every nn.Linear outside `skip` with its quantized counterpart, one layer at a time
+
+    Converting layer by layer keeps peak memory close to the size of the
+    half-precision checkpoint instead of a full float32 copy. Returns the
+    number of layers replaced.
+    """
+    replaced = 0
+    for parent_name, parent in list(model.named_modules()):
+        for child_name, child in list(parent.named_children()):
+            full_name = f"{parent_name}.{child_name}" if parent_name else child_name
+            if not isinstance(child, nn.Linear) or full_name.split('.')[-1] in skip:
+                continue
+            if backend == 'int8':
+                quantized = _int8_linear(child)
+            else:
+                quantized = Int4Linear(child, group_size)
+            setattr(parent, child_name, quantized)
+            replaced += 1
+    return replaced
+
+def model_memory_bytes(model):
+    """Bytes held by parameters, buffers and packed quantized weights"""
+    total = sum(t.numel() * t.element_size() for t in model.parameters())
+    total += sum(t.numel() * t.element_size() for t in model.buffers())
+    for module in model.modules():
+        if callable(getattr(module, '_weight_bias', None)):
+            weight, bias = module._weight_bias()
+            total += weight.numel() * weight.element_size()
+            total += 0 if bias is None else bias.numel() * bias.element_size()
+    return total
+
+def _release_freed_memory():
+    """Hand the half-precision weights freed during quantization back to the OS (glibc only)"""
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+def load_causal_lm(model_name, backend=None, group_size=None):
+    """Load a causal LM and its tokenizer for the given backend; returns (model, tokenizer, backend)
+
+    Weights come from the local weight cache when it has them (see
+    ai/weight_cache.py), so restarts skip the download and deserialization.
+    """
+    from ai.weight_cache import load_model_and_tokenizer
+
+    backend = resolve_backend(backend)
+    group_size = group_size or int(os.getenv('AI_INT4_GROUP_SIZE', '128'))
+
+    if backend not in QUANTIZED_BACKENDS:
+        model, tokenizer = load_model_and_tokenizer(model_name, backend, device_map="auto")
+        return model, tokenizer, backend
+
+    # Quantized backends run on CPU: load at half precision, quantize, then lift the rest to float32
+    threads = os.getenv('AI_CPU_THREADS')
+    if threads:
+        torch.set_num_threads(int(threads))
+    model, tokenizer = load_model_and_tokenizer(model_name, 'bf16', low_cpu_mem_usage=True)
+    quantize_linear_layers(model, backend, group_size)
+    model.float()
+    model.eval()
+    _release_freed_memory()
+    return model, tokenizer, backend
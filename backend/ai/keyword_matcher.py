@@ -0,0 +1,82 @@
+import re
+
+VOWELS = 'aeiou'
+
+def _word_forms(keyword):
+    """The keyword plus its common inflections ("save" -> saves, saved, saving, savings; "plan" -> planned, planning)"""
+    forms = {keyword, keyword + 's', keyword + 'es', keyword + 'ed', keyword + 'ing', keyword + 'ings'}
+    if keyword.endswith('e'):
+        stem = keyword[:-1]
+        forms.update({keyword + 'd', stem + 'ing', stem + 'ings'})
+    if (len(keyword) >= 3 and keyword[-1] not in VOWELS + 'wxy' and keyword[-2] in VOWELS
+            and keyword[-3] not in VOWELS):
+        # Consonant-vowel-consonant endings double the consonant (cut -> cutting); for
+        # words that do not ("budget"), the extra forms are never written and cost nothing
+        doubled = keyword + keyword[-1]
+        forms.update({doubled + 'ed', doubled + 'ing', doubled + 'ings'})
+    return forms
+
+def _trie_pattern(words):
+    """Regex alternation factored by common prefixes, so each position is tried against one branch per character"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+class KeywordMatcher:
+    def __init__(self, categories):
+        """Match several keyword categories in one pass over the text
+
+        `categories` maps a category name to its keywords. Matching is on whole
+        words (plus simple inflections), so "save" matches "savings" but not
+        "unsaved". A keyword may belong to several categories.
+        """
+        self.categories = {name: tuple(keywords) for name, keywords in categories.items()}
+
+        self._keyword_categories = {}
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword.lower(), []).append(name)
+
+        self._form_keyword = {}
+        for keyword in self._keyword_categories:
+            for form in _word_forms(keyword):
+                self._form_keyword.setdefault(form, keyword)
+
+        self._pattern = re.compile(r'\b' + _trie_pattern(self._form_keyword) + r'\b')
+
+    def keywords(self, text):
+        """Occurrences of each keyword in the text"""
+        found = {}
+        lookup = self._form_keyword
+        for form in self._pattern.findall(text.lower()):
+            keyword = lookup[form]
+            found[keyword] = found.get(keyword, 0) + 1
+        return found
+
+    def count(self, text, distinct=False):
+        """Per-category counts: occurrences, or the number of different keywords when distinct=True"""
+        counts = dict.fromkeys(self.categories, 0)
+        if distinct:
+            lookup = self._form_keyword
+            matched = {lookup[form] for form in set(self._pattern.findall(text.lower()))}
+            for keyword in matched:
+                for name in self._keyword_categories[keyword]:
+                    counts[name] += 1
+            return counts
+
+        for keyword, occurrences in self.keywords(text).items():
+            for name in self._keyword_categories[keyword]:
+                counts[name] += occurrences
+        return counts
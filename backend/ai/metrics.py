@@ -0,0 +1,232 @@
+import bisect
+import os
+import threading
+import time
+from functools import wraps
+
+# Latency buckets in seconds, from sub-millisecond calculators to long generations
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+THROUGHPUT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        """One metric family; each distinct set of label values is its own series"""
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, [(label, value), ...], value) rows in exposition order"""
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            series = dict(self._series)
+        for key, value in sorted(series.items()):
+            yield '', list(zip(self.labelnames, key)), value
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def samples(self):
+        with self._lock:
+            series = dict(self._series)
+        for key, value in sorted(series.items()):
+            yield '', list(zip(self.labelnames, key)), value
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        if self.registry.enabled:
+            self._observe(self._key(labels), value)
+
+    def _observe(self, key, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield '_bucket', labels + [('le', _format_value(bound))], cumulative
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+class StageTimer:
+    __slots__ = ('histogram', 'key', 'start')
+
+    def __init__(self, histogram, key):
+        """Context manager observing the time spent inside it (a no-op while metrics are disabled)"""
+        self.histogram = histogram
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.histogram.registry.enabled:
+            self.histogram._observe(self.key, time.perf_counter() - self.start)
+
+class Registry:
+    def __init__(self, enabled=True):
+        """Metric families plus collectors that report component stats at scrape time"""
+        self.enabled = enabled
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, collect):
+        """collect() returns (name, kind, documentation, labels dict, value) rows, read on every scrape"""
+        self._collectors.append(collect)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        families = {}
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            families[metric.name] = (metric.kind, metric.documentation, list(metric.samples()))
+        for collect in collectors:
+            try:
+                rows = list(collect())
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+                continue
+            for name, kind, documentation, labels, value in rows:
+                family = families.setdefault(name, (kind, documentation, []))
+                family[2].append(('', sorted(labels.items()), value))
+
+        lines = []
+        for name, (kind, documentation, samples) in families.items():
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry(enabled=os.getenv('AI_METRICS', 'true').lower() in ('1', 'true', 'yes'))
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'loopfund_request_duration_seconds', 'Request latency by endpoint (time to response headers for streams)',
+    ('endpoint', 'method', 'status')
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    'loopfund_stage_duration_seconds', 'Time spent in each processing stage', ('component', 'stage')
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    'loopfund_queue_wait_seconds', 'Time requests wait in a queue before being served', ('queue',)
+)
+GENERATED_TOKENS = REGISTRY.counter(
+    'loopfund_generated_tokens_total', 'Tokens produced by the model', ('path',)
+)
+TOKENS_PER_SECOND = REGISTRY.histogram(
+    'loopfund_generation_tokens_per_second', 'Decoding throughput of each generate call', ('path',),
+    buckets=THROUGHPUT_BUCKETS
+)
+ERRORS = REGISTRY.counter(
+    'loopfund_errors_total', 'Errors caught while serving requests', ('component',)
+)
+
+def timed(component, stage):
+    """Time a block as one stage of a component: `with timed('financial_advisor', 'prompt_build'):`"""
+    # The label tuple is the series key as-is, which skips the per-call label lookup
+    return StageTimer(STAGE_SECONDS, (component, stage))
+
+def instrumented(component, stage):
+    """Decorator timing every call of a function as one stage of a component"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(component, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count_new_tokens(token_ids, pad_token_id=None):
+    """Generated tokens in a [batch, new tokens] id tensor, not counting padding after finished rows"""
+    if pad_token_id is None:
+        return int(token_ids.numel())
+    return int((token_ids != pad_token_id).sum())
+
+def record_generation(path, tokens, seconds):
+    """Count a finished generate call's tokens and its tokens/sec"""
+    GENERATED_TOKENS.inc(tokens, path=path)
+    if seconds > 0 and tokens:
+        TOKENS_PER_SECOND.observe(tokens / seconds, path=path)
@@ -0,0 +1,383 @@
+import itertools
+import multiprocessing
+import os
+import pickle
+import select
+import signal
+import struct
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Connection, wait
+from multiprocessing.reduction import recv_handle, send_handle
+
+from ai.batch_scheduler import BatchScheduler
+from ai.deadline import remaining_seconds
+
+def read_process_memory(pid):
+    """RSS, PSS and shared/private resident memory of a process in MB, from /proc"""
+    memory = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as rollup:
+            for line in rollup:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                    memory[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return {}
+    return {
+        'rss_mb': round(memory.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(memory.get('Pss', 0) / 1024, 1),
+        'shared_mb': round((memory.get('Shared_Clean', 0) + memory.get('Shared_Dirty', 0)) / 1024, 1),
+        'private_mb': round((memory.get('Private_Clean', 0) + memory.get('Private_Dirty', 0)) / 1024, 1)
+    }
+
+# How often the supervisor checks that its workers are alive
+SUPERVISOR_POLL_SECONDS = 0.2
+# How often an idle worker checks that its supervisor is still there
+WORKER_POLL_SECONDS = 1.0
+# Longest start() waits for the first workers to come up
+STARTUP_TIMEOUT_SECONDS = 60
+
+# Supervisor -> front end events: (event, worker index, pid or exit code). A
+# started event is followed by the front end's ends of the worker's job and
+# result pipes, passed as file descriptors.
+WORKER_STARTED = 'started'
+WORKER_EXITED = 'exited'
+
+# Jobs are pickled (job_id, item) tuples, each behind a 4-byte length
+FRAME_HEADER = struct.Struct('!I')
+
+def _read_exact(fd, size):
+    """size bytes from a blocking file descriptor, or None at end of file"""
+    chunks = []
+    while size:
+        chunk = os.read(fd, size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def _read_job(fd):
+    """Next (job_id, item) from a job pipe, or None once the front end has closed it"""
+    header = _read_exact(fd, FRAME_HEADER.size)
+    payload = header and _read_exact(fd, FRAME_HEADER.unpack(header)[0])
+    return pickle.loads(payload) if payload is not None else None
+
+def _worker_main(advisor, jobs, results, threads):
+    """Model worker: read (prompt, deadline) items from its job pipe and batch them through the inherited advisor"""
+    import torch
+
+    torch.set_num_threads(threads)
+    supervisor = os.getppid()
+    # Built after the fork, so no forward pass (and no compute thread pool) runs before forking
+    advisor._attach_prefix_cache()
+    # Replies come from the scheduler thread and this one
+    send_lock = threading.Lock()
+
+    def reply(job_id, future):
+        try:
+            message = (job_id, True, future.result())
+        except Exception as e:
+            message = (job_id, False, str(e))
+        with send_lock:
+            results.send(message)
+
+    # Threads do not survive fork, so each worker runs its own batch scheduler
+    scheduler = None
+    if advisor.max_batch_size > 1:
+        scheduler = BatchScheduler(advisor._generate_items, advisor.max_batch_size, advisor.batch_wait_ms)
+
+    while True:
+        if not select.select([jobs], [], [], WORKER_POLL_SECONDS)[0]:
+            if os.getppid() != supervisor:
+                break
+            continue
+        job = _read_job(jobs)
+        if job is None:
+            break
+        job_id, item = job
+        if scheduler:
+            scheduler.submit(item).add_done_callback(lambda future, job_id=job_id: reply(job_id, future))
+            continue
+        future = Future()
+        try:
+            future.set_result(advisor._generate_items([item])[0])
+        except Exception as e:
+            future.set_exception(e)
+        reply(job_id, future)
+
+    if scheduler:
+        scheduler.shutdown()
+
+def _supervisor_main(advisor, commands, events, threads, workers):
+    """Fork the model workers, then restart any that die until told to stop
+
+    This process is forked from the front end's main thread before it
+    serves anything and never starts a thread itself, so every worker, the
+    replacements included, is forked from a single-threaded process.
+    Each worker gets a fresh job pipe and result pipe of its own, created
+    here and handed to the front end over the events socket; a worker
+    killed mid-read or mid-write only ever damages its own pipes, which
+    are dropped with it.
+    """
+    front_end = os.getppid()
+    pids = [None] * workers
+
+    def spawn(index):
+        jobs_reader, jobs_writer = os.pipe()
+        results_reader, results_writer = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for fd in (jobs_writer, results_reader):
+                    os.close(fd)
+                commands.close()
+                events.close()
+                _worker_main(advisor, jobs_reader, Connection(results_writer, readable=False), threads)
+            except BaseException:
+                code = 1
+            finally:
+                # Skip the parent's atexit handlers
+                os._exit(code)
+        os.close(jobs_reader)
+        os.close(results_writer)
+        pids[index] = pid
+        events.send((WORKER_STARTED, index, pid))
+        send_handle(events, jobs_writer, front_end)
+        send_handle(events, results_reader, front_end)
+        os.close(jobs_writer)
+        os.close(results_reader)
+
+    for index in range(workers):
+        spawn(index)
+
+    stopping = False
+    while any(pid is not None for pid in pids):
+        if commands.poll(SUPERVISOR_POLL_SECONDS):
+            commands.recv()
+            stopping = True
+        if os.getppid() != front_end and not stopping:
+            # The front end died without shutting down: nobody is left to send work or read results
+            stopping = True
+            for pid in pids:
+                if pid is not None:
+                    os.kill(pid, signal.SIGTERM)
+        for index, pid in enumerate(pids):
+            if pid is None:
+                continue
+            finished, status = os.waitpid(pid, os.WNOHANG)
+            if not finished:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            pids[index] = None
+            if stopping or code == 0:
+                continue
+            events.send((WORKER_EXITED, index, code))
+            spawn(index)
+
+class ModelServer:
+    def __init__(self, advisor, workers=2, threads_per_worker=None):
+        """Forked model worker processes sharing the advisor's already-loaded weights
+
+        The weights are loaded once in the front-end process; workers are
+        forked afterwards, so the weight pages stay shared copy-on-write and
+        each worker only adds its own activations and KV cache. Jobs go to the
+        worker with the fewest in flight over that worker's own pipe, and
+        results come back over another.
+
+        Forking is only safe before other threads exist, so start() must run
+        on the main thread before serving; the workers are forked (and
+        restarted) by a single-threaded supervisor process.
+        """
+        self.advisor = advisor
+        self.workers = max(1, int(workers))
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+
+        self._context = multiprocessing.get_context('fork')
+        # Per worker: the non-blocking job pipe fd and the result Connection, None while it restarts
+        self._jobs = [None] * self.workers
+        self._results = [None] * self.workers
+        self._send_locks = [threading.Lock() for _ in range(self.workers)]
+        self._pids = [None] * self.workers
+        self._inflight = [dict() for _ in range(self.workers)]
+        self._job_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._stats = {'requests': 0, 'completed': 0, 'failed': 0, 'restarts': 0}
+        self._supervisor = None
+        self._commands = None
+        self._events = None
+        self._dispatcher = None
+
+    def start(self):
+        """Fork the worker supervisor, wait for its workers and start collecting results"""
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("The model server must be started on the main thread, before serving")
+        # The tokenizer was already used while loading; keep its thread pool out of the children
+        os.environ.setdefault('TOKENIZERS_PARALLELISM', 'false')
+        commands_reader, self._commands = self._context.Pipe(duplex=False)
+        # Duplex, so it is a Unix socket pair that can carry the workers' pipe fds
+        self._events, supervisor_events = self._context.Pipe()
+        self._supervisor = self._context.Process(
+            target=_supervisor_main,
+            args=(self.advisor, commands_reader, supervisor_events, self.threads_per_worker, self.workers),
+            name='model-supervisor',
+            daemon=True
+        )
+        self._supervisor.start()
+        commands_reader.close()
+        supervisor_events.close()
+
+        while None in self._jobs:
+            if not self._events.poll(STARTUP_TIMEOUT_SECONDS):
+                raise RuntimeError("Model workers did not start")
+            self._handle_event(*self._events.recv())
+        self._dispatcher = threading.Thread(target=self._collect_results, name='model-server-results', daemon=True)
+        self._dispatcher.start()
+        print(f"✅ Model server started with {self.workers} worker(s), {self.threads_per_worker} thread(s) each")
+        return self
+
+    def submit(self, item):
+        """Queue one (prompt, deadline) item on the least busy worker; returns a Future with its result
+
+        Sending waits for room in the worker's pipe no longer than the
+        item's deadline; past it the future fails with TimeoutError.
+        """
+        if self._stopped:
+            raise RuntimeError("Model server has been shut down")
+        future = Future()
+        with self._lock:
+            running = [index for index in range(self.workers) if self._jobs[index] is not None]
+            if not running:
+                raise RuntimeError("No model worker is running")
+            index = min(running, key=lambda i: len(self._inflight[i]))
+            job_id = next(self._job_ids)
+            self._inflight[index][job_id] = future
+            self._stats['requests'] += 1
+        payload = pickle.dumps((job_id, item))
+        try:
+            # Sent outside the main lock so a full pipe never holds up result collection
+            with self._send_locks[index]:
+                self._send_job(index, payload, item[1])
+        except (OSError, TimeoutError) as e:
+            with self._lock:
+                lost = self._inflight[index].pop(job_id, None)
+                if lost is not None:
+                    self._stats['failed'] += 1
+            if lost is not None:
+                lost.set_exception(e if isinstance(e, TimeoutError) else RuntimeError(f"Model worker unavailable: {e}"))
+        return future
+
+    def _send_job(self, index, payload, deadline):
+        """Write one framed job to a worker's pipe, polling for room until the deadline (held under its send lock)"""
+        fd = self._jobs[index]
+        if fd is None:
+            raise BrokenPipeError("Model worker is restarting")
+        frame = memoryview(FRAME_HEADER.pack(len(payload)) + payload)
+        written = 0
+        while written < len(frame):
+            if not select.select([], [fd], [], remaining_seconds(deadline))[1]:
+                if written and self._pids[index] is not None:
+                    # Half a job is in the pipe and nothing else can follow it: replace the worker
+                    os.kill(self._pids[index], signal.SIGKILL)
+                raise TimeoutError("Model worker did not take the job before its deadline")
+            try:
+                written += os.write(fd, frame[written:])
+            except BlockingIOError:
+                continue
+
+    def run(self, item, timeout=None):
+        """Submit an item and block until its result is ready"""
+        return self.submit(item).result(timeout=timeout)
+
+    def _collect_results(self):
+        while not self._stopped:
+            connections = [self._events] + [results for results in self._results if results is not None]
+            for ready in wait(connections, SUPERVISOR_POLL_SECONDS):
+                if ready is self._events:
+                    try:
+                        # Worker events are handled as they come, so a dead worker is noticed under traffic too
+                        self._handle_event(*self._events.recv())
+                    except EOFError:
+                        print("❌ Model supervisor exited")
+                        self._stopped = True
+                        return
+                    continue
+                if ready not in self._results:
+                    continue
+                index = self._results.index(ready)
+                try:
+                    job_id, ok, value = ready.recv()
+                except (EOFError, OSError):
+                    # The worker is gone; the supervisor's exit event fails its jobs
+                    self._results[index] = None
+                    ready.close()
+                    continue
+                with self._lock:
+                    future = self._inflight[index].pop(job_id, None)
+                    self._stats['completed' if ok else 'failed'] += 1
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(RuntimeError(value))
+
+    def _handle_event(self, event, index, value):
+        """Install a (re)started worker's pipes, or drop a dead worker's pipes and fail its jobs"""
+        if event == WORKER_STARTED:
+            jobs = recv_handle(self._events)
+            results = Connection(recv_handle(self._events), writable=False)
+            os.set_blocking(jobs, False)
+            self._results[index] = results
+            with self._lock:
+                self._pids[index] = value
+                self._jobs[index] = jobs
+            return
+        print(f"❌ Model worker {index} (pid {self._pids[index]}) exited with code {value}; restarting")
+        with self._lock:
+            jobs, self._jobs[index] = self._jobs[index], None
+            self._pids[index] = None
+            lost, self._inflight[index] = self._inflight[index], {}
+            self._stats['failed'] += len(lost)
+            self._stats['restarts'] += 1
+        if jobs is not None:
+            # A send in progress fails fast on the dead pipe, so this lock is not held for long
+            with self._send_locks[index]:
+                os.close(jobs)
+        results, self._results[index] = self._results[index], None
+        if results is not None:
+            results.close()
+        for future in lost.values():
+            future.set_exception(RuntimeError("Model worker exited"))
+
+    def stats(self):
+        """Request counters plus per-worker memory, for sizing nodes"""
+        with self._lock:
+            stats = dict(self._stats)
+            inflight = [len(jobs) for jobs in self._inflight]
+            pids = list(self._pids)
+        stats['workers'] = [
+            dict(read_process_memory(pid), index=index, pid=pid, alive=pid is not None and os.path.exists(f'/proc/{pid}'),
+                 inflight=inflight[index])
+            for index, pid in enumerate(pids)
+        ]
+        stats['front_end'] = dict(read_process_memory(os.getpid()), pid=os.getpid())
+        stats['threads_per_worker'] = self.threads_per_worker
+        return stats
+
+    def shutdown(self):
+        """Stop the workers after they finish the jobs already queued (closing a job pipe ends its worker)"""
+        self._stopped = True
+        self._commands.send(None)
+        for index in range(self.workers):
+            with self._send_locks[index]:
+                with self._lock:
+                    jobs, self._jobs[index] = self._jobs[index], None
+                if jobs is not None:
+                    os.close(jobs)
+        self._supervisor.join(timeout=30)
+        if self._supervisor.is_alive():
+            self._supervisor.terminate()
@@ -0,0 +1,96 @@
+import time
+
+from ai.metrics import count_new_tokens, record_generation, timed
+
+class PrefixKVCache:
+    def __init__(self, model, tokenizer, prefix):
+        """Run the shared prompt prefix through the model once and keep its key/value state"""
+        import torch
+
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prefix = prefix
+        # Prompts that tokenized differently across the prefix boundary
+        self.fallbacks = 0
+
+        # The prefix's last token can merge with the text that follows it (trailing
+        # whitespace usually does), so the cached state stops one token short
+        prefix_ids = tokenizer(prefix, return_tensors='pt').input_ids
+        prefix_ids = prefix_ids[:, :max(1, prefix_ids.shape[1] - 1)]
+        self.prefix_ids = prefix_ids.to(model.device)
+        self._prefix_id_list = prefix_ids[0].tolist()
+        with torch.no_grad():
+            outputs = model(self.prefix_ids, use_cache=True)
+        # Legacy tuple format: one (key, value) pair per layer, shaped
+        # [batch, heads, prefix_tokens, head_dim]. Generation concatenates onto
+        # these tensors rather than writing into them, so they can be shared.
+        self.past_key_values = tuple(
+            (key.detach(), value.detach()) for key, value in outputs.past_key_values
+        )
+
+    @property
+    def prefix_length(self):
+        return self.prefix_ids.shape[1]
+
+    def _expand_past(self, batch_size):
+        """Broadcast the cached state across a batch without copying it"""
+        return tuple(
+            (key.expand(batch_size, -1, -1, -1), value.expand(batch_size, -1, -1, -1))
+            for key, value in self.past_key_values
+        )
+
+    def build_inputs(self, prompts):
+        """Model inputs that reuse the cached prefix state, or None when a prompt cannot use it
+
+        Each full prompt is tokenized and the prefix ids sliced off, so the
+        suffix gets the same ids as on the uncached path; prompts whose ids
+        do not start with the cached prefix ids (a merge across the
+        boundary) return None and go through the full prompt instead.
+        """
+        with timed('financial_advisor', 'tokenize'):
+            return self._build_inputs(prompts)
+
+    def _build_inputs(self, prompts):
+        import torch
+
+        if not all(prompt.startswith(self.prefix) for prompt in prompts):
+            return None
+        suffixes = []
+        for ids in self.tokenizer(prompts, return_attention_mask=False).input_ids:
+            if ids[:self.prefix_length] != self._prefix_id_list or len(ids) == self.prefix_length:
+                self.fallbacks += 1
+                return None
+            suffixes.append(ids[self.prefix_length:])
+
+        # Suffixes are right-aligned so every row ends on its last prompt token;
+        # the pads between prefix and suffix are masked out, and position ids
+        # (derived from the mask) continue straight on from the prefix.
+        pad_token_id = self.tokenizer.pad_token_id
+        if pad_token_id is None:
+            pad_token_id = self.tokenizer.eos_token_id
+        width = max(len(ids) for ids in suffixes)
+        batch_size = len(prompts)
+        suffix_ids = torch.tensor([[pad_token_id] * (width - len(ids)) + ids for ids in suffixes], device=self.model.device)
+        suffix_mask = torch.tensor([[0] * (width - len(ids)) + [1] * len(ids) for ids in suffixes], device=self.model.device)
+        return {
+            'input_ids': torch.cat([self.prefix_ids.expand(batch_size, -1), suffix_ids], dim=1),
+            'attention_mask': torch.cat([
+                torch.ones(batch_size, self.prefix_length, dtype=suffix_mask.dtype, device=self.model.device),
+                suffix_mask
+            ], dim=1),
+            'past_key_values': self._expand_past(batch_size)
+        }
+
+    def generate(self, inputs, **generation_kwargs):
+        """Generate continuations for inputs from build_inputs and return only the new text"""
+        import torch
+
+        generation_kwargs.setdefault('pad_token_id', self.tokenizer.pad_token_id)
+        started = time.perf_counter()
+        with torch.no_grad(), timed('financial_advisor', 'decode'):
+            outputs = self.model.generate(**inputs, **generation_kwargs)
+
+        new_tokens = outputs[:, inputs['input_ids'].shape[1]:]
+        record_generation('prefix_cache', count_new_tokens(new_tokens, generation_kwargs['pad_token_id']), time.perf_counter() - started)
+        with timed('financial_advisor', 'detokenize'):
+            return self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
@@ -0,0 +1,177 @@
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# Rough characters-per-token ratio used until a tokenizer is attached
+CHARS_PER_TOKEN = 4
+
+class PromptBuilder:
+    def __init__(self, tokenizer=None, max_prompt_tokens=None, history_tokens=None, context_tokens=None,
+                 question_tokens=None, summary_tokens=None, cache_size=4096):
+        """Fit chat history, user context and the question into fixed token budgets
+
+        Recent turns are kept verbatim, newest first, while they fit in the
+        history budget; older turns are compacted into one summary line and
+        the rest dropped. Token counts of segments (turns, contexts, the
+        static prefix) are cached, so a conversation's earlier turns are
+        only tokenized once.
+        """
+        self.tokenizer = tokenizer
+        self.max_prompt_tokens = max_prompt_tokens or int(os.getenv('AI_MAX_PROMPT_TOKENS', '1024'))
+        self.history_tokens = history_tokens or int(os.getenv('AI_HISTORY_TOKENS', '384'))
+        self.context_tokens = context_tokens or int(os.getenv('AI_CONTEXT_TOKENS', '128'))
+        self.question_tokens = question_tokens or int(os.getenv('AI_QUESTION_TOKENS', '256'))
+        self.summary_tokens = summary_tokens or int(os.getenv('AI_SUMMARY_TOKENS', '64'))
+        self.cache_size = cache_size
+
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+        self._tokenizer_lock = threading.Lock()
+        self._stats = {
+            'prompts': 0, 'turns_verbatim': 0, 'turns_summarized': 0, 'turns_dropped': 0,
+            'truncations': 0, 'cache_hits': 0, 'cache_misses': 0
+        }
+
+    def attach_tokenizer(self, tokenizer):
+        """Count with a private copy of the model tokenizer
+
+        Fast tokenizers cannot be used from two threads at once ("Already
+        borrowed"), and the generation thread keeps using the original.
+        """
+        self.tokenizer = copy.deepcopy(tokenizer)
+
+    def _encode(self, text):
+        with self._tokenizer_lock:
+            return self.tokenizer(text, add_special_tokens=False).input_ids
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def count_tokens(self, text):
+        """Token count of a text segment, memoized per segment"""
+        if not text:
+            return 0
+        with self._lock:
+            count = self._counts.get(text)
+            if count is not None:
+                self._counts.move_to_end(text)
+                self._stats['cache_hits'] += 1
+                return count
+            self._stats['cache_misses'] += 1
+
+        if self.tokenizer is None:
+            count = -(-len(text) // CHARS_PER_TOKEN)
+        else:
+            count = len(self._encode(text))
+
+        with self._lock:
+            self._counts[text] = count
+            if len(self._counts) > self.cache_size:
+                self._counts.popitem(last=False)
+        return count
+
+    def truncate(self, text, max_tokens):
+        """Keep the beginning of a text that fits in max_tokens"""
+        if max_tokens <= 0:
+            return ''
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        self._count('truncations')
+        if self.tokenizer is None:
+            return text[:max_tokens * CHARS_PER_TOKEN].rstrip() + '…'
+        ids = self._encode(text)[:max_tokens]
+        with self._tokenizer_lock:
+            text = self.tokenizer.decode(ids, skip_special_tokens=True)
+        return text.rstrip() + '…'
+
+    def format_user_context(self, user_context):
+        """Compact "key: value" rendering of the user context, without empty fields"""
+        if not user_context:
+            return ''
+        if not isinstance(user_context, dict):
+            return self.truncate(str(user_context), self.context_tokens)
+        parts = []
+        for key, value in user_context.items():
+            if value in (None, '', [], {}):
+                continue
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, separators=(',', ':'), default=str)
+            parts.append(f"{key}: {value}")
+        return self.truncate('; '.join(parts), self.context_tokens)
+
+    def _summarize_turns(self, turns):
+        """One line naming what older turns were about, newest topics kept first when space runs out"""
+        topics = []
+        used = self.count_tokens("Earlier topics: ")
+        for turn in reversed(turns):
+            words = str(turn.get('user', '')).split()
+            if not words:
+                continue
+            topic = ' '.join(words[:12]) + ('…' if len(words) > 12 else '')
+            cost = self.count_tokens(topic) + 1
+            if used + cost > self.summary_tokens:
+                break
+            topics.append(topic)
+            used += cost
+        return ("Earlier topics: " + '; '.join(reversed(topics))) if topics else '', len(topics)
+
+    def compact_history(self, conversation_history):
+        """(summary line, verbatim turn lines) fitting the history budget"""
+        turns = [turn for turn in conversation_history or [] if isinstance(turn, dict)]
+        verbatim = []
+        used = 0
+        budget = self.history_tokens - self.summary_tokens
+        index = len(turns)
+        while index > 0:
+            turn = turns[index - 1]
+            line = f"User: {turn.get('user', '')}\nAI: {turn.get('ai', '')}"
+            cost = self.count_tokens(line)
+            if used + cost > budget:
+                break
+            verbatim.append(line)
+            used += cost
+            index -= 1
+        verbatim.reverse()
+
+        summary, summarized = self._summarize_turns(turns[:index])
+        self._count('turns_verbatim', len(verbatim))
+        self._count('turns_summarized', summarized)
+        self._count('turns_dropped', index - summarized)
+        return summary, verbatim
+
+    def build_chat_query(self, message, conversation_history, user_context):
+        """Fold conversation history and user context into a single advisor query within budget"""
+        self._count('prompts')
+        summary, verbatim = self.compact_history(conversation_history)
+
+        context = ""
+        if summary or verbatim:
+            lines = ([summary] if summary else []) + verbatim
+            context = "Previous conversation:\n" + "\n".join(lines) + "\n\n"
+
+        formatted_context = self.format_user_context(user_context)
+        if formatted_context:
+            context += f"User Context: {formatted_context}\n\n"
+
+        return context + f"Current question: {self.truncate(message, self.question_tokens)}"
+
+    def fit_query(self, query, reserved_tokens):
+        """Truncate a query so it fits next to `reserved_tokens` of prefix and profile"""
+        return self.truncate(query, self.max_prompt_tokens - reserved_tokens)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_segments'] = len(self._counts)
+        stats['budgets'] = {
+            'max_prompt_tokens': self.max_prompt_tokens,
+            'history_tokens': self.history_tokens,
+            'context_tokens': self.context_tokens,
+            'question_tokens': self.question_tokens,
+            'summary_tokens': self.summary_tokens
+        }
+        stats['tokenizer'] = self.tokenizer is not None
+        return stats
@@ -0,0 +1,273 @@
+import functools
+import inspect
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+def normalize_params(value):
+    """Canonical, JSON-friendly form of request parameters used to build cache keys"""
+    if isinstance(value, dict):
+        return {str(k).strip(): normalize_params(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_params(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, float) and value == 0:
+        # -0.0 and 0.0 render identically
+        return 0.0
+    return value
+
+def make_cache_key(namespace, *args, **kwargs):
+    """Stable key for a call; ints and floats stay distinct because they render differently"""
+    return json.dumps(
+        [namespace, normalize_params(list(args)), normalize_params(kwargs)],
+        sort_keys=True,
+        default=str,
+        separators=(',', ':')
+    )
+
+_SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+NUMERIC_TEXT = re.compile(r'\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$')
+
+def normalize_number(value):
+    """Canonical form of a numeric argument: 5000, 5000.0 and '5000' all become 5000
+
+    Integral floats become ints and numeric strings are parsed; anything
+    else (including booleans and non-numeric text) is returned unchanged.
+    """
+    kind = type(value)
+    if kind is str:
+        # Matched first because a failed float() costs more than the rest of a cache hit
+        if not NUMERIC_TEXT.match(value):
+            return value
+        value = float(value)
+    elif kind is not float:
+        return value
+    return int(value) if value.is_integer() else value
+
+def canonical_arg(value):
+    """normalize_number applied through dicts and lists"""
+    kind = type(value)
+    if kind is dict:
+        return {key: normalize_number(item) if type(item) in _SCALAR_TYPES else canonical_arg(item)
+                for key, item in value.items()}
+    if kind is list or kind is tuple:
+        return [canonical_arg(item) for item in value]
+    return normalize_number(value)
+
+def call_key(namespace, args):
+    """Cache key for canonical call arguments: a plain tuple for scalars and flat dicts, make_cache_key otherwise
+
+    Each scalar is keyed with its type, so True and 1 stay distinct.
+    """
+    key = [namespace]
+    for arg in args:
+        if type(arg) in _SCALAR_TYPES:
+            key.append((type(arg), arg))
+        elif type(arg) is dict and all(type(item) in _SCALAR_TYPES for item in arg.values()):
+            key.append(tuple(sorted((str(name), type(item), item) for name, item in arg.items())))
+        else:
+            return make_cache_key(namespace, *args)
+    return tuple(key)
+
+def copy_tree(value):
+    """Copy of a JSON-like value's dicts and lists; much cheaper than copy.deepcopy for cached results"""
+    kind = type(value)
+    if kind is dict:
+        return {key: copy_tree(item) for key, item in value.items()}
+    if kind is list:
+        return [copy_tree(item) for item in value]
+    if kind is tuple:
+        return tuple(copy_tree(item) for item in value)
+    return value
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, ttl_seconds=300):
+        """In-process LRU cache whose entries also expire after ttl_seconds"""
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key):
+        """Return (found, value); expired entries count as misses"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._counters['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            value = entry[1]
+        # Hand out copies so callers cannot mutate what later hits will see
+        return True, value if isinstance(value, str) else copy_tree(value)
+
+    def set(self, key, value):
+        if not isinstance(value, str):
+            value = copy_tree(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['backend'] = 'memory'
+        return stats
+
+class SharedMemoryCache:
+    def __init__(self, path=None, max_entries=4096, ttl_seconds=300):
+        """LRU/TTL cache in a SQLite file on /dev/shm, shared by every worker process on the host
+
+        Values must be JSON-serializable. Each process and thread opens its own
+        connection, so the cache is safe to create before gunicorn forks.
+        """
+        if path is None:
+            shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+            path = os.path.join(shm_dir, 'loopfund-ai-cache.sqlite')
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self._local = threading.local()
+
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _connection(self):
+        """Per-thread connection, reopened after a fork"""
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _count(self, db, name, amount=1):
+        db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def get(self, key):
+        """Return (found, value); expired entries count as misses"""
+        key = key if isinstance(key, str) else repr(key)
+        now = time.time()
+        db = self._connection()
+        row = db.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[1] <= now:
+            db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count(db, 'expirations')
+            row = None
+        if row is None:
+            self._count(db, 'misses')
+            return False, None
+        db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        self._count(db, 'hits')
+        return True, json.loads(row[0])
+
+    def set(self, key, value):
+        key = key if isinstance(key, str) else repr(key)
+        now = time.time()
+        db = self._connection()
+        db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl_seconds, now)
+        )
+        overflow = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            db.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            )
+            self._count(db, 'evictions', overflow)
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
+
+    def stats(self):
+        db = self._connection()
+        stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        stats.update(dict(db.execute("SELECT name, value FROM counters").fetchall()))
+        stats['size'] = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['ttl_seconds'] = self.ttl_seconds
+        stats['backend'] = 'shared'
+        return stats
+
+def create_response_cache():
+    """Build the cache selected by AI_CACHE_BACKEND (memory, shared or off)"""
+    backend = os.getenv('AI_CACHE_BACKEND', 'memory').lower()
+    max_entries = int(os.getenv('AI_CACHE_MAX_ENTRIES', '1024'))
+    ttl_seconds = float(os.getenv('AI_CACHE_TTL_SECONDS', '300'))
+
+    if backend in ('off', 'none', 'disabled'):
+        return None
+    if backend == 'shared':
+        return SharedMemoryCache(os.getenv('AI_CACHE_PATH'), max_entries, ttl_seconds)
+    return ResponseCache(max_entries, ttl_seconds)
+
+def cached_response(namespace, ignore=()):
+    """Memoize a pure method through its instance's response_cache, when one is configured
+
+    The method always runs on canonical arguments (see canonical_arg), so
+    equal numbers in any form share one entry and one answer. Parameters
+    named in `ignore` do not affect the result and are left out of the key.
+    """
+    def decorator(method):
+        parameters = list(inspect.signature(method).parameters)[1:]
+        skipped = {parameters.index(name) for name in ignore}
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            args = [canonical_arg(arg) for arg in args]
+            kwargs = {name: canonical_arg(value) for name, value in kwargs.items()}
+            cache = getattr(self, 'response_cache', None)
+            if not cache:
+                return method(self, *args, **kwargs)
+
+            keyed = [arg for index, arg in enumerate(args) if index not in skipped] if skipped else args
+            if kwargs:
+                key = make_cache_key(namespace, *keyed, **{name: value for name, value in kwargs.items() if name not in ignore})
+            else:
+                key = call_key(namespace, keyed)
+            found, value = cache.get(key)
+            if found:
+                return value
+            value = method(self, *args, **kwargs)
+            cache.set(key, value)
+            return value
+        return wrapper
+    return decorator
@@ -2,11 +2,61 @@ import json
 import re
 from datetime import datetime, timedelta
 
+from ai.metrics import ERRORS, instrumented
+
+# Component label for this module's stage metrics
+COMPONENT = 'savings_predictor'
+
+# Columns read from each goal, in predictGoalCompletion order
+GOAL_FIELDS = ('goal_amount', 'current_savings', 'monthly_income', 'monthly_expenses', 'monthly_savings')
+
+# Insight codes returned by the batch API and the messages they stand for
+INSIGHT_MESSAGES = {
+    'horizon_1y': [
+        "🎯 Your goal is very achievable within a year!",
+        "💡 Consider increasing monthly savings to reach it even faster"
+    ],
+    'horizon_2y': [
+        "📅 Your goal is achievable within 2 years",
+        "💪 Stay consistent with your savings plan"
+    ],
+    'horizon_3y': [
+        "⏰ Your goal will take 2-3 years to achieve",
+        "🔄 Consider if this timeline works for your needs"
+    ],
+    'horizon_long': [
+        "📊 This is a long-term goal",
+        "💡 Consider breaking it into smaller, shorter-term goals"
+    ],
+    'rate_excellent': ["🌟 You're saving at an excellent rate!"],
+    'rate_good': ["👍 You're saving at a good rate"],
+    'rate_low': ["💡 Consider ways to increase your monthly savings"]
+}
+
+# Code tables for the batch API; '' marks rows without a prediction
+# (no_contributions is only produced by the forecast: a history of nothing but empty months)
+STATUS_CODES = ('predicted', 'insufficient_income', 'goal_reached', 'invalid_goal', 'no_contributions')
+HORIZON_CODES = ('', 'horizon_1y', 'horizon_2y', 'horizon_3y', 'horizon_long')
+RATE_CODES = ('', 'rate_excellent', 'rate_good', 'rate_low')
+
+# Monte Carlo forecast: simulated contribution paths per goal and how far ahead they run
+FORECAST_PATHS = 10000
+FORECAST_HORIZON_MONTHS = 120
+FORECAST_PERCENTILES = (10, 50, 90)
+# Fewer months of history than this fall back to the constant monthly savings
+MIN_HISTORY_MONTHS = 3
+# Where the forecast's contribution distribution came from
+SOURCE_CODES = ('', 'history', 'constant')
+# Months simulated per vectorized step, and the most path-months held in memory at once
+_FORECAST_BLOCK_MONTHS = 12
+_FORECAST_CHUNK = 1 << 22
+
 class SavingsPredictor:
     def __init__(self):
         """Initialize the AI Savings Predictor"""
         print("✅ AI Savings Predictor initialized successfully!")
     
+    @instrumented(COMPONENT, 'predict')
     def predictGoalCompletion(self, userData):
         """Predict when a user will reach their savings goal"""
         try:
@@ -69,36 +119,378 @@ class SavingsPredictor:
             }
             
         except Exception as e:
+            ERRORS.inc(component=COMPONENT)
             return {
                 "success": False,
                 "message": f"Error predicting savings: {str(e)}",
                 "prediction": None
             }
     
-    def _generateInsights(self, months_to_goal, monthly_savings, goal_amount):
-        """Generate personalized insights based on prediction"""
-        insights = []
-        
+    @instrumented(COMPONENT, 'predict_batch')
+    def predictGoalCompletionBatch(self, goals, now=None):
+        """Vectorized predictGoalCompletion over many goals at once
+
+        `goals` is a pandas DataFrame or a mapping of equal-length arrays with
+        the same fields predictGoalCompletion reads (missing fields count as 0).
+        Returns the same kind of container: one row per goal with a status code,
+        months_to_goal, expected_completion_date (datetime64[D]),
+        monthly_savings_needed, total_savings_needed, is_achievable and the
+        horizon/rate insight codes (see INSIGHT_MESSAGES).
+        """
+        import numpy as np
+
+        goal_amount, current_savings, monthly_income, monthly_expenses, monthly_savings = self._goalColumns(goals)
+        size = len(goal_amount)
+
+        # Calculate available monthly savings
+        monthly_savings = np.where(monthly_savings <= 0, monthly_income - monthly_expenses, monthly_savings)
+        remaining_amount = goal_amount - current_savings
+
+        no_income = monthly_savings <= 0
+        reached = ~no_income & (remaining_amount <= 0)
+        invalid = ~no_income & ~reached & (goal_amount == 0)
+        predicted = ~(no_income | reached | invalid)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            months_to_goal = np.where(predicted, remaining_amount / monthly_savings, 0.0)
+            savings_rate = np.where(predicted, monthly_savings / goal_amount * 100, 0.0)
+
+        if now is None:
+            now = datetime.now()
+        start = np.datetime64(now, 'us')
+        offsets = months_to_goal * 30 * 86400e6
+        # Dates past datetime.max (where the scalar path errors out) are left as NaT
+        max_offset = (datetime.max - now).total_seconds() * 1e6
+        representable = (predicted & (offsets < max_offset)) | reached
+        offsets = np.round(np.where(representable, offsets, 0)).astype(np.int64).astype('timedelta64[us]')
+        completion_dates = np.where(representable, (start + offsets).astype('datetime64[D]'), np.datetime64('NaT', 'D'))
+
+        # Codes are computed as small integers and only mapped to names at the end
+        status = np.zeros(size, dtype=np.int8)
+        status[no_income] = STATUS_CODES.index('insufficient_income')
+        status[reached] = STATUS_CODES.index('goal_reached')
+        status[invalid] = STATUS_CODES.index('invalid_goal')
+        horizon = np.where(predicted, 1 + (months_to_goal > 12) + (months_to_goal > 24) + (months_to_goal > 36), 0)
+        rate = np.where(predicted, 3 - (savings_rate >= 10) - (savings_rate >= 20), 0)
+
+        result = {
+            'status': status,
+            'months_to_goal': np.round(months_to_goal, 1),
+            'expected_completion_date': completion_dates,
+            'monthly_savings_needed': np.where(predicted, np.round(monthly_savings, 2), 0.0),
+            'total_savings_needed': np.where(predicted, np.round(remaining_amount, 2), 0.0),
+            'is_achievable': reached | (predicted & (months_to_goal <= 60)),
+            'horizon_code': horizon.astype(np.int8),
+            'rate_code': rate.astype(np.int8)
+        }
+        code_names = {'status': STATUS_CODES, 'horizon_code': HORIZON_CODES, 'rate_code': RATE_CODES}
+
+        if hasattr(goals, 'columns'):
+            import pandas as pd
+            for name, categories in code_names.items():
+                result[name] = pd.Categorical.from_codes(result[name], categories)
+            return pd.DataFrame(result, index=goals.index)
+
+        for name, categories in code_names.items():
+            result[name] = np.asarray(categories)[result[name]]
+        return result
+    
+    @instrumented(COMPONENT, 'forecast')
+    def forecastGoalCompletion(self, userData, paths=FORECAST_PATHS, horizon_months=FORECAST_HORIZON_MONTHS, seed=None):
+        """Probabilistic completion forecast from the user's irregular contribution history
+
+        userData holds the predictGoalCompletion fields plus `contributions`:
+        the goal's contribution records ({amount, paidAt, status}) or plain
+        monthly totals. Returns P10/P50/P90 months and completion dates.
+        """
+        try:
+            return self.forecastGoalCompletions([userData], paths, horizon_months, seed)[0]
+        except Exception as e:
+            ERRORS.inc(component=COMPONENT)
+            return {
+                "success": False,
+                "message": f"Error forecasting savings: {str(e)}",
+                "forecast": None
+            }
+    
+    def forecastGoalCompletions(self, items, paths=FORECAST_PATHS, horizon_months=FORECAST_HORIZON_MONTHS, seed=None, now=None):
+        """forecastGoalCompletion for many goals, simulated together in one vectorized batch"""
+        import numpy as np
+
+        if not items:
+            return []
+        if now is None:
+            now = datetime.now()
+        columns = {name: [float(item.get(name, 0) or 0) for item in items] for name in GOAL_FIELDS}
+        histories = [self._monthlyContributions(item.get('contributions'), now) for item in items]
+        result = self.forecastGoalCompletionBatch(columns, histories, paths, horizon_months, seed, now)
+
+        forecasts = []
+        for index in range(len(items)):
+            status = result['status'][index]
+            if status == 'insufficient_income':
+                forecasts.append({
+                    "success": False,
+                    "message": "Your monthly expenses exceed your income. Focus on reducing expenses first.",
+                    "forecast": None
+                })
+                continue
+            if status == 'no_contributions':
+                forecasts.append({
+                    "success": False,
+                    "message": "No contributions in your recent history, so there is no savings pace to forecast from yet.",
+                    "forecast": None
+                })
+                continue
+            if status == 'invalid_goal':
+                forecasts.append({"success": False, "message": "A goal amount is required", "forecast": None})
+                continue
+
+            months = {}
+            dates = {}
+            for percentile in FORECAST_PERCENTILES:
+                value = result[f'months_p{percentile}'][index]
+                date = result[f'completion_date_p{percentile}'][index]
+                # Paths still short of the goal at the horizon have no date
+                months[f'p{percentile}'] = None if np.isnan(value) else float(value)
+                dates[f'p{percentile}'] = None if np.isnat(date) else str(date)
+            forecasts.append({
+                "success": True,
+                "message": ("Congratulations! You've already reached your goal!" if status == 'goal_reached'
+                            else "Savings forecast generated successfully"),
+                "forecast": {
+                    "months_to_goal": months,
+                    "completion_date": dates,
+                    "probability_within_horizon": float(result['probability_within_horizon'][index]),
+                    "is_achievable": months['p50'] is not None and months['p50'] <= 60,
+                    "contribution_source": str(result['source'][index]),
+                    "history_months": len(histories[index]),
+                    "paths": int(paths),
+                    "horizon_months": int(horizon_months)
+                }
+            })
+        return forecasts
+    
+    @instrumented(COMPONENT, 'forecast_batch')
+    def forecastGoalCompletionBatch(self, goals, histories, paths=FORECAST_PATHS, horizon_months=FORECAST_HORIZON_MONTHS,
+                                    seed=None, now=None):
+        """Monte Carlo completion forecast for many goals at once
+
+        `goals` is a DataFrame or mapping of arrays as for
+        predictGoalCompletionBatch; `histories` has one sequence of past
+        monthly contribution totals per goal. Each path draws every future
+        month's contribution from that goal's own history (bootstrap), so
+        skipped months and one-off deposits shape the spread. Goals with
+        fewer than MIN_HISTORY_MONTHS months use their constant monthly
+        savings instead; a history without a single positive month gets the
+        no_contributions status. Returns status and source codes,
+        months_p10/p50/p90 (NaN past the horizon), completion_date_p10/p50/p90
+        (datetime64[D], NaT past the horizon) and probability_within_horizon.
+        """
+        import numpy as np
+
+        paths = int(paths)
+        horizon_months = int(horizon_months)
+        if paths <= 0 or horizon_months <= 0:
+            raise ValueError("paths and horizon_months must be positive")
+
+        goal_amount, current_savings, monthly_income, monthly_expenses, monthly_savings = self._goalColumns(goals)
+        size = len(goal_amount)
+        if len(histories) != size:
+            raise ValueError(f"Expected {size} contribution histories, got {len(histories)}")
+        constant = np.where(monthly_savings <= 0, monthly_income - monthly_expenses, monthly_savings)
+
+        # One padded row of monthly contributions per goal, sampled by index below
+        lengths = np.array([len(history) if len(history) >= MIN_HISTORY_MONTHS else 1 for history in histories])
+        amounts = np.zeros((size, max(1, lengths.max(initial=1))), dtype=np.float32)
+        from_history = lengths >= MIN_HISTORY_MONTHS
+        for row, history in enumerate(histories):
+            if from_history[row]:
+                amounts[row, :len(history)] = history
+            else:
+                amounts[row, 0] = constant[row]
+
+        remaining_amount = goal_amount - current_savings
+        # Without a single positive month no path ever grows; an empty history is not an income problem
+        no_growth = amounts.max(axis=1) <= 0
+        stalled = no_growth & from_history
+        no_income = no_growth & ~from_history
+        reached = ~no_growth & (remaining_amount <= 0)
+        invalid = ~no_growth & ~reached & (goal_amount == 0)
+        predicted = ~(no_growth | reached | invalid)
+
+        rng = np.random.default_rng(seed)
+        months = np.full((size, len(FORECAST_PERCENTILES)), np.nan)
+        months[reached] = 0.0
+        probability = np.where(reached, 1.0, 0.0)
+
+        rows = np.flatnonzero(predicted)
+        rows_per_chunk = max(1, _FORECAST_CHUNK // (paths * _FORECAST_BLOCK_MONTHS))
+        for start in range(0, len(rows), rows_per_chunk):
+            chunk = rows[start:start + rows_per_chunk]
+            completion = self._simulateCompletion(
+                amounts[chunk], lengths[chunk], remaining_amount[chunk].astype(np.float32), paths, horizon_months, rng
+            )
+            # inverted_cdf picks simulated values, so paths that never finish (inf) stay out of the lower percentiles
+            quantiles = np.quantile(completion, [p / 100 for p in FORECAST_PERCENTILES], axis=1, method='inverted_cdf')
+            months[chunk] = np.where(np.isinf(quantiles), np.nan, quantiles).T
+            probability[chunk] = np.isfinite(completion).mean(axis=1)
+
+        if now is None:
+            now = datetime.now()
+        status = np.zeros(size, dtype=np.int8)
+        status[no_income] = STATUS_CODES.index('insufficient_income')
+        status[stalled] = STATUS_CODES.index('no_contributions')
+        status[reached] = STATUS_CODES.index('goal_reached')
+        status[invalid] = STATUS_CODES.index('invalid_goal')
+        source = np.where(predicted, np.where(from_history, 1, 2), 0).astype(np.int8)
+
+        result = {'status': status, 'source': source}
+        for column, percentile in enumerate(FORECAST_PERCENTILES):
+            result[f'months_p{percentile}'] = np.round(months[:, column], 1)
+        for column, percentile in enumerate(FORECAST_PERCENTILES):
+            result[f'completion_date_p{percentile}'] = self._monthsFromNow(months[:, column], now)
+        result['probability_within_horizon'] = np.round(probability, 3)
+        code_names = {'status': STATUS_CODES, 'source': SOURCE_CODES}
+
+        if hasattr(goals, 'columns'):
+            import pandas as pd
+            for name, categories in code_names.items():
+                result[name] = pd.Categorical.from_codes(result[name], categories)
+            return pd.DataFrame(result, index=goals.index)
+
+        for name, categories in code_names.items():
+            result[name] = np.asarray(categories)[result[name]]
+        return result
+    
+    def _simulateCompletion(self, amounts, lengths, remaining_amount, paths, horizon_months, rng):
+        """Months until each simulated path reaches its goal ([goals, paths], inf past the horizon)
+
+        All paths of all goals live in one flat array and are simulated a
+        block of months at a time; paths that reached their goal are dropped
+        before the next block, so the work follows the unfinished paths only.
+        The month a path crosses the goal is interpolated, so 2.5 means
+        halfway through the third month.
+        """
+        import numpy as np
+
+        size, width = amounts.shape
+        flat_amounts = amounts.ravel()
+        path_rows = np.repeat(np.arange(size, dtype=np.uint32), paths)
+        active = np.arange(size * paths)
+        base = path_rows * np.uint32(width)
+        sample_lengths = lengths.astype(np.uint32)[path_rows]
+        target = remaining_amount[path_rows]
+        saved = np.zeros(size * paths, dtype=np.float32)
+
+        completion = np.full(size * paths, np.inf, dtype=np.float32)
+        for block_start in range(0, horizon_months, _FORECAST_BLOCK_MONTHS):
+            block = min(_FORECAST_BLOCK_MONTHS, horizon_months - block_start)
+            # 16 random bits per month scaled to [0, length): a history index without a division
+            bits = rng.integers(0, 1 << 16, size=(block, len(active)), dtype=np.uint16)
+            index = np.multiply(bits, sample_lengths, dtype=np.uint32)
+            np.right_shift(index, 16, out=index)
+            index += base
+            # Running totals, built in place one month at a time (much faster than cumsum over the short axis)
+            totals = flat_amounts[index]
+            totals[0] += saved
+            for month in range(1, block):
+                totals[month] += totals[month - 1]
+
+            crossed = totals >= target
+            finished = crossed.any(axis=0)
+            done = np.flatnonzero(finished)
+            month = crossed[:, done].argmax(axis=0)
+            after = totals[month, done]
+            before = np.where(month > 0, totals[np.maximum(month - 1, 0), done], saved[done])
+            fraction = np.clip((target[done] - before) / (after - before), 0.0, 1.0)
+            completion[active[done]] = block_start + month + fraction
+
+            keep = ~finished
+            if not keep.any():
+                break
+            active, base, sample_lengths, target = active[keep], base[keep], sample_lengths[keep], target[keep]
+            saved = totals[-1, keep]
+        return completion.reshape(size, paths)
+    
+    def _monthsFromNow(self, months, now):
+        """Calendar dates (datetime64[D]) a fractional number of months after now; NaT for NaN"""
+        import numpy as np
+
+        known = ~np.isnan(months)
+        whole = np.where(known, np.floor(months), 0).astype(np.int64)
+        month_start = (np.datetime64(now, 'M') + whole).astype('datetime64[D]')
+        days_in_month = ((np.datetime64(now, 'M') + whole + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+        # Same day of the month, clamped to short months, then the fraction of that month
+        day = np.minimum(now.day - 1, days_in_month - 1)
+        offset = day + np.round(np.where(known, months - whole, 0) * days_in_month).astype(np.int64)
+        dates = month_start + offset.astype('timedelta64[D]')
+        return np.where(known, dates, np.datetime64('NaT', 'D'))
+    
+    def _monthlyContributions(self, contributions, now):
+        """Monthly contribution totals from a goal's contribution records
+
+        Plain numbers are taken as monthly totals. Records ({amount, paidAt,
+        status}) are summed per calendar month from the first contribution up
+        to last month, so months without any contribution count as 0; the
+        current, unfinished month is left out.
+        """
+        totals = []
+        months = {}
+        for contribution in contributions or ():
+            if not isinstance(contribution, dict):
+                totals.append(float(contribution))
+                continue
+            if contribution.get('status', 'completed') != 'completed':
+                continue
+            paid_at = contribution.get('paidAt') or contribution.get('date')
+            if not paid_at:
+                totals.append(float(contribution.get('amount', 0)))
+                continue
+            if isinstance(paid_at, str):
+                paid_at = datetime.fromisoformat(paid_at.replace('Z', '+00:00'))
+            key = paid_at.year * 12 + paid_at.month - 1
+            months[key] = months.get(key, 0.0) + float(contribution.get('amount', 0))
+
+        current = now.year * 12 + now.month - 1
+        past = [key for key in months if key < current]
+        if past:
+            totals.extend(months.get(key, 0.0) for key in range(min(past), current))
+        return totals
+    
+    def _goalColumns(self, goals):
+        """GOAL_FIELDS as float arrays from a DataFrame or mapping of arrays (missing fields are 0)"""
+        import numpy as np
+
+        columns = {name: np.asarray(goals[name], dtype=np.float64) if name in goals else None for name in GOAL_FIELDS}
+        size = max(len(values) for values in columns.values() if values is not None)
+        return tuple(columns[name] if columns[name] is not None else np.zeros(size) for name in GOAL_FIELDS)
+    
+    def _insightCodes(self, months_to_goal, monthly_savings, goal_amount):
+        """Insight codes (keys of INSIGHT_MESSAGES) for one prediction"""
         if months_to_goal <= 12:
-            insights.append("🎯 Your goal is very achievable within a year!")
-            insights.append("💡 Consider increasing monthly savings to reach it even faster")
+            horizon_code = 'horizon_1y'
         elif months_to_goal <= 24:
-            insights.append("📅 Your goal is achievable within 2 years")
-            insights.append("💪 Stay consistent with your savings plan")
+            horizon_code = 'horizon_2y'
         elif months_to_goal <= 36:
-            insights.append("⏰ Your goal will take 2-3 years to achieve")
-            insights.append("🔄 Consider if this timeline works for your needs")
+            horizon_code = 'horizon_3y'
         else:
-            insights.append("📊 This is a long-term goal")
-            insights.append("💡 Consider breaking it into smaller, shorter-term goals")
+            horizon_code = 'horizon_long'
         
         # Add savings rate insights
         savings_rate = (monthly_savings / goal_amount) * 100
         if savings_rate >= 20:
-            insights.append("🌟 You're saving at an excellent rate!")
+            rate_code = 'rate_excellent'
         elif savings_rate >= 10:
-            insights.append("👍 You're saving at a good rate")
+            rate_code = 'rate_good'
         else:
-            insights.append("💡 Consider ways to increase your monthly savings")
+            rate_code = 'rate_low'
         
+        return [horizon_code, rate_code]
+    
+    def _generateInsights(self, months_to_goal, monthly_savings, goal_amount):
+        """Generate personalized insights based on prediction"""
+        insights = []
+        for code in self._insightCodes(months_to_goal, monthly_savings, goal_amount):
+            insights.extend(INSIGHT_MESSAGES[code])
         return insights
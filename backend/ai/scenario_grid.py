@@ -0,0 +1,149 @@
+import numpy as np
+
+from ai.advice_results import profile_code, render_investment_guidance, render_savings_plan
+from ai.response_cache import normalize_number
+
+# Most scenarios a single grid request may ask for, and how many of them it may have rendered as text
+MAX_GRID_CELLS = 10000
+MAX_RENDERED_CELLS = 100
+
+# Code table for plan status; arrays carry the index, responses carry the table once
+PLAN_STATUS_CODES = ('achievable', 'too_aggressive', 'no_capacity')
+
+# Annual return assumed by investment projections unless the caller passes one
+DEFAULT_ANNUAL_RETURN = 0.06
+# Integer axes must be exactly representable as floats, which they are parsed as first
+MAX_INTEGER = 2 ** 53
+# Longest projection horizon, in years, and the largest amount an axis may hold; together with
+# the return bound they keep every projection finite (JSON has no Infinity)
+MAX_PROJECTION_YEARS = 100
+MAX_AMOUNT = 1e12
+
+def _axis(values, name, integer=False, limit=None):
+    axis = np.asarray(values, dtype=np.float64)
+    if axis.ndim != 1 or not len(axis):
+        raise ValueError(f"{name} must be a non-empty list of numbers")
+    if not np.isfinite(axis).all():
+        raise ValueError(f"{name} must be finite numbers")
+    if limit is not None and (np.abs(axis) > limit).any():
+        raise ValueError(f"{name} must be at most {limit:,.0f} in size")
+    if integer:
+        # Rejected rather than truncated: 25.9 is not a 25-month timeline
+        if (axis != np.trunc(axis)).any() or (np.abs(axis) > MAX_INTEGER).any():
+            raise ValueError(f"{name} must be whole numbers")
+        axis = axis.astype(np.int64)
+    return axis
+
+def _check_size(*axes):
+    cells = int(np.prod([len(axis) for axis in axes]))
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"Grid has {cells} scenarios, at most {MAX_GRID_CELLS} are allowed")
+
+def _cells(cells, shape):
+    """(row, column) index pairs, checked against the grid shape"""
+    cells = [tuple(int(index) for index in cell) for cell in cells]
+    if len(cells) > MAX_RENDERED_CELLS:
+        raise ValueError(f"At most {MAX_RENDERED_CELLS} cells can be rendered per request")
+    for cell in cells:
+        if len(cell) != 2 or not all(0 <= index < size for index, size in zip(cell, shape)):
+            raise ValueError(f"Cell {list(cell)} is outside the {shape[0]}x{shape[1]} grid")
+    return cells
+
+def savings_plan_grid(goal_amounts, timeline_months, monthly_income, monthly_expenses):
+    """Every (goal amount, timeline) savings plan for one budget in a single vectorized pass
+
+    Returns the axes plus [goals, timelines] arrays: status (index into
+    PLAN_STATUS_CODES), monthly_savings_needed, extra_available (achievable
+    plans) and adjusted_timeline_months (too aggressive ones, NaN
+    elsewhere); reduced_goal is per timeline. Text is only rendered on
+    request, see render_savings_plan_cells.
+    """
+    goal_amounts = _axis(goal_amounts, 'goal_amounts', limit=MAX_AMOUNT)
+    timeline_months = _axis(timeline_months, 'timeline_months', integer=True)
+    _check_size(goal_amounts, timeline_months)
+    if (timeline_months <= 0).any():
+        raise ValueError("timeline_months must be positive")
+    available_for_savings = float(monthly_income) - float(monthly_expenses)
+
+    monthly_savings_needed = goal_amounts[:, None] / timeline_months[None, :]
+    aggressive = monthly_savings_needed > available_for_savings
+    status = np.where(aggressive, 1, 0).astype(np.int8)
+    if available_for_savings > 0:
+        adjusted_timeline = np.where(aggressive, goal_amounts[:, None] / available_for_savings, np.nan)
+    else:
+        # No budget left over: there is no timeline to recommend
+        status[:] = 2
+        adjusted_timeline = np.full(monthly_savings_needed.shape, np.nan)
+
+    return {
+        'goal_amount': goal_amounts,
+        'timeline_months': timeline_months,
+        'monthly_income': float(monthly_income),
+        'monthly_expenses': float(monthly_expenses),
+        'available_for_savings': available_for_savings,
+        'status': status,
+        'monthly_savings_needed': monthly_savings_needed,
+        'extra_available': np.where(status == 0, available_for_savings - monthly_savings_needed, np.nan),
+        'adjusted_timeline_months': adjusted_timeline,
+        'reduced_goal': available_for_savings * timeline_months
+    }
+
+def render_savings_plan_cells(grid, cells):
+    """Plan texts for the requested (goal index, timeline index) cells only"""
+    texts = []
+    for goal_index, timeline_index in _cells(cells, grid['status'].shape):
+        if grid['status'][goal_index, timeline_index] == 2:
+            texts.append(None)
+            continue
+        # Whole amounts render as ints ("$5,000"), as the scalar endpoint does
+        texts.append(render_savings_plan(
+            normalize_number(float(grid['goal_amount'][goal_index])), int(grid['timeline_months'][timeline_index]),
+            grid['monthly_income'], grid['monthly_expenses']
+        ))
+    return texts
+
+def investment_grid(ages, investment_amounts, years, annual_return=DEFAULT_ANNUAL_RETURN):
+    """Investment profiles per age and a projection table of every amount over every horizon
+
+    profile is an index into TIME_HORIZONS/RISK_RECOMMENDATIONS per age;
+    projected_value[amount, year] compounds the amount at annual_return.
+    """
+    ages = _axis(ages, 'ages', integer=True)
+    investment_amounts = _axis(investment_amounts, 'investment_amounts', limit=MAX_AMOUNT)
+    years = _axis(years, 'years')
+    _check_size(ages, investment_amounts)
+    _check_size(investment_amounts, years)
+    if ((years < 0) | (years > MAX_PROJECTION_YEARS)).any():
+        raise ValueError(f"years must be between 0 and {MAX_PROJECTION_YEARS}")
+    annual_return = float(annual_return)
+    if not -1 < annual_return <= 1:
+        raise ValueError("annual_return must be above -1 and at most 1")
+
+    return {
+        'age': ages,
+        'investment_amount': investment_amounts,
+        'years': years,
+        'annual_return': annual_return,
+        'profile': profile_code(ages).astype(np.int8),
+        'projected_value': investment_amounts[:, None] * (1 + annual_return) ** years[None, :]
+    }
+
+def render_investment_cells(grid, cells):
+    """Guidance texts for the requested (age index, amount index) cells only"""
+    return [
+        render_investment_guidance(int(grid['age'][age_index]), float(grid['investment_amount'][amount_index]))
+        for age_index, amount_index in _cells(cells, (len(grid['age']), len(grid['investment_amount'])))
+    ]
+
+def grid_payload(grid, decimals=2):
+    """JSON-ready copy of a grid: arrays as nested lists rounded to cents, NaN as null"""
+    payload = {}
+    for name, value in grid.items():
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind == 'f':
+                rounded = np.round(value, decimals)
+                value = np.where(np.isnan(rounded), None, rounded).tolist()
+            else:
+                value = value.tolist()
+        payload[name] = value
+    return payload
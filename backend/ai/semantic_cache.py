@@ -0,0 +1,170 @@
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from ai.response_cache import make_cache_key
+
+# Profile fields that actually reach the advisor prompt
+PROFILE_FIELDS = ('income', 'age', 'current_savings', 'goals', 'risk_tolerance')
+
+NUMBER_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*(k|m)?\b')
+WORD_PATTERN = re.compile(r'[a-z]+|<num>')
+MULTIPLIERS = {'k': 1_000, 'm': 1_000_000}
+STOPWORDS = frozenset(
+    'a an and are be can could do does for how i in is it me my of on or per should '
+    'the to what when which with would you each every much many need dollar dollars'.split()
+)
+
+def extract_numbers(text):
+    """Canonical numbers mentioned in a question ("$5,000" and "5k" both become 5000)"""
+    numbers = []
+    for digits, suffix in NUMBER_PATTERN.findall(text.lower()):
+        value = float(digits.replace(',', '')) * MULTIPLIERS.get(suffix, 1)
+        numbers.append(f"{value:g}")
+    return tuple(numbers)
+
+def _stem(word):
+    """Crude suffix stripping so "monthly", "months" and "month" coincide"""
+    for suffix in ('ly', 'ing', 's'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+def normalize_query(text):
+    """Lowercase, drop punctuation and filler words, stem, and replace numbers with a placeholder"""
+    text = NUMBER_PATTERN.sub(' <num> ', text.lower())
+    return ' '.join(_stem(word) for word in WORD_PATTERN.findall(text) if word not in STOPWORDS)
+
+class HashingEmbedder:
+    def __init__(self, dimensions=512):
+        """Model-free text embedding: hashed word unigrams and bigrams
+
+        Number placeholders are skipped because the numbers themselves are
+        already part of the cache bucket.
+        """
+        self.dimensions = dimensions
+
+    def _bucket(self, feature):
+        return zlib.crc32(feature.encode('utf-8')) % self.dimensions
+
+    def __call__(self, normalized_text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        words = [word for word in normalized_text.split() if word != '<num>']
+        for word in words:
+            vector[self._bucket('w:' + word)] += 1.0
+        for first, second in zip(words, words[1:]):
+            vector[self._bucket(f"b:{first} {second}")] += 0.5
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class SemanticCache:
+    def __init__(self, threshold=0.92, max_entries=2048, ttl_seconds=3600, embedder=None):
+        """Answer cache matched exactly or by embedding similarity
+
+        Answers are only shared between questions with the same endpoint, the
+        same normalized profile and the same numbers, so "save $5,000 in 10
+        months" never reuses the answer for "$8,000 in 10 months". Within that
+        bucket the wording may differ as long as cosine similarity reaches
+        `threshold`.
+        """
+        self.threshold = float(threshold)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds)
+        self.embed = embedder or HashingEmbedder()
+
+        self._entries = OrderedDict()  # exact key -> (expires_at, bucket, vector, answer)
+        self._buckets = {}  # bucket -> set of exact keys
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _keys(self, endpoint, query, user_profile):
+        profile = {field: (user_profile or {}).get(field) for field in PROFILE_FIELDS}
+        bucket = make_cache_key(endpoint, profile, extract_numbers(query))
+        normalized = normalize_query(query)
+        return bucket, bucket + '|' + normalized, normalized
+
+    def _record(self, endpoint, outcome):
+        counters = self._metrics.setdefault(endpoint, {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0})
+        counters[outcome] += 1
+
+    def _remove(self, key):
+        _, bucket, _, _ = self._entries.pop(key)
+        keys = self._buckets[bucket]
+        keys.discard(key)
+        if not keys:
+            del self._buckets[bucket]
+
+    def lookup(self, endpoint, query, user_profile=None):
+        """Return a cached answer for this question, or None"""
+        bucket, key, normalized = self._keys(endpoint, query, user_profile)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._record(endpoint, 'exact_hits')
+                return entry[3]
+
+            candidates = [k for k in self._buckets.get(bucket, ()) if self._entries[k][0] > now]
+            if candidates:
+                vector = self.embed(normalized)
+                matrix = np.stack([self._entries[k][2] for k in candidates])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(candidates[best])
+                    self._record(endpoint, 'semantic_hits')
+                    return self._entries[candidates[best]][3]
+
+            self._record(endpoint, 'misses')
+            return None
+
+    def store(self, endpoint, query, user_profile, answer):
+        bucket, key, normalized = self._keys(endpoint, query, user_profile)
+        vector = self.embed(normalized)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, bucket, vector, answer)
+            self._buckets.setdefault(bucket, set()).add(key)
+
+            # Drop expired entries first, then least recently used ones
+            now = time.monotonic()
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                expired = [k for k, entry in self._entries.items() if entry[0] <= now]
+                for stale in expired or [oldest]:
+                    self._remove(stale)
+
+    def stats(self):
+        with self._lock:
+            endpoints = {}
+            for endpoint, counters in self._metrics.items():
+                lookups = sum(counters.values())
+                hits = counters['exact_hits'] + counters['semantic_hits']
+                endpoints[endpoint] = dict(counters, lookups=lookups, hit_rate=round(hits / lookups, 4) if lookups else 0.0)
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'endpoints': endpoints
+            }
+
+def create_semantic_cache():
+    """Build the answer cache configured by AI_SEMANTIC_CACHE* (None unless AI_SEMANTIC_CACHE is turned on)
+
+    Opt-in: a near-identical question is answered with another question's
+    generated advice, which deployments have to choose explicitly.
+    """
+    if os.getenv('AI_SEMANTIC_CACHE', 'false').lower() not in ('1', 'true', 'yes'):
+        return None
+    return SemanticCache(
+        threshold=float(os.getenv('AI_SEMANTIC_CACHE_THRESHOLD', '0.92')),
+        max_entries=int(os.getenv('AI_SEMANTIC_CACHE_MAX_ENTRIES', '2048')),
+        ttl_seconds=float(os.getenv('AI_SEMANTIC_CACHE_TTL_SECONDS', '3600'))
+    )
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from ai.metrics import record_generation
+
+# Text both tokenizers must split identically before a draft model is accepted
+PROBE_TEXT = "LoopFund AI Response: save $5,000 in 10 months with the 50/30/20 rule and an emergency fund."
+
+def tokenizers_compatible(tokenizer, draft_tokenizer):
+    """Assisted decoding exchanges raw token ids, so both models need the same vocabulary"""
+    if len(tokenizer) != len(draft_tokenizer) or tokenizer.eos_token_id != draft_tokenizer.eos_token_id:
+        return False
+    if tokenizer(PROBE_TEXT).input_ids != draft_tokenizer(PROBE_TEXT).input_ids:
+        return False
+    return tokenizer.get_vocab() == draft_tokenizer.get_vocab()
+
+class SpeculativeDecoder:
+    def __init__(self, model, draft_model, tokenizer):
+        """Assisted generation: the draft model proposes tokens that the target model verifies in one pass
+
+        With greedy decoding the output is identical to the target model on
+        its own; with sampling it follows the same distribution. Forward
+        hooks count target and draft passes so the acceptance rate can be
+        reported: every target pass accepts some draft tokens and adds one of
+        its own.
+        """
+        self.model = model
+        self.draft_model = draft_model
+        self.tokenizer = tokenizer
+
+        self._lock = threading.Lock()
+        self._stats = {'generations': 0, 'generated_tokens': 0, 'target_forwards': 0, 'draft_forwards': 0}
+        self._counting = threading.local()
+        model.register_forward_hook(lambda *_: self._count('target_forwards'))
+        draft_model.register_forward_hook(lambda *_: self._count('draft_forwards'))
+
+    def _count(self, name):
+        counters = getattr(self._counting, 'counters', None)
+        if counters is not None:
+            counters[name] += 1
+
+    def generate_ids(self, inputs, **generation_kwargs):
+        """Assisted generate for one sequence (transformers only supports batch size 1 here)"""
+        import torch
+
+        counters = {'target_forwards': 0, 'draft_forwards': 0}
+        self._counting.counters = counters
+        started = time.perf_counter()
+        try:
+            with torch.no_grad():
+                outputs = self.model.generate(**inputs, assistant_model=self.draft_model, **generation_kwargs)
+        finally:
+            self._counting.counters = None
+
+        generated = outputs.shape[1] - inputs['input_ids'].shape[1]
+        record_generation('speculative', generated, time.perf_counter() - started)
+        with self._lock:
+            self._stats['generations'] += 1
+            self._stats['generated_tokens'] += generated
+            self._stats['target_forwards'] += counters['target_forwards']
+            self._stats['draft_forwards'] += counters['draft_forwards']
+        return outputs
+
+    def generate(self, prompts, **generation_kwargs):
+        """New text for each prompt, decoded one sequence at a time"""
+        generation_kwargs.setdefault('pad_token_id', self.tokenizer.pad_token_id)
+        texts = []
+        for prompt in prompts:
+            inputs = dict(self.tokenizer(prompt, return_tensors='pt', return_token_type_ids=False).to(self.model.device))
+            outputs = self.generate_ids(inputs, **generation_kwargs)
+            texts.append(self.tokenizer.decode(outputs[0, inputs['input_ids'].shape[1]:], skip_special_tokens=True))
+        return texts
+
+    def stats(self):
+        """Acceptance rate = accepted draft tokens / proposed draft tokens"""
+        with self._lock:
+            stats = dict(self._stats)
+        accepted = max(0, stats['generated_tokens'] - stats['target_forwards'])
+        stats['accepted_tokens'] = accepted
+        stats['acceptance_rate'] = round(accepted / stats['draft_forwards'], 4) if stats['draft_forwards'] else 0.0
+        stats['tokens_per_target_forward'] = (
+            round(stats['generated_tokens'] / stats['target_forwards'], 2) if stats['target_forwards'] else 0.0
+        )
+        return stats
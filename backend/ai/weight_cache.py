@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import tempfile
+import time
+
+import torch
+
+WEIGHTS_FILE = 'model.safetensors'
+MANIFEST_FILE = 'loopfund-cache.json'
+CONFIG_FILE = 'config.json'
+
+# Files whose sizes and modification times identify a local checkpoint
+SOURCE_FILE_SUFFIXES = ('.json', '.safetensors', '.bin', '.model', '.txt')
+
+DTYPES = {'fp32': torch.float32, 'fp16': torch.float16, 'bf16': torch.bfloat16}
+
+# safetensors dtype codes -> torch dtypes
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64, 'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16,
+    'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8,
+    'U8': torch.uint8, 'BOOL': torch.bool
+}
+
+def cache_mode():
+    """AI_WEIGHT_CACHE: read (use a warmed cache, the default), auto (also fill it after a cold load) or off
+
+    Filling is opt-in so that benchmarks and tests never write to the
+    shared cache; `python setup.py --warm-cache` fills it explicitly.
+    """
+    return os.getenv('AI_WEIGHT_CACHE', 'read').lower()
+
+def cache_root():
+    return os.getenv('AI_WEIGHT_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'loopfund', 'weights')
+
+def cache_dir_for(model_name, dtype_name, root=None):
+    """Cache directory for one model at one precision"""
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '--', model_name.strip('/'))
+    return os.path.join(root or cache_root(), f"{slug}-{dtype_name}")
+
+def is_cached(directory):
+    return os.path.isfile(os.path.join(directory, MANIFEST_FILE))
+
+def _file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def source_fingerprint(model_name, revision=None):
+    """What a cache entry is built from: the hub commit or the local files' sizes and mtimes, plus the config hash
+
+    Works offline: a hub model's commit comes from the local Hugging Face
+    cache, and fields that cannot be known without the network are None.
+    """
+    fingerprint = {'requested_revision': revision, 'revision': None, 'files': None, 'config_sha256': None}
+    if os.path.isdir(model_name):
+        fingerprint['files'] = sorted(
+            [entry.name, entry.stat().st_size, entry.stat().st_mtime_ns]
+            for entry in os.scandir(model_name)
+            if entry.is_file() and entry.name.endswith(SOURCE_FILE_SUFFIXES)
+        )
+        config_path = os.path.join(model_name, CONFIG_FILE)
+    else:
+        try:
+            from huggingface_hub import try_to_load_from_cache
+            config_path = try_to_load_from_cache(model_name, CONFIG_FILE, revision=revision)
+        except Exception:
+            config_path = None
+        if isinstance(config_path, str):
+            # .../snapshots/<commit>/config.json
+            fingerprint['revision'] = os.path.basename(os.path.dirname(config_path))
+    if isinstance(config_path, str) and os.path.isfile(config_path):
+        fingerprint['config_sha256'] = _file_sha256(config_path)
+    return fingerprint
+
+def is_current(directory, fingerprint):
+    """Whether a cache entry was built from the source described by fingerprint
+
+    Only fields known on both sides are compared, so a host that has the
+    cache but not the source still uses it. Entries written before
+    fingerprints were recorded count as stale.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            built_from = json.load(f).get('source')
+    except (OSError, ValueError):
+        return False
+    if not built_from:
+        return False
+    return all(
+        built_from.get(key) == value
+        for key, value in fingerprint.items()
+        if value is not None and built_from.get(key) is not None
+    )
+
+def read_safetensors_header(path):
+    """Parse a safetensors header: returns (header dict, byte offset where tensor data starts)"""
+    with open(path, 'rb') as f:
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_size))
+    return header, 8 + header_size
+
+def mmap_state_dict(path):
+    """State dict whose tensors are views into a private memory map of a safetensors file
+
+    Nothing is read up front: pages are faulted in from the page cache when
+    first touched, and processes mapping the same file share them.
+    """
+    header, data_start = read_safetensors_header(path)
+    size = os.path.getsize(path)
+    storage = torch.UntypedStorage.from_file(path, False, size)
+    raw = torch.empty(0, dtype=torch.uint8).set_(storage)
+
+    state_dict = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = SAFETENSORS_DTYPES[info['dtype']]
+        start, end = (data_start + offset for offset in info['data_offsets'])
+        chunk = raw[start:end]
+        if start % torch.empty(0, dtype=dtype).element_size():
+            # Misaligned data cannot be viewed in place; this only happens for foreign files
+            chunk = chunk.clone()
+        state_dict[name] = chunk.view(dtype).reshape(info['shape'])
+    return state_dict
+
+def save_to_cache(model, tokenizer, model_name, dtype_name, root=None, revision=None):
+    """Write a model and tokenizer into the weight cache; the directory appears atomically"""
+    from safetensors.torch import save_model
+
+    directory = cache_dir_for(model_name, dtype_name, root)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.warming-', dir=os.path.dirname(directory))
+    try:
+        model.config.save_pretrained(staging)
+        if getattr(model, 'generation_config', None) is not None:
+            model.generation_config.save_pretrained(staging)
+        tokenizer.save_pretrained(staging)
+        save_model(model, os.path.join(staging, WEIGHTS_FILE))
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump({
+                'model_name': model_name,
+                'dtype': dtype_name,
+                'source': source_fingerprint(model_name, revision),
+                'bytes': os.path.getsize(os.path.join(staging, WEIGHTS_FILE)),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+            }, f, indent=2)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(staging, directory)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return directory
+
+def load_cached_model(directory, dtype_name):
+    """Build the model skeleton without allocating weights, then assign the memory-mapped tensors"""
+    from accelerate import init_empty_weights
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    config = AutoConfig.from_pretrained(directory)
+    with init_empty_weights(include_buffers=False):
+        model = AutoModelForCausalLM.from_config(config, torch_dtype=DTYPES[dtype_name])
+
+    model.load_state_dict(mmap_state_dict(os.path.join(directory, WEIGHTS_FILE)), strict=False, assign=True)
+    # Tied weights (e.g. lm_head sharing the embedding matrix) are stored once
+    model.tie_weights()
+    missing = [name for name, param in model.named_parameters() if param.device.type == 'meta']
+    if missing:
+        raise RuntimeError(f"Weight cache {directory} is missing {len(missing)} tensors, e.g. {missing[0]}")
+    model.eval()
+    return model
+
+def load_model_and_tokenizer(model_name, dtype_name, **from_pretrained_kwargs):
+    """(model, tokenizer) from the weight cache when present, otherwise from the source
+
+    A cache hit needs neither the network nor a deserialization pass. An
+    entry built from a different revision, different source files or a
+    different config is ignored, and in auto mode rebuilt; auto mode also
+    fills the cache after a cold load.
+    """
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    mode = cache_mode()
+    revision = from_pretrained_kwargs.get('revision')
+    directory = cache_dir_for(model_name, dtype_name)
+    cached = mode != 'off' and is_cached(directory)
+    if cached and not is_current(directory, source_fingerprint(model_name, revision)):
+        print(f"♻️ Weight cache {directory} is stale for {model_name}; loading from the source")
+        cached = False
+    if cached:
+        model = load_cached_model(directory, dtype_name)
+        if torch.cuda.is_available():
+            model = model.to('cuda')
+        print(f"⚡ Loaded {model_name} ({dtype_name}) from weight cache {directory}")
+        return model, AutoTokenizer.from_pretrained(directory)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, revision=revision)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=DTYPES[dtype_name], **from_pretrained_kwargs)
+    if mode == 'auto':
+        try:
+            save_to_cache(model, tokenizer, model_name, dtype_name, revision=revision)
+            print(f"💾 Cached {model_name} ({dtype_name}) weights in {directory}")
+        except Exception as e:
+            print(f"⚠️ Could not write weight cache: {e}")
+    return model, tokenizer
+
+def warm_cache(model_name, dtype_name, root=None):
+    """Download/deserialize a model once and store it in the weight cache; returns the directory"""
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=DTYPES[dtype_name], low_cpu_mem_usage=True)
+    directory = save_to_cache(model, tokenizer, model_name, dtype_name, root)
+
+    # Prove the cache loads on its own before reporting success
+    load_cached_model(directory, dtype_name)
+    return directory
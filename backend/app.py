@@ -1,35 +1,211 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import json
 import os
 import sys
+import time
 from datetime import datetime
 
 # Add the AI module to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'ai'))
 
-from ai.financial_advisor import FinancialAdvisor
+from ai.admission import AdmissionController, AdmissionRejected
+from ai.advice_results import render_result
+from ai.financial_advisor import FinancialAdvisor, STATUS_FAILED, STATUS_LOADING, STATUS_READY
+from ai.metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, timed
+from ai.scenario_grid import DEFAULT_ANNUAL_RETURN
+from bridge import create_bridge_blueprint
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing response serialization as its own stage"""
+
+    def dumps(self, obj, **kwargs):
+        with timed('http', 'serialize'):
+            return super().dumps(obj, **kwargs)
 
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 CORS(app)
 
-# Initialize the AI Financial Advisor
-try:
-    advisor = FinancialAdvisor()
-    print("🚀 AI Financial Advisor loaded successfully!")
-except Exception as e:
-    print(f"❌ Error loading AI: {e}")
-    advisor = None
+# Initialize the AI Financial Advisor. Construction is cheap; the model is loaded
+# on a background thread (or on first use when AI_PRELOAD is off) so the server
+# can bind and serve the deterministic endpoints immediately.
+advisor = FinancialAdvisor()
+if os.getenv('AI_PRELOAD', 'true').lower() in ('1', 'true', 'yes'):
+    if advisor.model_workers > 0:
+        # Model workers are forked while loading, which is only safe before any serving thread exists
+        advisor.load()
+    else:
+        advisor.start_loading()
+
+# Bounded priority lanes so a generation pile-up cannot starve the calculators
+admission = AdmissionController()
+
+# /ai/* endpoints called by the Node service (AI_BRIDGE_URL)
+app.register_blueprint(create_bridge_blueprint(advisor, admission))
+
+QUICK_TIPS = [
+    "💰 Pay yourself first - save 20% of your income before spending",
+    "📊 Track your expenses for 30 days to identify spending patterns",
+    "🎯 Set SMART financial goals (Specific, Measurable, Achievable, Relevant, Time-bound)",
+    "💳 Use credit cards responsibly - pay off the full balance each month",
+    "🏦 Build an emergency fund covering 3-6 months of expenses",
+    "📈 Start investing early - compound interest is your friend",
+    "🎉 Celebrate small financial wins to stay motivated",
+    "📱 Use apps like LoopFund to automate your savings",
+    "🏠 Consider the 50/30/20 rule: 50% needs, 30% wants, 20% savings",
+    "🔄 Review and adjust your financial plan quarterly"
+]
+
+QUICK_TIPS_BODY = json.dumps({
+    'success': True,
+    'tips': QUICK_TIPS,
+    'count': len(QUICK_TIPS)
+})
+
+def model_unavailable_response():
+    """503 for generation endpoints while the model is loading or after it failed"""
+    response = jsonify({
+        'error': 'AI service unavailable',
+        'model_status': advisor.status
+    })
+    response.status_code = 503
+    if advisor.status == STATUS_LOADING:
+        response.headers['Retry-After'] = '30'
+    return response
+
+def wants_structured(data):
+    """True when the caller asked for format=structured (JSON body or query string)"""
+    return (data.get('format') or request.args.get('format')) == 'structured'
+
+def structured_response(result, data, parameters):
+    """Typed fields and insight codes instead of prose; the text is only rendered when `render` is set"""
+    payload = {
+        'success': True,
+        'result': result,
+        'parameters': parameters,
+        'timestamp': str(datetime.now())
+    }
+    if data.get('render') or request.args.get('render') in ('1', 'true'):
+        payload['text'] = render_result(result)
+    return jsonify(payload)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    """Request latency per endpoint; for streamed responses this is the time to the headers"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or 'unmatched',
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
+def collect_service_metrics():
+    """Component stats (caches, admission lanes, batching, degradations) as metric rows at scrape time"""
+    rows = [('loopfund_model_ready', 'gauge', 'Whether the generation model is loaded', {}, int(advisor.status == STATUS_READY))]
+    
+    cache_hits = ('loopfund_cache_hits_total', 'counter', 'Cache hits')
+    cache_misses = ('loopfund_cache_misses_total', 'counter', 'Cache misses')
+    if advisor.response_cache:
+        stats = advisor.response_cache.stats()
+        rows.append(cache_hits + ({'cache': 'response', 'endpoint': ''}, stats['hits']))
+        rows.append(cache_misses + ({'cache': 'response', 'endpoint': ''}, stats['misses']))
+    if advisor.semantic_cache:
+        for endpoint, counters in advisor.semantic_cache.stats()['endpoints'].items():
+            rows.append(cache_hits + ({'cache': 'semantic', 'endpoint': endpoint}, counters['exact_hits'] + counters['semantic_hits']))
+            rows.append(cache_misses + ({'cache': 'semantic', 'endpoint': endpoint}, counters['misses']))
+    stats = advisor.prompt_builder.stats()
+    rows.append(cache_hits + ({'cache': 'prompt_tokens', 'endpoint': ''}, stats['cache_hits']))
+    rows.append(cache_misses + ({'cache': 'prompt_tokens', 'endpoint': ''}, stats['cache_misses']))
+    
+    for lane, stats in admission.stats().items():
+        rows.append(('loopfund_admission_queue_depth', 'gauge', 'Requests waiting per admission lane', {'lane': lane}, stats['queue_depth']))
+        rows.append(('loopfund_admission_in_flight', 'gauge', 'Requests being served per admission lane', {'lane': lane}, stats['in_flight']))
+        for reason in ('queue_full', 'deadline'):
+            rows.append(('loopfund_admission_rejected_total', 'counter', 'Requests shed per admission lane',
+                         {'lane': lane, 'reason': reason}, stats[f'rejected_{reason}']))
+    
+    if advisor.scheduler:
+        stats = advisor.scheduler.stats()
+        rows.append(('loopfund_batch_queue_depth', 'gauge', 'Prompts waiting for the batch scheduler', {}, stats['pending']))
+        rows.append(('loopfund_batches_total', 'counter', 'Batched generate calls', {}, stats['batches']))
+    
+    degradations = advisor.degradation_stats()
+    for path in ('complete', 'partial', 'fallback'):
+        rows.append(('loopfund_advice_responses_total', 'counter', 'Advice answers by degradation path',
+                     {'path': path}, degradations[path]))
+    return rows
+
+REGISTRY.add_collector(collect_service_metrics)
+
+@app.errorhandler(AdmissionRejected)
+def admission_rejected_response(error):
+    """429 (queue full) or 503 (queue deadline passed) with a Retry-After hint"""
+    response = jsonify(error.payload())
+    response.status_code = error.status
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def format_sse(event):
+    """Render one advisor event dict as a Server-Sent Events frame"""
+    event = dict(event)
+    name = event.pop('event')
+    return f"event: {name}\ndata: {json.dumps(event)}\n\n"
+
+def sse_response(events, ticket=None):
+    """Stream advisor events to the client as Server-Sent Events, holding the admission ticket until closed"""
+    response = Response(
+        stream_with_context(format_sse(event) for event in events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    if ticket:
+        response.call_on_close(ticket.release)
+    return response
+
+def build_chat_query(message, conversation_history, user_context):
+    """Fold recent conversation turns and user context into a single advisor query within the token budget"""
+    return advisor.prompt_builder.build_chat_query(message, conversation_history, user_context)
+
+def health_payload():
+    """Service and model status shared by the WSGI and ASGI health endpoints"""
+    return {
+        'status': 'healthy',
+        'ai_service': 'available' if advisor.status == STATUS_READY else 'unavailable',
+        'model_status': advisor.status,
+        'model_error': advisor.load_error,
+        'inference_backend': advisor.backend,
+        'batching': advisor.scheduler.stats() if advisor.scheduler else None,
+        'model_server': advisor.model_server.stats() if advisor.model_server else None,
+        'speculative_decoding': advisor.speculative.stats() if advisor.speculative else None,
+        'prompt_builder': advisor.prompt_builder.stats(),
+        'degradation': advisor.degradation_stats(),
+        'admission': admission.stats(),
+        'cache': advisor.response_cache.stats() if advisor.response_cache else None,
+        'semantic_cache': advisor.semantic_cache.stats() if advisor.semantic_cache else None,
+        'service': 'LoopFund AI Backend'
+    }
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'ai_service': 'available' if advisor else 'unavailable',
-        'service': 'LoopFund AI Backend'
-    })
+    return jsonify(health_payload())
 
 @app.route('/api/ai/advice', methods=['POST'])
+@admission.admitted('interactive')
 def get_ai_advice():
     """Get AI-powered financial advice"""
     try:
@@ -40,15 +216,17 @@ def get_ai_advice():
         if not user_query:
             return jsonify({'error': 'Query is required'}), 400
         
-        if not advisor:
-            return jsonify({'error': 'AI service unavailable'}), 503
+        if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+            return model_unavailable_response()
         
-        # Get AI advice
-        advice = advisor.get_financial_advice(user_query, user_profile)
+        # Get AI advice within the latency budget (degraded answers say how)
+        result = advisor.generateAdvice(user_query, user_profile, budget_ms=data.get('latency_budget_ms'))
         
         return jsonify({
             'success': True,
-            'advice': advice,
+            'advice': result['advice'],
+            'degradation': result['degradation'],
+            'degradation_reason': result['degradation_reason'],
             'query': user_query,
             'timestamp': str(datetime.now())
         })
@@ -58,8 +236,9 @@ def get_ai_advice():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/ai/savings-plan', methods=['POST'])
+@admission.admitted('deterministic')
 def get_savings_plan():
-    """Get AI-generated savings plan"""
+    """Get AI-generated savings plan (typed fields with format=structured)"""
     try:
         data = request.json
         goal_amount = float(data.get('goal_amount', 0))
@@ -70,8 +249,14 @@ def get_savings_plan():
         if not all([goal_amount, timeline_months, monthly_income, monthly_expenses]):
             return jsonify({'error': 'All parameters are required'}), 400
         
-        if not advisor:
-            return jsonify({'error': 'AI service unavailable'}), 503
+        if wants_structured(data):
+            result = advisor.get_savings_plan_result(goal_amount, timeline_months, monthly_income, monthly_expenses)
+            return structured_response(result, data, {
+                'goal_amount': goal_amount,
+                'timeline_months': timeline_months,
+                'monthly_income': monthly_income,
+                'monthly_expenses': monthly_expenses
+            })
         
         # Get savings plan
         plan = advisor.get_savings_plan(
@@ -97,9 +282,41 @@ def get_savings_plan():
         print(f"Error in savings plan endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/ai/savings-plan/grid', methods=['POST'])
+@admission.admitted('deterministic')
+def get_savings_plan_grid():
+    """Savings plans for every goal amount x timeline, for what-if sliders
+
+    Answers with arrays indexed [goal][timeline] instead of rendered text;
+    pass `render` as [[goal_index, timeline_index], ...] to also get the
+    plan text for those cells.
+    """
+    try:
+        data = request.json or {}
+        monthly_income = float(data.get('monthly_income', 0))
+        monthly_expenses = float(data.get('monthly_expenses', 0))
+        if not monthly_income or 'goal_amounts' not in data or 'timeline_months' not in data:
+            return jsonify({'error': 'goal_amounts, timeline_months, monthly_income and monthly_expenses are required'}), 400
+        
+        grid = advisor.get_savings_plan_grid(
+            data['goal_amounts'],
+            data['timeline_months'],
+            monthly_income,
+            monthly_expenses,
+            render=data.get('render')
+        )
+        return jsonify({'success': True, 'grid': grid, 'timestamp': str(datetime.now())})
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid grid: {e}'}), 400
+    except Exception as e:
+        print(f"Error in savings plan grid endpoint: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/ai/budget-analysis', methods=['POST'])
+@admission.admitted('deterministic')
 def get_budget_analysis():
-    """Get AI-powered budget analysis"""
+    """Get AI-powered budget analysis (typed fields with format=structured)"""
     try:
         data = request.json
         income = float(data.get('income', 0))
@@ -109,8 +326,9 @@ def get_budget_analysis():
         if not income or not expenses:
             return jsonify({'error': 'Income and expenses are required'}), 400
         
-        if not advisor:
-            return jsonify({'error': 'AI service unavailable'}), 503
+        if wants_structured(data):
+            result = advisor.get_budget_advice_result(income, expenses)
+            return structured_response(result, data, {'income': income, 'expenses': expenses, 'goals': goals})
         
         # Get budget advice
         advice = advisor.get_budget_advice(income, expenses, goals)
@@ -130,8 +348,9 @@ def get_budget_analysis():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/api/ai/investment-advice', methods=['POST'])
+@admission.admitted('deterministic')
 def get_investment_advice():
-    """Get AI-powered investment advice"""
+    """Get AI-powered investment advice (typed fields with format=structured)"""
     try:
         data = request.json
         age = int(data.get('age', 25))
@@ -141,8 +360,13 @@ def get_investment_advice():
         if not all([age, investment_amount]):
             return jsonify({'error': 'Age and investment amount are required'}), 400
         
-        if not advisor:
-            return jsonify({'error': 'AI service unavailable'}), 503
+        if wants_structured(data):
+            result = advisor.get_investment_advice_result(age, investment_amount)
+            return structured_response(result, data, {
+                'age': age,
+                'risk_tolerance': risk_tolerance,
+                'investment_amount': investment_amount
+            })
         
         # Get investment advice
         advice = advisor.get_investment_advice(age, risk_tolerance, investment_amount)
@@ -162,29 +386,43 @@ def get_investment_advice():
         print(f"Error in investment advice endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/ai/investment-advice/grid', methods=['POST'])
+@admission.admitted('deterministic')
+def get_investment_grid():
+    """Investment profiles for a list of ages and projections of every amount over every horizon
+
+    `years` defaults to 1, 5, 10, 20 and 30 and `annual_return` to 6%;
+    `render` as [[age_index, amount_index], ...] adds the guidance text
+    for those cells.
+    """
+    try:
+        data = request.json or {}
+        if 'ages' not in data or 'investment_amounts' not in data:
+            return jsonify({'error': 'ages and investment_amounts are required'}), 400
+        
+        grid = advisor.get_investment_grid(
+            data['ages'],
+            data['investment_amounts'],
+            data.get('years', [1, 5, 10, 20, 30]),
+            float(data.get('annual_return', DEFAULT_ANNUAL_RETURN)),
+            render=data.get('render')
+        )
+        return jsonify({'success': True, 'grid': grid, 'timestamp': str(datetime.now())})
+        
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid grid: {e}'}), 400
+    except Exception as e:
+        print(f"Error in investment grid endpoint: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/ai/quick-tips', methods=['GET'])
 def get_quick_tips():
     """Get quick financial tips"""
-    tips = [
-        "💰 Pay yourself first - save 20% of your income before spending",
-        "📊 Track your expenses for 30 days to identify spending patterns",
-        "🎯 Set SMART financial goals (Specific, Measurable, Achievable, Relevant, Time-bound)",
-        "💳 Use credit cards responsibly - pay off the full balance each month",
-        "🏦 Build an emergency fund covering 3-6 months of expenses",
-        "📈 Start investing early - compound interest is your friend",
-        "🎉 Celebrate small financial wins to stay motivated",
-        "📱 Use apps like LoopFund to automate your savings",
-        "🏠 Consider the 50/30/20 rule: 50% needs, 30% wants, 20% savings",
-        "🔄 Review and adjust your financial plan quarterly"
-    ]
-    
-    return jsonify({
-        'success': True,
-        'tips': tips,
-        'count': len(tips)
-    })
+    # The tips never change, so the serialized body is built once at startup
+    return app.response_class(QUICK_TIPS_BODY, mimetype='application/json')
 
 @app.route('/api/ai/chat', methods=['POST'])
+@admission.admitted('interactive')
 def ai_chat():
     """General AI chat endpoint for financial questions"""
     try:
@@ -196,30 +434,19 @@ def ai_chat():
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
-        if not advisor:
-            return jsonify({'error': 'AI service unavailable'}), 503
-        
-        # Build context from conversation history
-        context = ""
-        if conversation_history:
-            context = "Previous conversation:\n" + "\n".join([
-                f"User: {msg['user']}\nAI: {msg['ai']}" 
-                for msg in conversation_history[-3:]  # Last 3 messages
-            ]) + "\n\n"
-        
-        # Add user context
-        if user_context:
-            context += f"User Context: {user_context}\n\n"
+        if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+            return model_unavailable_response()
         
-        # Combine with current message
-        full_query = context + f"Current question: {message}"
+        full_query = build_chat_query(message, conversation_history, user_context)
         
-        # Get AI response
-        response = advisor.get_financial_advice(full_query, user_context)
+        # Get AI response within the latency budget (degraded answers say how)
+        result = advisor.generateAdvice(full_query, user_context, 'chat', data.get('latency_budget_ms'))
         
         return jsonify({
             'success': True,
-            'response': response,
+            'response': result['advice'],
+            'degradation': result['degradation'],
+            'degradation_reason': result['degradation_reason'],
             'message': message,
             'timestamp': str(datetime.now())
         })
@@ -228,9 +455,46 @@ def ai_chat():
         print(f"Error in chat endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/ai/advice/stream', methods=['POST'])
+def stream_ai_advice():
+    """Stream AI-powered financial advice token by token (SSE)"""
+    data = request.json or {}
+    user_query = data.get('query', '')
+    user_profile = data.get('user_profile', {})
+    
+    if not user_query:
+        return jsonify({'error': 'Query is required'}), 400
+    
+    if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+        return model_unavailable_response()
+    
+    ticket = admission.acquire('interactive')
+    events = advisor.streamAdvice(user_query, user_profile, budget_ms=data.get('latency_budget_ms'))
+    return sse_response(events, ticket)
+
+@app.route('/api/ai/chat/stream', methods=['POST'])
+def stream_ai_chat():
+    """Stream a chat response token by token (SSE)"""
+    data = request.json or {}
+    message = data.get('message', '')
+    
+    if not message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+        return model_unavailable_response()
+    
+    user_context = data.get('user_context', {})
+    full_query = build_chat_query(message, data.get('history', []), user_context)
+    ticket = admission.acquire('interactive')
+    events = advisor.streamAdvice(full_query, user_context, 'chat', data.get('latency_budget_ms'))
+    return sse_response(events, ticket)
+
 if __name__ == '__main__':
+    port = int(os.getenv('API_PORT', '5000'))
     print("🚀 Starting LoopFund AI Backend...")
     print("📱 AI Financial Advisor: Ready to help with your finances!")
-    print("🌐 Server will run on http://localhost:5000")
+    print(f"🌐 Server will run on http://localhost:{port}")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The development server closes every connection; use asgi.py for keep-alive
+    app.run(debug=True, host='0.0.0.0', port=port)
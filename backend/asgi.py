@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+LoopFund AI Backend - ASGI serving mode
+Production entry point. Health and generation endpoints are native async
+handlers; model calls run on a dedicated generation executor so they never
+occupy the threads that serve the deterministic Flask endpoints, which are
+mounted underneath unchanged.
+
+Run with: python asgi.py   (or: uvicorn asgi:app --workers 2)
+
+Configuration (environment):
+- API_PORT                       port to bind (default 5000)
+- AI_ASGI_WORKERS                uvicorn worker processes (default 1)
+- AI_GENERATION_THREADS          threads in the generation executor (default 16)
+- AI_WSGI_THREADS                threads serving the mounted Flask app (default 10)
+- AI_LANE_<LANE>_CONCURRENCY     requests served at once per admission lane
+- AI_LANE_<LANE>_QUEUE           requests allowed to wait per lane before 429
+- AI_LANE_<LANE>_DEADLINE_MS     longest queue wait per lane before 503
+  (lanes: INTERACTIVE, BATCH, DETERMINISTIC; see ai/admission.py)
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import wraps
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import admission, advisor, app as flask_app, build_chat_query, format_sse, health_payload
+from bridge import financial_advice_payload
+from ai.admission import AdmissionRejected
+from ai.financial_advisor import STATUS_FAILED, STATUS_LOADING
+from ai.metrics import REQUEST_SECONDS
+
+GENERATION_THREADS = int(os.getenv('AI_GENERATION_THREADS', '16'))
+WSGI_THREADS = int(os.getenv('AI_WSGI_THREADS', '10'))
+
+generation_executor = ThreadPoolExecutor(max_workers=GENERATION_THREADS, thread_name_prefix='generation')
+
+async def run_generation(func, *args, lane='interactive'):
+    """Run a blocking model call on the generation executor once its admission lane has a slot"""
+    ticket = await admission.acquire_async(lane)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(generation_executor, func, *args)
+    finally:
+        ticket.release()
+
+def timed_endpoint(handler):
+    """Observe request latency for a native handler under its own name, like Flask's endpoint label
+
+    Rejections raised by the admission lanes are turned into responses by the
+    exception handler and are not timed here.
+    """
+    @wraps(handler)
+    async def wrapper(request):
+        started = time.perf_counter()
+        response = await handler(request)
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=handler.__name__,
+            method=request.method,
+            status=response.status_code
+        )
+        return response
+    return wrapper
+
+async def read_json(request):
+    try:
+        return await request.json() or {}
+    except ValueError:
+        return {}
+
+def model_unavailable_response():
+    """503 for generation endpoints while the model is loading or after it failed"""
+    headers = {'Retry-After': '30'} if advisor.status == STATUS_LOADING else None
+    return JSONResponse({'error': 'AI service unavailable', 'model_status': advisor.status}, status_code=503, headers=headers)
+
+def admission_rejected_response(request, error):
+    """429 (queue full) or 503 (queue deadline passed) with a Retry-After hint"""
+    return JSONResponse(error.payload(), status_code=error.status, headers={'Retry-After': str(error.retry_after)})
+
+async def sse_response(events):
+    """Stream advisor events as SSE, pulling each event on the generation executor
+
+    The interactive slot is taken before the response starts, so an
+    overloaded lane answers with 429/503 instead of an empty stream. The
+    slot is released twice on purpose: the background task runs once the
+    response is done (also after a client disconnect), and the generator's
+    finally covers a stream that fails, where the background task is
+    skipped. Ticket.release is idempotent, so only the first call counts.
+    """
+    ticket = await admission.acquire_async('interactive')
+
+    async def generate():
+        try:
+            loop = asyncio.get_running_loop()
+            while True:
+                event = await loop.run_in_executor(generation_executor, next, events, None)
+                if event is None:
+                    return
+                yield format_sse(event)
+        finally:
+            ticket.release()
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        background=BackgroundTask(ticket.release)
+    )
+
+async def health_check(request):
+    """Health check endpoint; never touches the generation executor"""
+    payload = health_payload()
+    payload['serving'] = {
+        'mode': 'asgi',
+        'generation_threads': GENERATION_THREADS
+    }
+    return JSONResponse(payload)
+
+async def get_ai_advice(request):
+    """Get AI-powered financial advice"""
+    try:
+        data = await read_json(request)
+        user_query = data.get('query', '')
+        user_profile = data.get('user_profile', {})
+
+        if not user_query:
+            return JSONResponse({'error': 'Query is required'}, status_code=400)
+
+        if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+            return model_unavailable_response()
+
+        result = await run_generation(
+            advisor.generateAdvice, user_query, user_profile, 'advice', data.get('latency_budget_ms')
+        )
+
+        return JSONResponse({
+            'success': True,
+            'advice': result['advice'],
+            'degradation': result['degradation'],
+            'degradation_reason': result['degradation_reason'],
+            'query': user_query,
+            'timestamp': str(datetime.now())
+        })
+
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        print(f"Error in advice endpoint: {e}")
+        return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+async def ai_chat(request):
+    """General AI chat endpoint for financial questions"""
+    try:
+        data = await read_json(request)
+        message = data.get('message', '')
+        conversation_history = data.get('history', [])
+        user_context = data.get('user_context', {})
+
+        if not message:
+            return JSONResponse({'error': 'Message is required'}, status_code=400)
+
+        if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+            return model_unavailable_response()
+
+        full_query = build_chat_query(message, conversation_history, user_context)
+        result = await run_generation(
+            advisor.generateAdvice, full_query, user_context, 'chat', data.get('latency_budget_ms')
+        )
+
+        return JSONResponse({
+            'success': True,
+            'response': result['advice'],
+            'degradation': result['degradation'],
+            'degradation_reason': result['degradation_reason'],
+            'message': message,
+            'timestamp': str(datetime.now())
+        })
+
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        print(f"Error in chat endpoint: {e}")
+        return JSONResponse({'error': 'Internal server error'}, status_code=500)
+
+async def bridge_financial_advice(request):
+    """Bridge advice endpoint for the Node tier"""
+    try:
+        payload, status = await run_generation(financial_advice_payload, advisor, await read_json(request))
+        return JSONResponse(payload, status_code=status)
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        print(f"Error in bridge advice endpoint: {e}")
+        return JSONResponse({'success': False, 'error': 'Internal server error'}, status_code=500)
+
+async def stream_ai_advice(request):
+    """Stream AI-powered financial advice token by token (SSE)"""
+    data = await read_json(request)
+    user_query = data.get('query', '')
+
+    if not user_query:
+        return JSONResponse({'error': 'Query is required'}, status_code=400)
+
+    if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+        return model_unavailable_response()
+
+    events = advisor.streamAdvice(user_query, data.get('user_profile', {}), 'advice', data.get('latency_budget_ms'))
+    return await sse_response(events)
+
+async def stream_ai_chat(request):
+    """Stream a chat response token by token (SSE)"""
+    data = await read_json(request)
+    message = data.get('message', '')
+
+    if not message:
+        return JSONResponse({'error': 'Message is required'}, status_code=400)
+
+    if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+        return model_unavailable_response()
+
+    user_context = data.get('user_context', {})
+    full_query = build_chat_query(message, data.get('history', []), user_context)
+    return await sse_response(advisor.streamAdvice(full_query, user_context, 'chat', data.get('latency_budget_ms')))
+
+app = Starlette(
+    routes=[
+        Route('/api/health', timed_endpoint(health_check), methods=['GET']),
+        Route('/api/ai/advice', timed_endpoint(get_ai_advice), methods=['POST']),
+        Route('/api/ai/chat', timed_endpoint(ai_chat), methods=['POST']),
+        Route('/api/ai/advice/stream', timed_endpoint(stream_ai_advice), methods=['POST']),
+        Route('/api/ai/chat/stream', timed_endpoint(stream_ai_chat), methods=['POST']),
+        Route('/ai/financial-advice', timed_endpoint(bridge_financial_advice), methods=['POST']),
+        # Deterministic calculators stay on Flask. a2wsgi streams request bodies into
+        # the WSGI input (the NDJSON bridge paths read them incrementally) on its own threads.
+        Mount('/', app=WSGIMiddleware(flask_app, workers=WSGI_THREADS))
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    exception_handlers={AdmissionRejected: admission_rejected_response},
+    on_shutdown=[lambda: generation_executor.shutdown(wait=False)]
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.getenv('API_PORT', '5000'))
+    workers = int(os.getenv('AI_ASGI_WORKERS', '1'))
+    print("🚀 Starting LoopFund AI Backend (ASGI)...")
+    print(f"🌐 Server will run on http://localhost:{port} with {workers} worker(s)")
+
+    uvicorn.run('asgi:app', host='0.0.0.0', port=port, workers=workers)
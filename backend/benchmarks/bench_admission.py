@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+LoopFund Admission Control Benchmark
+Flood /api/ai/chat with more concurrent requests than the service can run
+while a steady stream of /api/ai/savings-plan calculator requests is
+served, once with effectively unlimited lanes and once with a small
+bounded interactive lane. Generation is simulated by a CPU-bound busy loop so it
+competes with the calculators the way a real model would.
+
+Usage: python benchmarks/bench_admission.py [--chat 64] [--calculators 400] [--generation-ms 40]
+                                           [--concurrency 2] [--queue 8] [--deadline-ms 250]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AI_PRELOAD', 'false')
+
+import app as app_module
+from ai.admission import AdmissionController
+from ai.financial_advisor import STATUS_READY
+
+UNBOUNDED = {name: (10_000, 10_000, 600_000) for name in ('interactive', 'batch', 'deterministic')}
+
+CHAT_BODY = {'message': 'How much should I save each month for a car?', 'history': [], 'user_context': {}}
+PLAN_BODY = {'goal_amount': 5000, 'timeline_months': 10, 'monthly_income': 4000, 'monthly_expenses': 3000}
+
+def fake_generation(generation_ms):
+    """Burn generation_ms of this thread's CPU time (holding the GIL), like a model forward pass"""
+    def generate(query, user_profile=None, endpoint='advice', budget_ms=None):
+        deadline = time.thread_time() + generation_ms / 1000.0
+        while time.thread_time() < deadline:
+            pass
+        return {'advice': 'Save $500 per month.', 'degradation': None, 'degradation_reason': None}
+    return generate
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[int(share * (len(values) - 1))] if values else 0.0
+
+def run(lanes, args):
+    # Swap the controller the decorated views read their lanes from
+    controller = AdmissionController(lanes)
+    app_module.admission.lanes = controller.lanes
+    client = app_module.app.test_client()
+    chat_statuses = Counter()
+    retry_after = []
+    chat_latencies = []
+    calculator_latencies = []
+    lock = threading.Lock()
+
+    burst = threading.Barrier(args.chat)
+
+    def chat():
+        burst.wait()
+        start = time.perf_counter()
+        response = client.post('/api/ai/chat', json=CHAT_BODY)
+        with lock:
+            chat_statuses[response.status_code] += 1
+            if response.status_code == 200:
+                chat_latencies.append(time.perf_counter() - start)
+            if 'Retry-After' in response.headers:
+                retry_after.append(int(response.headers['Retry-After']))
+
+    def calculators():
+        for _ in range(args.calculators):
+            start = time.perf_counter()
+            client.post('/api/ai/savings-plan', json=PLAN_BODY)
+            calculator_latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=chat) for _ in range(args.chat)]
+    calculator_thread = threading.Thread(target=calculators)
+    start = time.perf_counter()
+    calculator_thread.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads + [calculator_thread]:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'elapsed': elapsed,
+        'chat_statuses': dict(sorted(chat_statuses.items())),
+        'chat_p95_ms': 1000 * percentile(chat_latencies, 0.95),
+        'retry_after': sorted(set(retry_after)),
+        'calculator_p50_ms': 1000 * percentile(calculator_latencies, 0.5),
+        'calculator_p99_ms': 1000 * percentile(calculator_latencies, 0.99),
+        'lanes': controller.stats()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chat', type=int, default=64, help='Concurrent chat requests in the burst')
+    parser.add_argument('--calculators', type=int, default=400, help='Sequential savings-plan requests')
+    parser.add_argument('--generation-ms', type=float, default=40)
+    parser.add_argument('--concurrency', type=int, default=2, help='Bounded interactive lane: concurrent generations')
+    parser.add_argument('--queue', type=int, default=8, help='Bounded interactive lane: queued requests')
+    parser.add_argument('--deadline-ms', type=float, default=250, help='Bounded interactive lane: queue deadline')
+    args = parser.parse_args()
+
+    bounded = dict(UNBOUNDED, interactive=(args.concurrency, args.queue, args.deadline_ms))
+
+    advisor = app_module.advisor
+    advisor.status = STATUS_READY
+    advisor.generateAdvice = fake_generation(args.generation_ms)
+
+    print("🚀 LoopFund Admission Control Benchmark")
+    print(f"   chat burst={args.chat}, calculators={args.calculators}, generation={args.generation_ms:.0f} ms")
+    print(f"   bounded interactive lane: {args.concurrency} concurrent, {args.queue} queued, {args.deadline_ms:.0f} ms deadline")
+    print("=" * 60)
+
+    for label, lanes in (('unbounded lanes', UNBOUNDED), ('bounded lanes', bounded)):
+        result = run(lanes, args)
+        interactive = result['lanes']['interactive']
+        print(f"{label}:")
+        print(f"   chat statuses {result['chat_statuses']}, served p95 {result['chat_p95_ms']:.0f} ms, "
+              f"Retry-After {result['retry_after'] or '-'}")
+        print(f"   interactive queue wait p95 {interactive['wait_ms']['p95']:.0f} ms, "
+              f"rejected {interactive['rejected_queue_full']} full / {interactive['rejected_deadline']} deadline")
+        print(f"   calculators p50 {result['calculator_p50_ms']:.2f} ms, p99 {result['calculator_p99_ms']:.2f} ms "
+              f"(run took {result['elapsed']:.2f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+LoopFund Monte Carlo Forecast Benchmark
+Time SavingsPredictor.forecastGoalCompletionBatch for batches of goals with
+irregular contribution histories (skipped months, occasional bonuses) and
+check it against the deterministic predictor: a goal whose history is one
+constant amount must forecast exactly the months predictGoalCompletion gives.
+
+Usage: python benchmarks/bench_forecast.py [--goals 1,10,100] [--paths 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.savings_predictor import SavingsPredictor
+
+def random_goals(count, seed=7):
+    """Goals a few months to a few years away, each with 12-36 months of lumpy contributions"""
+    rng = np.random.default_rng(seed)
+    histories = []
+    for _ in range(count):
+        months = rng.integers(12, 37)
+        amounts = rng.gamma(2.0, 150.0, months)
+        amounts[rng.random(months) < 0.3] = 0.0
+        amounts[rng.random(months) < 0.05] += rng.uniform(500, 2000)
+        histories.append(amounts.round(2).tolist())
+    means = np.array([np.mean(history) for history in histories])
+    goals = {
+        'goal_amount': (means * rng.uniform(3, 36, count)).round(2),
+        'current_savings': (means * rng.uniform(0, 2, count)).round(2)
+    }
+    return goals, histories
+
+def check_constant_parity(predictor):
+    """A constant history has no spread: P10 = P50 = P90 = the deterministic months"""
+    mismatches = 0
+    for goal_amount, monthly in ((5000, 500), (12000, 750), (900, 125), (30000, 410)):
+        expected = predictor.predictGoalCompletion({'goal_amount': goal_amount, 'monthly_savings': monthly})
+        forecast = predictor.forecastGoalCompletions(
+            [{'goal_amount': goal_amount, 'contributions': [monthly] * 6}], paths=1000, seed=0
+        )[0]['forecast']['months_to_goal']
+        months = expected['prediction']['months_to_goal']
+        if any(abs(forecast[key] - months) > 0.1 for key in ('p10', 'p50', 'p90')):
+            mismatches += 1
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--goals', default='1,10,100', help='Comma-separated batch sizes')
+    parser.add_argument('--paths', type=int, default=10000)
+    parser.add_argument('--horizon', type=int, default=120, help='Months simulated at most')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per batch size (best one is reported)')
+    args = parser.parse_args()
+
+    predictor = SavingsPredictor()
+    print("🚀 LoopFund Monte Carlo Forecast Benchmark")
+    print(f"   paths per goal={args.paths}, horizon={args.horizon} months")
+    print("=" * 60)
+    print(f"   constant-history parity with predictGoalCompletion: {check_constant_parity(predictor)} mismatches")
+    print(f"\n{'goals':>8} {'best ms':>9} {'paths/s':>12} {'P50 months (median goal)':>26}")
+
+    for count in [int(value) for value in args.goals.split(',')]:
+        goals, histories = random_goals(count)
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = predictor.forecastGoalCompletionBatch(
+                goals, histories, paths=args.paths, horizon_months=args.horizon, seed=0, now=datetime(2026, 1, 15)
+            )
+            best = min(best, time.perf_counter() - start)
+        print(f"{count:>8} {1000 * best:>9.1f} {count * args.paths / best:>12,.0f} "
+              f"{np.nanmedian(result['months_p50']):>26.1f}")
+
+if __name__ == "__main__":
+    main()
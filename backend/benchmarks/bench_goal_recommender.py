@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+LoopFund Goal Recommender Benchmark
+Build a cohort index from synthetic user, goal and contribution exports,
+then time what serving costs: one recommendation per call from the index
+against the fixed age-bracket recommendGoals, and batch scoring of the
+whole user base. Batch rows are checked against single recommendations
+for a sample of users. Pass --out-dir to keep the exports and the index for
+trying the CLI (python -m ai.goal_recommender build/score).
+
+Usage: python benchmarks/bench_goal_recommender.py [--users 100000] [--calls 20000] [--out-dir DIR]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AI_PRELOAD', 'false')
+
+from ai.financial_advisor import FinancialAdvisor
+from ai.goal_recommender import COHORT_LEVELS, GOAL_TYPES, build_cohort_index
+
+def synthetic_exports(count, seed=11):
+    """Users with 0-4 goals each, goal mix and size drifting with age and income, and monthly contributions"""
+    rng = np.random.default_rng(seed)
+    users = pd.DataFrame({
+        'user_id': np.arange(count),
+        'age': rng.integers(18, 75, count),
+        'income': np.round(rng.lognormal(np.log(55000), 0.6, count), -2)
+    })
+
+    goals_per_user = rng.integers(0, 5, count)
+    owner = np.repeat(users['user_id'].to_numpy(), goals_per_user)
+    age = users['age'].to_numpy()[owner]
+    income = users['income'].to_numpy()[owner]
+    # Younger users lean to travel/emergency, older ones to family/business
+    weights = np.stack([
+        np.full(len(owner), 1.0), 0.5 + (age > 35), 1.5 * (age < 30) + 0.3, 1.5 * (age < 35) + 0.2,
+        np.full(len(owner), 1.5), 0.3 + (age > 30) * 1.2, np.full(len(owner), 0.4)
+    ], axis=1)
+    cumulative = np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+    category = (rng.random(len(owner))[:, None] > cumulative).sum(axis=1)
+    created = np.datetime64('2024-01-01') + rng.integers(0, 600, len(owner)).astype('timedelta64[D]')
+    completed = rng.random(len(owner)) < 0.35 + 0.2 * (income > 75000)
+    goals = pd.DataFrame({
+        'goal_id': np.arange(len(owner)),
+        'user_id': owner,
+        'category': np.asarray(GOAL_TYPES)[category],
+        'target_amount': np.round(income * rng.uniform(0.02, 0.3, len(owner)), 2),
+        'status': np.where(completed, 'completed', 'in_progress'),
+        'created_at': created,
+        'completed_at': np.where(completed, created + rng.integers(60, 700, len(owner)).astype('timedelta64[D]'),
+                                 np.datetime64('NaT'))
+    })
+
+    months = rng.integers(1, 13, len(goals))
+    goal_id = np.repeat(goals['goal_id'].to_numpy(), months)
+    contributions = pd.DataFrame({
+        'goal_id': goal_id,
+        'amount': np.round(goals['target_amount'].to_numpy()[goal_id] / rng.uniform(6, 36, len(goal_id)), 2),
+        'paid_at': np.repeat(created, months) + (30 * (np.arange(len(goal_id)) - np.repeat(np.cumsum(months) - months, months))).astype('timedelta64[D]'),
+        'status': 'completed'
+    })
+    return users, goals, contributions
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return 1e6 * (time.perf_counter() - start) / calls
+
+def check_parity(index, users, scored, top_k, samples=2000):
+    """Count sampled users whose batch rows differ from their single recommendation"""
+    columns = ['type', 'target_amount', 'timeline_months', 'monthly_savings', 'score']
+    batch = {user_id: rows for user_id, rows in scored.groupby('user_id', observed=True)}
+    mismatches = 0
+    for user in users.head(samples).itertuples(index=False):
+        recommendations, _ = index.recommend(user.age, user.income, top_k)
+        rows = batch.get(user.user_id)
+        expected = [] if rows is None else [
+            dict(zip(columns, values)) for values in zip(*(rows[column].tolist() for column in columns))
+        ]
+        mismatches += [{column: r[column] for column in columns} for r in recommendations] != expected
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100000, help='Synthetic users to build the index from')
+    parser.add_argument('--calls', type=int, default=20000, help='Single recommendations per timing')
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--out-dir', help='Directory to write users.csv, goals.csv, contributions.csv and cohorts.json to')
+    args = parser.parse_args()
+
+    print("🚀 LoopFund Goal Recommender Benchmark")
+    print("=" * 60)
+    users, goals, contributions = synthetic_exports(args.users)
+    print(f"   exports: {len(users):,} users, {len(goals):,} goals, {len(contributions):,} contributions")
+
+    start = time.perf_counter()
+    index = build_cohort_index(users, goals, contributions)
+    levels = np.bincount(index.levels, minlength=len(COHORT_LEVELS))
+    print(f"   index build: {time.perf_counter() - start:.2f} s "
+          f"({', '.join(f'{count} cells from {level}' for level, count in zip(COHORT_LEVELS, levels))})")
+
+    # Caching would hide the recommenders themselves
+    brackets = FinancialAdvisor(response_cache=False, semantic_cache=False)
+    brackets.goal_cohorts = None
+    cohorts = FinancialAdvisor(response_cache=False, semantic_cache=False, goal_cohorts=index)
+    profiles = [{'age': 18 + i % 57, 'income': 20000 + 997 * (i % 250)} for i in range(args.calls)]
+    print(f"\n   {'recommendGoals':<26} {'µs/call':>9}")
+    print(f"   {'fixed age brackets':<26} {per_call_us(lambda i: brackets.recommendGoals(profiles[i]), args.calls):9.2f}")
+    print(f"   {'cohort index':<26} {per_call_us(lambda i: cohorts.recommendGoals(profiles[i], args.top_k), args.calls):9.2f}")
+
+    start = time.perf_counter()
+    scored = index.score(users, args.top_k)
+    seconds = time.perf_counter() - start
+    print(f"\n   batch score: {len(users):,} users -> {len(scored):,} rows in {1000 * seconds:.1f} ms "
+          f"({len(users) / seconds:,.0f} users/s)")
+    samples = min(len(users), 2000)
+    print(f"🔍 Parity on {samples:,} sampled users: {check_parity(index, users, scored, args.top_k, samples)} mismatches")
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+        users.to_csv(os.path.join(args.out_dir, 'users.csv'), index=False)
+        goals.to_csv(os.path.join(args.out_dir, 'goals.csv'), index=False)
+        contributions.to_csv(os.path.join(args.out_dir, 'contributions.csv'), index=False)
+        index.save(os.path.join(args.out_dir, 'cohorts.json'))
+        print(f"   exports and index written to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+LoopFund Keyword Matcher Benchmark
+Compare the per-keyword substring scans BehavioralAnalyzer used to run with
+the single compiled KeywordMatcher pass, on long journal-style texts and on
+a large batch of short texts.
+
+Usage: python benchmarks/bench_keyword_matcher.py [--texts 100000] [--journal-words 20000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.behavioral_analyzer import SPENDING_MATCHER
+
+KEYWORD_TEXT = (
+    'today i went to the store and bought groceries then spent some money on coffee '
+    'i want to save more this month and stick to my budget plan but felt stressed '
+    'and bored so i treated myself the price was high and the cost added up '
+    'tracking expenses helps me reduce impulse purchases and limit shopping trips '
+    'unsaved costume cutlery planet reprice overspend savings budgeting planning'
+).split()
+
+FILLER = (
+    'the a and of to in it was i my we went home after work with friends family dinner weekend '
+    'morning rent bus train walked talked read book movie phone call email meeting kids school '
+    'car gas weather rain sun happy tired long day night early late week month year nothing special'
+).split()
+
+def legacy_counts(text):
+    """The original _analyzeSpendingPatterns scans: one substring search per keyword"""
+    text_lower = text.lower()
+    spending_keywords = ['spend', 'bought', 'purchase', 'expense', 'cost', 'price', 'shopping']
+    saving_keywords = ['save', 'budget', 'cut', 'reduce', 'limit']
+    emotional_words = ['stress', 'bored', 'sad', 'excited', 'impulse', 'treat']
+    return {
+        'spending': sum(1 for word in spending_keywords if word in text_lower),
+        'saving': sum(1 for word in saving_keywords if word in text_lower),
+        'emotional': sum(1 for word in emotional_words if word in text_lower),
+        'budget_awareness': int(any(word in text_lower for word in ['budget', 'plan', 'track']))
+    }
+
+def random_text(rng, words, keyword_share=0.08):
+    """Journal-style text where roughly `keyword_share` of the words are spending vocabulary"""
+    return ' '.join(rng.choice(KEYWORD_TEXT) if rng.random() < keyword_share else rng.choice(FILLER) for _ in range(words))
+
+def timed(func, texts):
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=100_000)
+    parser.add_argument('--text-words', type=int, default=40)
+    parser.add_argument('--journals', type=int, default=50)
+    parser.add_argument('--journal-words', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    journals = [random_text(rng, args.journal_words) for _ in range(args.journals)]
+    texts = [random_text(rng, rng.randint(args.text_words // 2, args.text_words * 2)) for _ in range(args.texts)]
+    matcher = lambda text: SPENDING_MATCHER.count(text, distinct=True)
+
+    print("🚀 LoopFund Keyword Matcher Benchmark")
+    print(f"   journals={args.journals} x {args.journal_words:,} words, texts={args.texts:,}")
+    print("=" * 60)
+
+    for label, corpus in (('long journals', journals), ('short texts', texts)):
+        legacy = timed(legacy_counts, corpus)
+        compiled = timed(matcher, corpus)
+        print(f"{label:14s}: legacy {legacy:7.3f} s  compiled {compiled:7.3f} s  ({legacy / compiled:.2f}x)")
+
+    # The legacy scan also counts keywords found inside other words
+    example = "My unsaved costume had cutlery on it"
+    print(f"🔍 '{example}': legacy {legacy_counts(example)} -> compiled {matcher(example)}")
+    changed = sum(legacy_counts(text) != matcher(text) for text in texts[:10_000])
+    print(f"🔍 {changed:,} of 10,000 texts counted differently (substring vs whole-word matches)")
+
+if __name__ == "__main__":
+    main()
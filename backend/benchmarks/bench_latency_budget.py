@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+LoopFund Latency Budget Benchmark
+Overload FinancialAdvisor with more concurrent advice requests than it can
+decode in time, once without a latency budget and once per budget, and
+report latency percentiles next to how many answers were complete,
+partial (cut at the deadline) or fallback advice.
+
+Usage: python benchmarks/bench_latency_budget.py [--requests 48] [--concurrency 16] [--budgets 250,1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.financial_advisor import FinancialAdvisor
+from benchmarks.tiny_model import SAMPLE_QUERIES, build_tiny_model
+
+def run_load(advisor, total_requests, concurrency, budget_ms):
+    """Send total_requests advice calls from `concurrency` threads; returns latencies and degradations"""
+    def one_request(i):
+        start = time.perf_counter()
+        result = advisor.generateAdvice(
+            f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} (request {i})",
+            {'income': 4000, 'age': 29},
+            budget_ms=budget_ms
+        )
+        return time.perf_counter() - start, result['degradation'] or 'complete'
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_request, range(total_requests)))
+
+    latencies_ms = np.array([latency for latency, _ in results]) * 1000
+    return {
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+        'degradations': Counter(degradation for _, degradation in results)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--budgets', default='250,1000', help='Comma-separated budgets in ms')
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--max-new-tokens', type=int, default=96)
+    parser.add_argument('--model', help='Model path or name (defaults to a freshly built tiny model)')
+    args = parser.parse_args()
+
+    model_path = args.model or build_tiny_model()
+    # No budget at all is the baseline the budgets are compared against
+    advisor = FinancialAdvisor(model_name=model_path, max_batch_size=args.batch_size, semantic_cache=False, latency_budget_ms=0)
+    advisor.load()
+    # A fixed answer length makes every request cost the same amount of decoding
+    advisor.generation_kwargs.update(max_new_tokens=args.max_new_tokens, min_new_tokens=args.max_new_tokens)
+
+    print("🚀 LoopFund Latency Budget Benchmark")
+    print(f"   model={model_path} requests={args.requests} concurrency={args.concurrency} "
+          f"batch={args.batch_size} new tokens={args.max_new_tokens}")
+    print("=" * 60)
+    print(f"{'budget':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'complete':>9} {'partial':>8} {'fallback':>9}")
+
+    run_load(advisor, min(4, args.requests), 1, None)
+    for budget_ms in [None] + [float(budget) for budget in args.budgets.split(',')]:
+        result = run_load(advisor, args.requests, args.concurrency, budget_ms)
+        counts = result['degradations']
+        label = 'none' if budget_ms is None else f"{budget_ms:.0f}"
+        print(f"{label:>8} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['max_ms']:>9.1f} "
+              f"{counts['complete']:>9} {counts['partial']:>8} {counts['fallback']:>9}")
+
+    advisor.scheduler.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+LoopFund Metrics Overhead Benchmark
+Measure what the /metrics instrumentation costs: the per-call price of
+recording a histogram observation, a counter increment and a timed()
+stage, the end-to-end cost on the cheapest endpoints (the savings-plan
+calculator and behavioral analysis) with metrics on and off, and how
+long a /metrics scrape takes to render.
+
+Usage: python benchmarks/bench_metrics.py [--calls 200000] [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AI_PRELOAD', 'false')
+
+import app as app_module
+from ai.metrics import REGISTRY, Counter, Histogram, Registry, timed
+
+HISTORY = [{'type': 'contribution', 'amount': 50}] * 20 + [{'type': 'goal', 'status': 'active'}] * 3
+
+def per_call_ns(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return 1e9 * (time.perf_counter() - start) / calls
+
+def microbenchmarks(calls):
+    """ns per call of each recording primitive, with metrics enabled"""
+    registry = Registry(enabled=True)
+    histogram = Histogram(registry, 'bench_seconds', 'Benchmark histogram', ('stage',))
+    counter = Counter(registry, 'bench_total', 'Benchmark counter', ('path',))
+
+    def stage():
+        with timed('bench', 'stage'):
+            pass
+
+    return {
+        'Histogram.observe': per_call_ns(lambda: histogram.observe(0.003, stage='decode'), calls),
+        'Counter.inc': per_call_ns(lambda: counter.inc(path='pipeline'), calls),
+        'timed() block': per_call_ns(stage, calls)
+    }
+
+def endpoint_us(client, requests, offset):
+    """µs per request for each endpoint; the goal amount varies so the response cache never answers"""
+    start = time.perf_counter()
+    for i in range(requests):
+        client.post('/api/ai/savings-plan', json={
+            'goal_amount': 5000 + offset + i, 'timeline_months': 10, 'monthly_income': 4000, 'monthly_expenses': 3000
+        })
+    savings_plan = 1e6 * (time.perf_counter() - start) / requests
+
+    start = time.perf_counter()
+    for i in range(requests):
+        client.post('/ai/behavioral-analysis', json={'userText': f'I spend a lot on food {i}', 'userHistory': HISTORY})
+    behavioral = 1e6 * (time.perf_counter() - start) / requests
+    return {'/api/ai/savings-plan': savings_plan, '/ai/behavioral-analysis': behavioral}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000, help='Calls per microbenchmark')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and setting')
+    parser.add_argument('--rounds', type=int, default=3, help='Alternating on/off rounds (best one is kept)')
+    args = parser.parse_args()
+
+    print("🚀 LoopFund Metrics Overhead Benchmark")
+    print("=" * 60)
+
+    for name, ns in microbenchmarks(args.calls).items():
+        print(f"   {name:<20} {ns:8.0f} ns/call")
+
+    client = app_module.app.test_client()
+    endpoint_us(client, 200, -10**6)
+
+    # Alternate the settings so drift in the machine affects both alike
+    best = {True: {}, False: {}}
+    for round_index in range(args.rounds):
+        for enabled in (False, True):
+            REGISTRY.enabled = enabled
+            offset = (2 * round_index + enabled) * args.requests
+            for endpoint, us in endpoint_us(client, args.requests, offset).items():
+                best[enabled][endpoint] = min(us, best[enabled].get(endpoint, float('inf')))
+    REGISTRY.enabled = True
+
+    print(f"\n   {'endpoint':<26} {'off µs':>9} {'on µs':>9} {'overhead':>9}")
+    for endpoint in best[True]:
+        off, on = best[False][endpoint], best[True][endpoint]
+        print(f"   {endpoint:<26} {off:9.1f} {on:9.1f} {100 * (on - off) / off:8.1f}%")
+
+    start = time.perf_counter()
+    response = client.get('/metrics')
+    render_ms = 1000 * (time.perf_counter() - start)
+    print(f"\n   /metrics scrape: {render_ms:.2f} ms, {len(response.data.splitlines())} lines, {len(response.data)} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+LoopFund Model Server Benchmark
+Serve concurrent advice requests in-process and through forked model worker
+processes, and report aggregate throughput plus per-worker RSS/PSS so nodes
+can be sized: PSS splits shared weight pages between the processes mapping
+them, so the PSS total is what the workers really cost.
+
+Usage: python benchmarks/bench_model_server.py [--workers 0,1,2,4] [--requests 64] [--concurrency 16]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.financial_advisor import FinancialAdvisor
+from ai.inference_backend import model_memory_bytes
+from ai.model_server import read_process_memory
+from benchmarks.bench_batching import run_load
+from benchmarks.tiny_model import build_tiny_model
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', default='0,1,2,4')
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--max-new-tokens', type=int, default=32)
+    parser.add_argument('--layers', type=int, default=4)
+    parser.add_argument('--hidden-size', type=int, default=512)
+    parser.add_argument('--model', help='Model path or name (defaults to a freshly built tiny model)')
+    args = parser.parse_args()
+
+    model_path = args.model or build_tiny_model(
+        num_hidden_layers=args.layers,
+        hidden_size=args.hidden_size,
+        intermediate_size=args.hidden_size * 2
+    )
+
+    print("🚀 LoopFund Model Server Benchmark")
+    print(f"   model={model_path} requests={args.requests} concurrency={args.concurrency} cpus={os.cpu_count()}")
+    print("=" * 60)
+
+    for workers in [int(w) for w in args.workers.split(',')]:
+        advisor = FinancialAdvisor(
+            model_name=model_path,
+            max_batch_size=args.batch_size,
+            semantic_cache=False,
+            model_workers=workers
+        )
+        advisor.generation_kwargs['max_new_tokens'] = args.max_new_tokens
+        advisor.load()
+
+        run_load(advisor, min(4, args.requests), 1)
+        result = run_load(advisor, args.requests, args.concurrency)
+        weights_mb = model_memory_bytes(advisor.conversation_model.model) / 2**20
+
+        print(f"\nworkers={workers}: {result['throughput_rps']:.2f} req/s  p50 {result['p50_ms']:.0f} ms  p99 {result['p99_ms']:.0f} ms")
+        print(f"   model weights {weights_mb:.1f} MB")
+        if advisor.model_server:
+            stats = advisor.model_server.stats()
+            processes = [dict(stats['front_end'], index='front')] + stats['workers']
+        else:
+            processes = [dict(read_process_memory(os.getpid()), index='front', pid=os.getpid())]
+        for process in processes:
+            print(
+                f"   {str(process['index']):>5} pid {process['pid']:>7}: rss {process.get('rss_mb', 0):7.1f} MB  "
+                f"pss {process.get('pss_mb', 0):7.1f} MB  shared {process.get('shared_mb', 0):7.1f} MB  "
+                f"private {process.get('private_mb', 0):7.1f} MB"
+            )
+        print(f"   total pss {sum(p.get('pss_mb', 0) for p in processes):.1f} MB vs rss sum {sum(p.get('rss_mb', 0) for p in processes):.1f} MB")
+
+        if advisor.model_server:
+            advisor.model_server.shutdown()
+        elif advisor.scheduler:
+            advisor.scheduler.shutdown()
+
+if __name__ == "__main__":
+    main()
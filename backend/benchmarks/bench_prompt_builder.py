@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+LoopFund Prompt Builder Benchmark
+Grow a chat conversation turn by turn and compare the prompt the old
+/api/ai/chat concatenation produced with the budgeted PromptBuilder: prompt
+tokens and build time per request, at several conversation lengths.
+
+Usage: python benchmarks/bench_prompt_builder.py [--model PATH] [--turns 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.prompt_builder import PromptBuilder
+from tiny_model import SAMPLE_QUERIES, build_tiny_model
+
+USER_CONTEXT = {
+    'userId': 'u-123', 'income': 5200, 'monthlyExpenses': 3900, 'riskTolerance': 'moderate',
+    'goals': [{'name': 'Emergency fund', 'target': 10000, 'saved': 2500}, {'name': 'Car', 'target': 8000, 'saved': 900}],
+    'notes': None, 'groups': []
+}
+
+def legacy_chat_query(message, conversation_history, user_context):
+    """The prompt /api/ai/chat built before: last three turns and str(user_context), verbatim"""
+    context = ""
+    if conversation_history:
+        context = "Previous conversation:\n"
+        for msg in conversation_history[-3:]:
+            context += f"User: {msg.get('user', '')}\nAI: {msg.get('ai', '')}\n"
+        context += "\n"
+    if user_context:
+        context += f"User Context: {str(user_context)}\n\n"
+    return context + f"Current question: {message}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help='Model directory whose tokenizer to use (default: a tiny local one)')
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--answer-words', type=int, default=120)
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model or build_tiny_model())
+    builder = PromptBuilder(tokenizer=tokenizer)
+    count = lambda text: len(tokenizer(text, add_special_tokens=False).input_ids)
+
+    rng = random.Random(7)
+    words = ' '.join(SAMPLE_QUERIES).split()
+    checkpoints = sorted({n for n in (1, 3, 10, 50, args.turns) if n <= args.turns})
+
+    print("🚀 LoopFund Prompt Builder Benchmark")
+    print(f"   turns={args.turns}, ~{args.answer_words} words per answer, budgets={builder.stats()['budgets']}")
+    print("=" * 60)
+    print(f"{'turns':>6} {'legacy tok':>11} {'legacy ms':>10} {'budget tok':>11} {'budget ms':>10}")
+
+    history = []
+    for turn in range(1, args.turns + 1):
+        message = rng.choice(SAMPLE_QUERIES)
+        answer = ' '.join(rng.choice(words) for _ in range(args.answer_words))
+
+        start = time.perf_counter()
+        legacy = legacy_chat_query(message, history, USER_CONTEXT)
+        legacy_tokens = count(legacy)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        budgeted = builder.build_chat_query(message, history, USER_CONTEXT)
+        budgeted_tokens = builder.count_tokens(budgeted)
+        budgeted_ms = (time.perf_counter() - start) * 1000
+
+        if turn in checkpoints:
+            print(f"{turn:6d} {legacy_tokens:11d} {legacy_ms:10.2f} {budgeted_tokens:11d} {budgeted_ms:10.2f}")
+        history.append({'user': message, 'ai': answer})
+
+    stats = builder.stats()
+    print("=" * 60)
+    print(f"💾 segment cache: {stats['cache_hits']:,} hits / {stats['cache_misses']:,} misses")
+    print(f"📉 turns verbatim {stats['turns_verbatim']:,}, summarized {stats['turns_summarized']:,}, "
+          f"dropped {stats['turns_dropped']:,}, truncations {stats['truncations']:,}")
+
+if __name__ == "__main__":
+    main()
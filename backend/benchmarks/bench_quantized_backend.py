@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+LoopFund Quantized Backend Benchmark
+Load the advisor model under each AI_BACKEND in a fresh process and report
+load time, weight memory, peak and steady-state RSS, greedy decoding tokens/sec and output parity
+against the fp32 reference (top-1 agreement on teacher-forced prompts and
+identical greedy tokens).
+
+Usage: python benchmarks/bench_quantized_backend.py [--backends fp32,int8,int4] [--model PATH]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.tiny_model import SAMPLE_QUERIES, build_tiny_model
+
+def read_status_kb(field):
+    """VmRSS / VmHWM of this process in kB, from /proc"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+def measure(model_path, backend, new_tokens, threads):
+    """Runs inside a child process so every backend starts from a clean heap"""
+    import torch
+    import transformers  # noqa: F401  (library import cost is not model memory)
+    from ai.financial_advisor import FinancialAdvisor
+    from ai.inference_backend import model_memory_bytes
+
+    torch.set_num_threads(threads)
+    baseline_kb = read_status_kb('VmRSS')
+    start = time.perf_counter()
+    advisor = FinancialAdvisor(model_name=model_path, max_batch_size=1, prefix_cache=False, backend=backend)
+    advisor.load()
+    load_seconds = time.perf_counter() - start
+    model = advisor.conversation_model.model
+    tokenizer = advisor.conversation_model.tokenizer
+
+    prompts = [advisor._build_context_prompt(query, None) for query in SAMPLE_QUERIES]
+    top1, greedy = [], []
+    generated = 0
+    start = time.perf_counter()
+    with torch.no_grad():
+        for prompt in prompts:
+            input_ids = tokenizer(prompt, return_tensors='pt').input_ids
+            top1.append(model(input_ids).logits[0].argmax(-1).tolist())
+            output = model.generate(
+                input_ids, max_new_tokens=new_tokens, min_new_tokens=new_tokens,
+                do_sample=False, pad_token_id=tokenizer.pad_token_id
+            )
+            greedy.append(output[0, input_ids.shape[1]:].tolist())
+            generated += len(greedy[-1])
+    decode_seconds = time.perf_counter() - start
+
+    return {
+        'backend': advisor.backend,
+        'load_seconds': load_seconds,
+        'rss_mb': (read_status_kb('VmRSS') - baseline_kb) / 1024,
+        'peak_rss_mb': (read_status_kb('VmHWM') - baseline_kb) / 1024,
+        'model_mb': model_memory_bytes(model) / 2**20,
+        'tokens_per_second': generated / decode_seconds,
+        'top1': top1,
+        'greedy': greedy
+    }
+
+def agreement(reference, candidate):
+    """Share of positions where two lists of token sequences agree"""
+    same = total = 0
+    for expected, actual in zip(reference, candidate):
+        same += sum(a == b for a, b in zip(expected, actual))
+        total += len(expected)
+    return same / total if total else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default='fp32,int8,int4')
+    parser.add_argument('--model', help='Model path or name (defaults to a freshly built tiny model)')
+    parser.add_argument('--layers', type=int, default=4)
+    parser.add_argument('--hidden-size', type=int, default=512)
+    parser.add_argument('--new-tokens', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=os.cpu_count())
+    parser.add_argument('--group-size', type=int, default=128, help='int4 quantization group size')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    os.environ['AI_INT4_GROUP_SIZE'] = str(args.group_size)
+
+    if args.worker:
+        print(json.dumps(measure(args.model, args.worker, args.new_tokens, args.threads)))
+        return
+
+    model_path = args.model or build_tiny_model(
+        num_hidden_layers=args.layers,
+        hidden_size=args.hidden_size,
+        intermediate_size=args.hidden_size * 2,
+        num_attention_heads=8,
+        num_key_value_heads=4
+    )
+
+    print("🚀 LoopFund Quantized Backend Benchmark")
+    print(f"   model={model_path} new_tokens={args.new_tokens} threads={args.threads} int4_group={args.group_size}")
+    print("=" * 60)
+
+    results = {}
+    for backend in args.backends.split(','):
+        command = [
+            sys.executable, os.path.abspath(__file__), '--worker', backend, '--model', model_path,
+            '--new-tokens', str(args.new_tokens), '--threads', str(args.threads), '--group-size', str(args.group_size)
+        ]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results[backend] = json.loads(output.strip().splitlines()[-1])
+
+    reference = results.get('fp32') or next(iter(results.values()))
+    print(f"{'backend':8s} {'load s':>7s} {'steady MB':>9s} {'peak MB':>8s} {'model MB':>9s} {'tok/s':>8s} {'top-1':>7s} {'greedy':>7s}")
+    for backend, result in results.items():
+        print(
+            f"{backend:8s} {result['load_seconds']:7.2f} {result['rss_mb']:9.1f} {result['peak_rss_mb']:8.1f} "
+            f"{result['model_mb']:9.1f} {result['tokens_per_second']:8.1f} "
+            f"{agreement(reference['top1'], result['top1']):7.1%} {agreement(reference['greedy'], result['greedy']):7.1%}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+LoopFund Scenario Grid Benchmark
+Compare building a what-if grid of savings plans the old way (one
+get_savings_plan call per goal amount x timeline, each rendering its text)
+with one get_savings_plan_grid call returning arrays, including JSON
+serialization and response size.
+
+Usage: python benchmarks/bench_scenario_grid.py [--sizes 10x10,20x24,50x50] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.financial_advisor import FinancialAdvisor
+
+def best_of(repeat, func):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10x10,20x24,50x50', help='Comma-separated goals x timelines')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # Without the response cache every scalar call renders its plan, as a fresh slider position would
+    advisor = FinancialAdvisor(response_cache=False, semantic_cache=False)
+    income, expenses = 4000.0, 3000.0
+
+    print("🚀 LoopFund Scenario Grid Benchmark")
+    print("=" * 60)
+    print(f"{'grid':>8} {'cells':>6} {'scalar ms':>10} {'grid ms':>9} {'speedup':>8} {'scalar KB':>10} {'grid KB':>8}")
+
+    for size in args.sizes.split(','):
+        goals, timelines = (int(value) for value in size.split('x'))
+        goal_amounts = np.linspace(1000, 50000, goals).round(2).tolist()
+        timeline_months = np.linspace(3, 60, timelines).astype(int).tolist()
+
+        def scalar():
+            plans = [[advisor.get_savings_plan(goal, months, income, expenses) for months in timeline_months]
+                     for goal in goal_amounts]
+            return json.dumps({'plans': plans})
+
+        def grid():
+            return json.dumps(advisor.get_savings_plan_grid(goal_amounts, timeline_months, income, expenses))
+
+        scalar_seconds, scalar_body = best_of(args.repeat, scalar)
+        grid_seconds, grid_body = best_of(args.repeat, grid)
+        print(f"{size:>8} {goals * timelines:>6} {1000 * scalar_seconds:>10.2f} {1000 * grid_seconds:>9.2f} "
+              f"{scalar_seconds / grid_seconds:>7.1f}x {len(scalar_body) / 1024:>10.1f} {len(grid_body) / 1024:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+LoopFund Speculative Decoding Benchmark
+Train a small target model and a much smaller draft model (same tokenizer)
+on advisor-style prompts and answers, then compare plain greedy decoding of
+the target with assisted decoding through FinancialAdvisor(draft_model=...).
+Reports the draft acceptance rate, end-to-end latency and whether the
+greedy outputs are identical.
+
+Usage: python benchmarks/bench_speculative.py [--train-steps 300] [--new-tokens 64] [--runs 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.financial_advisor import FinancialAdvisor
+from benchmarks.tiny_model import SAMPLE_QUERIES, build_tiny_model
+
+ANSWERS = [
+    "Start with an emergency fund of 3-6 months of expenses, then follow the 50/30/20 rule: "
+    "50% needs, 30% wants, 20% savings. Pay yourself first and automate the transfer on payday.",
+    "Divide the goal by the number of months to get your monthly target, then cut one want each "
+    "month to fund it. Review your progress weekly and celebrate every milestone.",
+    "Compound interest rewards starting early: invest a fixed amount every month in a diversified "
+    "fund and keep your emergency fund in a high-yield savings account.",
+]
+
+def training_texts(advisor):
+    """Advisor prompts followed by plausible answers, the same corpus for target and draft"""
+    texts = []
+    for i, query in enumerate(SAMPLE_QUERIES):
+        for j, answer in enumerate(ANSWERS):
+            texts.append(advisor._build_context_prompt(query, None) + " " + ANSWERS[(i + j) % len(ANSWERS)])
+    return texts
+
+def train(path, texts, steps, learning_rate=2e-3, seed=0):
+    """Fit a tiny model to the corpus so target and draft end up predicting alike"""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    torch.manual_seed(seed)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    model = AutoModelForCausalLM.from_pretrained(path)
+    model.train()
+    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+    encoded = [tokenizer(text, return_tensors='pt').input_ids for text in texts]
+    for step in range(steps):
+        input_ids = encoded[step % len(encoded)]
+        loss = model(input_ids, labels=input_ids).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+    model.eval()
+    model.save_pretrained(path)
+    return float(loss)
+
+def time_advice(advisor, queries):
+    latencies, answers = [], []
+    for query in queries:
+        start = time.perf_counter()
+        answers.append(advisor.getAdvice(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies), answers
+
+def make_advisor(model_path, draft_path, new_tokens):
+    advisor = FinancialAdvisor(
+        model_name=model_path, max_batch_size=1, prefix_cache=False, semantic_cache=False, draft_model=draft_path
+    )
+    advisor.generation_kwargs = {'max_new_tokens': new_tokens, 'min_new_tokens': new_tokens, 'do_sample': False}
+    advisor.load()
+    return advisor
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--train-steps', type=int, default=300)
+    parser.add_argument('--new-tokens', type=int, default=64)
+    parser.add_argument('--runs', type=int, default=8)
+    parser.add_argument('--target-layers', type=int, default=4)
+    parser.add_argument('--target-hidden', type=int, default=384)
+    parser.add_argument('--draft-layers', type=int, default=1)
+    parser.add_argument('--draft-hidden', type=int, default=128)
+    args = parser.parse_args()
+    os.environ.setdefault('AI_WEIGHT_CACHE', 'off')
+
+    target_path = build_tiny_model(
+        num_hidden_layers=args.target_layers, hidden_size=args.target_hidden,
+        intermediate_size=args.target_hidden * 2, num_attention_heads=6, num_key_value_heads=2
+    )
+    # Same tokenizer training corpus, so the draft gets an identical vocabulary
+    draft_path = build_tiny_model(
+        num_hidden_layers=args.draft_layers, hidden_size=args.draft_hidden,
+        intermediate_size=args.draft_hidden * 2, num_attention_heads=4, num_key_value_heads=2, seed=1
+    )
+
+    print("🚀 LoopFund Speculative Decoding Benchmark")
+    print(f"   target={args.target_layers}x{args.target_hidden} draft={args.draft_layers}x{args.draft_hidden} "
+          f"new_tokens={args.new_tokens} runs={args.runs}")
+    print("=" * 60)
+
+    texts = training_texts(FinancialAdvisor.__new__(FinancialAdvisor))
+    for label, path in (('target', target_path), ('draft', draft_path)):
+        start = time.perf_counter()
+        loss = train(path, texts, args.train_steps)
+        print(f"trained {label:6s}: loss {loss:.3f} in {time.perf_counter() - start:.1f} s")
+
+    queries = [SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)] for i in range(args.runs)]
+    baseline = make_advisor(target_path, None, args.new_tokens)
+    assisted = make_advisor(target_path, draft_path, args.new_tokens)
+    if not assisted.speculative:
+        print("❌ Draft model was rejected; see the warning above")
+        return
+
+    # Warm up both paths once
+    time_advice(baseline, queries[:1])
+    time_advice(assisted, queries[:1])
+    warmup = assisted.speculative.stats()
+
+    base_latency, base_answers = time_advice(baseline, queries)
+    spec_latency, spec_answers = time_advice(assisted, queries)
+    stats = assisted.speculative.stats()
+    proposed = stats['draft_forwards'] - warmup['draft_forwards']
+    accepted = stats['accepted_tokens'] - warmup['accepted_tokens']
+    target_passes = stats['target_forwards'] - warmup['target_forwards']
+    generated = stats['generated_tokens'] - warmup['generated_tokens']
+
+    print(f"target only : p50 {np.percentile(base_latency, 50):7.1f} ms  mean {base_latency.mean():7.1f} ms")
+    print(f"speculative : p50 {np.percentile(spec_latency, 50):7.1f} ms  mean {spec_latency.mean():7.1f} ms")
+    print(f"⚡ Latency speedup: {base_latency.mean() / spec_latency.mean():.2f}x")
+    print(f"🎯 Acceptance rate: {accepted / max(proposed, 1):.1%} ({accepted}/{proposed} draft tokens), "
+          f"{generated / max(target_passes, 1):.2f} tokens per target pass")
+    print(f"🔍 Greedy outputs identical: {sum(a == b for a, b in zip(base_answers, spec_answers))}/{len(queries)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+LoopFund Structured Result Benchmark
+Compare the advisor calculators' prose responses with their structured
+(format=structured) results: time per call for the calculator alone and
+for the HTTP endpoint, and response size on the wire. Every rendered
+structured result is checked against the prose it replaces.
+
+Usage: python benchmarks/bench_structured_results.py [--calls 20000] [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('AI_PRELOAD', 'false')
+
+import app as app_module
+from ai.advice_results import render_result
+from ai.financial_advisor import FinancialAdvisor
+
+EXPENSES = {'rent': 1500, 'food': 600, 'transport': 250, 'utilities': 180}
+
+CASES = {
+    'savings_plan': (
+        '/api/ai/savings-plan',
+        lambda i: {'goal_amount': 5000 + i, 'timeline_months': 10, 'monthly_income': 4000, 'monthly_expenses': 3000}
+    ),
+    'budget_analysis': (
+        '/api/ai/budget-analysis',
+        lambda i: {'income': 4000 + i, 'expenses': EXPENSES}
+    ),
+    'investment_guidance': (
+        '/api/ai/investment-advice',
+        lambda i: {'age': 20 + i % 50, 'investment_amount': 1000 + i}
+    )
+}
+
+def calculators(advisor):
+    """(prose, structured) callables per calculator, taking a varying integer"""
+    return {
+        'savings_plan': (
+            lambda i: advisor.get_savings_plan(5000 + i, 10, 4000, 3000),
+            lambda i: advisor.get_savings_plan_result(5000 + i, 10, 4000, 3000)
+        ),
+        'budget_analysis': (
+            lambda i: advisor.get_budget_advice(4000 + i, EXPENSES, []),
+            lambda i: advisor.get_budget_advice_result(4000 + i, EXPENSES)
+        ),
+        'investment_guidance': (
+            lambda i: advisor.get_investment_advice(20 + i % 50, 'moderate', 1000 + i),
+            lambda i: advisor.get_investment_advice_result(20 + i % 50, 1000 + i)
+        )
+    }
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return 1e6 * (time.perf_counter() - start) / calls
+
+def check_parity(advisor, samples=200):
+    mismatches = 0
+    for prose, structured in calculators(advisor).values():
+        mismatches += sum(render_result(structured(i)) != prose(i) for i in range(samples))
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000, help='Calls per calculator and mode')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint and mode')
+    args = parser.parse_args()
+
+    # Caching would hide the calculators themselves
+    advisor = FinancialAdvisor(response_cache=False, semantic_cache=False)
+    print("🚀 LoopFund Structured Result Benchmark")
+    print("=" * 60)
+    print(f"   rendered structured results differing from prose: {check_parity(advisor)}")
+
+    print(f"\n   {'calculator':<22} {'text µs':>9} {'struct µs':>10}")
+    for name, (prose, structured) in calculators(advisor).items():
+        print(f"   {name:<22} {per_call_us(prose, args.calls):9.2f} {per_call_us(structured, args.calls):10.2f}")
+
+    client = app_module.app.test_client()
+    print(f"\n   {'endpoint':<26} {'text µs':>9} {'struct µs':>10} {'text B':>8} {'struct B':>9}")
+    for endpoint, payload in CASES.values():
+        sizes, times = {}, {}
+        for mode in ('text', 'structured'):
+            extra = {'format': 'structured'} if mode == 'structured' else {}
+            start = time.perf_counter()
+            for i in range(args.requests):
+                response = client.post(endpoint, json={**payload(i), **extra})
+            times[mode] = 1e6 * (time.perf_counter() - start) / args.requests
+            sizes[mode] = len(response.data)
+        print(f"   {endpoint:<26} {times['text']:9.1f} {times['structured']:10.1f} "
+              f"{sizes['text']:8} {sizes['structured']:9}")
+
+if __name__ == "__main__":
+    main()
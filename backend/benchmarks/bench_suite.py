@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+LoopFund Benchmark Suite
+Reproducible microbenchmarks of the engine methods plus an in-process load
+generator for the Flask app (no server, no network), backed by the tiny
+stand-in model. Results are written as JSON (p50/p95/p99 latency and
+throughput per benchmark) so two runs can be compared to catch regressions.
+
+Usage: python benchmarks/bench_suite.py [--output run.json] [--baseline base.json] [--concurrency 8]
+       python benchmarks/bench_suite.py --compare base.json run.json [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Load the model explicitly, after the tiny one is configured, and let every question reach it
+os.environ['AI_PRELOAD'] = 'false'
+os.environ['AI_SEMANTIC_CACHE'] = 'false'
+
+from ai.behavioral_analyzer import BehavioralAnalyzer
+from ai.financial_advisor import FinancialAdvisor
+from ai.response_cache import ResponseCache
+from ai.savings_predictor import SavingsPredictor
+from benchmarks.tiny_model import SAMPLE_QUERIES, build_tiny_model
+
+PROFILE = {'income': 4000, 'age': 29, 'current_savings': 1200, 'goals': 'house', 'risk_tolerance': 'moderate'}
+SPENDING_TEXTS = [
+    "I keep ordering takeout and buying clothes online when I'm stressed",
+    "Rent and groceries take most of my paycheck, I rarely go out",
+    "I subscribe to too many streaming services and eat out on weekends",
+    "I save a little every month but impulse buys at the mall add up",
+]
+
+def latency_summary(seconds, elapsed):
+    """p50/p95/p99/mean/max in ms and calls per second for a list of per-call durations"""
+    ms = np.array(seconds) * 1000
+    return {
+        'count': len(ms),
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'mean_ms': round(float(ms.mean()), 4),
+        'max_ms': round(float(ms.max()), 4),
+        'throughput_per_s': round(len(ms) / elapsed, 2) if elapsed > 0 else None
+    }
+
+def time_calls(func, arguments, warmup):
+    """Time func(*args) once per entry of arguments, after warming up on the first few"""
+    for args in arguments[:warmup]:
+        func(*args)
+    durations = []
+    started = time.perf_counter()
+    for args in arguments:
+        call_started = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - call_started)
+    return latency_summary(durations, time.perf_counter() - started)
+
+def goal(rng):
+    income = rng.uniform(1500, 9000)
+    return {
+        'goal_amount': round(rng.choice([1000, 5000, 20000, 60000]) * rng.uniform(0.5, 1.5), 2),
+        'current_savings': round(rng.uniform(0, 3000), 2),
+        'monthly_income': round(income, 2),
+        'monthly_expenses': round(income * rng.uniform(0.5, 0.95), 2),
+        'monthly_savings': 0
+    }
+
+def history(rng, events):
+    return [
+        {'type': 'contribution', 'amount': round(rng.uniform(10, 300), 2)} if rng.random() < 0.8
+        else {'type': 'goal', 'status': rng.choice(['active', 'completed', 'paused'])}
+        for _ in range(events)
+    ]
+
+def run_microbenchmarks(calls, seed):
+    """Per-call latency of each engine method on seeded inputs; no model is needed for these"""
+    rng = random.Random(seed)
+    predictor = SavingsPredictor()
+    analyzer = BehavioralAnalyzer()
+    # response_cache=False measures the calculator itself rather than a cache lookup
+    advisor = FinancialAdvisor(response_cache=False, semantic_cache=False)
+    cached_advisor = FinancialAdvisor(response_cache=ResponseCache(), semantic_cache=False)
+
+    goals = [goal(rng) for _ in range(calls)]
+    plans = [
+        (g['goal_amount'], rng.randint(3, 48), g['monthly_income'], g['monthly_expenses'])
+        for g in goals
+    ]
+    analyses = [(rng.choice(SPENDING_TEXTS), history(rng, 50)) for _ in range(calls)]
+    prompts = [
+        (SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)], PROFILE if i % 2 else None)
+        for i in range(calls)
+    ]
+    responses = [
+        (advisor._build_context_prompt(query, profile) + " Save 20% of your income and automate it.",)
+        for query, profile in prompts
+    ]
+    warmup = min(100, calls)
+
+    return {
+        'SavingsPredictor.predictGoalCompletion': time_calls(predictor.predictGoalCompletion, [(g,) for g in goals], warmup),
+        'BehavioralAnalyzer.analyze': time_calls(analyzer.analyze, analyses, warmup),
+        'FinancialAdvisor.get_savings_plan': time_calls(advisor.get_savings_plan, plans, warmup),
+        'FinancialAdvisor.get_savings_plan[cached]': time_calls(cached_advisor.get_savings_plan, plans[:warmup] * (calls // warmup), warmup),
+        'FinancialAdvisor._build_context_prompt': time_calls(advisor._build_context_prompt, prompts, warmup),
+        'FinancialAdvisor._clean_response': time_calls(advisor._clean_response, responses, warmup),
+    }
+
+def load_scenarios(rng):
+    """name -> (method, path, payload factory taking the request index)"""
+    def savings_plan(i):
+        g = goal(rng)
+        return {'goal_amount': g['goal_amount'], 'timeline_months': rng.randint(3, 48),
+                'monthly_income': g['monthly_income'], 'monthly_expenses': g['monthly_expenses']}
+
+    return {
+        'quick_tips': ('GET', '/api/ai/quick-tips', lambda i: None),
+        'savings_plan': ('POST', '/api/ai/savings-plan', savings_plan),
+        'savings_prediction': ('POST', '/ai/savings-prediction', lambda i: {'userData': goal(rng)}),
+        'behavioral_analysis': ('POST', '/ai/behavioral-analysis',
+                                lambda i: {'userText': rng.choice(SPENDING_TEXTS), 'userHistory': history(rng, 50)}),
+        'advice': ('POST', '/api/ai/advice',
+                   lambda i: {'query': f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} (#{i})", 'user_profile': PROFILE}),
+        'chat': ('POST', '/api/ai/chat',
+                 lambda i: {'message': f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} (#{i})", 'history': [], 'user_context': {}}),
+    }
+
+def run_load(client, method, path, payloads, concurrency):
+    """Send every payload from `concurrency` threads; latency of each request and status counts"""
+    def one_request(payload):
+        started = time.perf_counter()
+        if method == 'GET':
+            response = client.get(path)
+        else:
+            response = client.post(path, json=payload)
+        return time.perf_counter() - started, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_request, payloads))
+    summary = latency_summary([latency for latency, _ in results], time.perf_counter() - started)
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    summary['statuses'] = dict(sorted(statuses.items()))
+    summary['concurrency'] = concurrency
+    return summary
+
+def run_load_tests(args):
+    """Drive the real Flask app in-process against the tiny model"""
+    import torch
+
+    torch.manual_seed(args.seed)
+    os.environ['AI_MODEL'] = args.model or build_tiny_model(seed=args.seed)
+    import app as app_module
+
+    advisor = app_module.advisor
+    if not advisor.load():
+        raise RuntimeError(f"Model failed to load: {advisor.status}")
+    # A fixed answer length keeps generation cost identical from run to run
+    advisor.generation_kwargs.update(max_new_tokens=args.max_new_tokens, min_new_tokens=args.max_new_tokens)
+
+    client = app_module.app.test_client()
+    rng = random.Random(args.seed)
+    results = {}
+    try:
+        for name, (method, path, payload) in load_scenarios(rng).items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            generation = name in ('advice', 'chat')
+            requests = args.generation_requests if generation else args.requests
+            run_load(client, method, path, [payload(-1 - i) for i in range(min(8, requests))], 1)
+            results[name] = run_load(client, method, path, [payload(i) for i in range(requests)], args.concurrency)
+    finally:
+        # Neither exists with AI_MAX_BATCH_SIZE=1 and no model workers
+        if advisor.scheduler is not None:
+            advisor.scheduler.shutdown()
+        if advisor.model_server is not None:
+            advisor.model_server.shutdown()
+    return results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(baseline, current, threshold):
+    """Print p50/p95/p99 changes per benchmark; returns the names whose p95 grew by more than threshold"""
+    regressions = []
+    print(f"{'benchmark':<52} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17}")
+    for section in ('micro', 'load'):
+        for name, result in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if not before:
+                print(f"{section + '/' + name:<52} (new)")
+                continue
+            cells = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                change = (result[key] - before[key]) / before[key] if before[key] else 0.0
+                cells.append(f"{result[key]:.4f} {change:+6.1%}")
+            regressed = before['p95_ms'] and (result['p95_ms'] - before['p95_ms']) / before['p95_ms'] > threshold
+            if regressed:
+                regressions.append(f"{section}/{name}")
+            print(f"{section + '/' + name:<52} {cells[0]:>17} {cells[1]:>17} {cells[2]:>17}{'  ❌' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare this run against an earlier results file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='Compare two results files without running')
+    parser.add_argument('--threshold', type=float, default=0.15, help='p95 growth that counts as a regression (0.15 = 15%%)')
+    parser.add_argument('--calls', type=int, default=5000, help='Calls per microbenchmark')
+    parser.add_argument('--requests', type=int, default=400, help='Requests per deterministic endpoint')
+    parser.add_argument('--generation-requests', type=int, default=32, help='Requests per generation endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--max-new-tokens', type=int, default=16)
+    parser.add_argument('--scenarios', nargs='*', help='Only run these load scenarios')
+    parser.add_argument('--skip-micro', action='store_true')
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--model', help='Model path or name (defaults to a freshly built tiny model)')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+    print("🚀 LoopFund Benchmark Suite")
+    print(f"   seed={args.seed} calls={args.calls} requests={args.requests}/{args.generation_requests} "
+          f"concurrency={args.concurrency} new tokens={args.max_new_tokens}")
+    print("=" * 60)
+
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'compare')}
+        }
+    }
+    if not args.skip_micro:
+        results['micro'] = run_microbenchmarks(args.calls, args.seed)
+    if not args.skip_load:
+        results['load'] = run_load_tests(args)
+
+    for section in ('micro', 'load'):
+        for name, result in results.get(section, {}).items():
+            print(f"   {section + '/' + name:<50} p50 {result['p50_ms']:9.4f} ms  p95 {result['p95_ms']:9.4f} ms  "
+                  f"p99 {result['p99_ms']:9.4f} ms  {result['throughput_per_s']:>10} /s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n❌ p95 regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No p95 regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+LoopFund Weight Cache Benchmark
+Compare a cold model load (from_pretrained deserialization) with a warm
+start from the memory-mapped weight cache, each in a fresh process, and
+check that the cached weights are identical. The warm start runs with
+HF_HUB_OFFLINE=1 to prove it needs no network.
+
+Usage: python benchmarks/bench_weight_cache.py [--model PATH] [--dtype fp32] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from benchmarks.tiny_model import build_tiny_model
+
+def measure(model_name, dtype_name):
+    """Runs in a child process: time one load and report resident memory"""
+    import accelerate  # noqa: F401
+    from transformers import AutoConfig
+    from transformers.models.auto.modeling_auto import MODEL_FOR_CAUSAL_LM_MAPPING
+    from ai.model_server import read_process_memory
+    from ai.weight_cache import load_model_and_tokenizer
+
+    # Import the architecture's modeling code up front: it is the same cost on both paths
+    MODEL_FOR_CAUSAL_LM_MAPPING[type(AutoConfig.from_pretrained(model_name))]
+
+    start = time.perf_counter()
+    model, _ = load_model_and_tokenizer(model_name, dtype_name, low_cpu_mem_usage=True)
+    load_seconds = time.perf_counter() - start
+
+    # Touch every weight once, as the first forward pass would
+    start = time.perf_counter()
+    checksum = sum(float(param.detach().float().sum()) for param in model.parameters())
+    touch_seconds = time.perf_counter() - start
+    return dict(read_process_memory(os.getpid()), load_seconds=load_seconds, touch_seconds=touch_seconds, checksum=checksum)
+
+def run_child(model_name, dtype_name, env):
+    command = [sys.executable, os.path.abspath(__file__), '--worker', '--model', model_name, '--dtype', dtype_name]
+    output = subprocess.run(command, capture_output=True, text=True, check=True, env=dict(os.environ, **env)).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help='Model path or name (defaults to a freshly built tiny model)')
+    parser.add_argument('--dtype', default='fp32', choices=['fp32', 'fp16', 'bf16'])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--layers', type=int, default=8)
+    parser.add_argument('--hidden-size', type=int, default=1024)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.model, args.dtype)))
+        return
+
+    model_name = args.model or build_tiny_model(
+        num_hidden_layers=args.layers,
+        hidden_size=args.hidden_size,
+        intermediate_size=args.hidden_size * 2
+    )
+    cache_dir = tempfile.mkdtemp(prefix='loopfund-weight-cache-')
+
+    print("🚀 LoopFund Weight Cache Benchmark")
+    print(f"   model={model_name} dtype={args.dtype} cache={cache_dir}")
+    print("=" * 60)
+
+    cold_env = {'AI_WEIGHT_CACHE': 'off', 'AI_WEIGHT_CACHE_DIR': cache_dir}
+    warm_env = {'AI_WEIGHT_CACHE': 'read', 'AI_WEIGHT_CACHE_DIR': cache_dir, 'HF_HUB_OFFLINE': '1', 'TRANSFORMERS_OFFLINE': '1'}
+
+    # Fill the cache once (what `python setup.py --warm-cache` does)
+    run_child(model_name, args.dtype, {'AI_WEIGHT_CACHE': 'auto', 'AI_WEIGHT_CACHE_DIR': cache_dir})
+
+    results = {}
+    for label, env in (('cold load', cold_env), ('weight cache', warm_env)):
+        runs = [run_child(model_name, args.dtype, env) for _ in range(args.runs)]
+        best = min(runs, key=lambda run: run['load_seconds'])
+        results[label] = best
+        print(
+            f"{label:13s}: load {best['load_seconds'] * 1000:8.1f} ms  first touch {best['touch_seconds'] * 1000:7.1f} ms  "
+            f"rss {best.get('rss_mb', 0):7.1f} MB  (best of {args.runs})"
+        )
+
+    cold, warm = results['cold load'], results['weight cache']
+    print(f"⚡ Load speedup: {cold['load_seconds'] / warm['load_seconds']:.1f}x")
+    print(f"🔍 Weights identical: {cold['checksum'] == warm['checksum']}")
+
+if __name__ == "__main__":
+    main()
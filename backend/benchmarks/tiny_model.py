@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tiny CPU-only stand-in for the advisor model
+Builds a randomly initialised Mistral-architecture model and a small BPE
+tokenizer on disk so benchmarks can run offline without downloading weights.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai.financial_advisor import FinancialAdvisor
+
+TINY_CONFIG = {
+    'hidden_size': 64,
+    'intermediate_size': 128,
+    'num_hidden_layers': 2,
+    'num_attention_heads': 4,
+    'num_key_value_heads': 2,
+    'max_position_embeddings': 2048,
+}
+
+SAMPLE_QUERIES = [
+    "How much should I save each month if my goal is $5,000 in 10 months?",
+    "Should I pay off my credit card before building an emergency fund?",
+    "What is a good savings rate for someone earning $4,000 a month?",
+    "How do I start investing with $1,000?",
+    "Is the 50/30/20 rule realistic on a small income?",
+    "How can I stop impulse shopping when I'm stressed?",
+    "How long will it take to save $20,000 for a house deposit?",
+    "What should I do with a $2,500 bonus?",
+]
+
+def _training_corpus():
+    """Text the tokenizer is trained on: the real prompts the advisor builds"""
+    advisor = FinancialAdvisor.__new__(FinancialAdvisor)
+    profile = {'income': 4000, 'age': 29, 'current_savings': 1200, 'goals': 'house', 'risk_tolerance': 'moderate'}
+    for query in SAMPLE_QUERIES:
+        yield advisor._build_context_prompt(query, profile)
+        yield advisor._build_context_prompt(query, None)
+
+def build_tiny_model(path=None, vocab_size=2000, seed=0, **config_overrides):
+    """Create a tiny model + tokenizer directory loadable by FinancialAdvisor(model_name=path)"""
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import MistralConfig, MistralForCausalLM, PreTrainedTokenizerFast
+
+    path = path or tempfile.mkdtemp(prefix='loopfund-tiny-')
+
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=['<unk>', '<s>', '</s>'],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    )
+    tokenizer.train_from_iterator(list(_training_corpus()), trainer=trainer)
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token='<unk>',
+        bos_token='<s>',
+        eos_token='</s>'
+    )
+    fast_tokenizer.save_pretrained(path)
+
+    settings = dict(TINY_CONFIG, **config_overrides)
+    config = MistralConfig(
+        vocab_size=len(fast_tokenizer),
+        bos_token_id=fast_tokenizer.bos_token_id,
+        eos_token_id=fast_tokenizer.eos_token_id,
+        **settings
+    )
+    torch.manual_seed(seed)
+    MistralForCausalLM(config).save_pretrained(path)
+    return path
+
+if __name__ == "__main__":
+    print(build_tiny_model(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,313 @@
+"""
+LoopFund AI Bridge
+The /ai/* contract the Node service calls through AI_BRIDGE_URL: financial
+advice, savings prediction and behavioral analysis, plus batch variants so
+many items can travel over one pooled keep-alive connection.
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, jsonify, request
+
+from ai.admission import AdmissionController
+from ai.advice_results import render_result
+from ai.behavioral_analyzer import BehavioralAnalyzer
+from ai.financial_advisor import STATUS_FAILED, STATUS_LOADING
+from ai.goal_recommender import DEFAULT_TOP_K, GOAL_TYPES
+from ai.savings_predictor import FORECAST_HORIZON_MONTHS, FORECAST_PATHS, SavingsPredictor
+
+# Upper bound on items accepted by a single batch request
+MAX_BATCH_ITEMS = 10000
+# Much lower bound for batches of model generations, which take seconds per item
+MAX_GENERATION_BATCH_ITEMS = 32
+
+# Limits on Monte Carlo forecast requests: paths per goal, months simulated, and paths per request
+MAX_FORECAST_PATHS = 100000
+MAX_FORECAST_HORIZON_MONTHS = 600
+MAX_FORECAST_TOTAL_PATHS = 10000000
+
+def iter_ndjson(stream):
+    """Yield one JSON object per non-blank line of a byte stream without buffering the body"""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def forecast_options(data, goals=1):
+    """paths/horizon_months/seed for a forecast request, as (options, error) with error a (payload, status) pair"""
+    try:
+        paths = int(data.get('paths') or FORECAST_PATHS)
+        horizon_months = int(data.get('horizonMonths') or FORECAST_HORIZON_MONTHS)
+        seed = None if data.get('seed') is None else int(data['seed'])
+    except (TypeError, ValueError):
+        return None, ({'success': False, 'error': 'paths, horizonMonths and seed must be integers'}, 400)
+    if not 0 < paths <= MAX_FORECAST_PATHS or not 0 < horizon_months <= MAX_FORECAST_HORIZON_MONTHS:
+        return None, ({
+            'success': False,
+            'error': f'paths must be 1-{MAX_FORECAST_PATHS} and horizonMonths 1-{MAX_FORECAST_HORIZON_MONTHS}'
+        }, 400)
+    if goals * paths > MAX_FORECAST_TOTAL_PATHS:
+        return None, ({'success': False, 'error': f'At most {MAX_FORECAST_TOTAL_PATHS} paths per request'}, 413)
+    return {'paths': paths, 'horizon_months': horizon_months, 'seed': seed}, None
+
+def advice_result_payload(advisor, item, render=False):
+    """Structured calculator result for one {"type", ...parameters} item (errors stay per item)"""
+    try:
+        kind = item.get('type')
+        if kind == 'savings_plan':
+            result = advisor.get_savings_plan_result(
+                float(item['goal_amount']), int(item['timeline_months']),
+                float(item['monthly_income']), float(item['monthly_expenses'])
+            )
+        elif kind == 'budget_analysis':
+            result = advisor.get_budget_advice_result(
+                float(item['income']), {name: float(amount) for name, amount in item['expenses'].items()}
+            )
+        elif kind == 'investment_guidance':
+            result = advisor.get_investment_advice_result(int(item['age']), float(item['investment_amount']))
+        else:
+            return {'success': False, 'error': "type must be savings_plan, budget_analysis or investment_guidance"}
+        payload = {'success': True, 'result': result}
+        if render:
+            payload['text'] = render_result(result)
+        return payload
+    except (AttributeError, KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+        return {'success': False, 'error': f'Invalid parameters: {e}'}
+
+def financial_advice_payload(advisor, data):
+    """Bridge response for one advice request, as (payload, status_code)"""
+    query = data.get('query', '')
+    if not query:
+        return {'success': False, 'error': 'Query is required'}, 400
+    if advisor.status in (STATUS_LOADING, STATUS_FAILED):
+        return {'success': False, 'error': 'AI service unavailable', 'model_status': advisor.status}, 503
+
+    result = advisor.generateAdvice(query, data.get('userProfile') or {}, budget_ms=data.get('latencyBudgetMs'))
+    return {
+        'success': True,
+        'data': result['advice'],
+        'degradation': result['degradation'],
+        'degradationReason': result['degradation_reason']
+    }, 200
+
+def create_bridge_blueprint(advisor, admission=None):
+    """Blueprint serving the Node bridge contract under /ai
+
+    Single-item calls share the app's interactive/deterministic lanes;
+    batch calls go through the batch lane so bulk analytics queue behind
+    their own limits.
+    """
+    admission = admission or AdmissionController()
+    bridge = Blueprint('bridge', __name__, url_prefix='/ai')
+    predictor = SavingsPredictor()
+    analyzer = BehavioralAnalyzer()
+
+    def batch_items(data, limit=MAX_BATCH_ITEMS):
+        items = data.get('items')
+        if not isinstance(items, list):
+            return None, (jsonify({'success': False, 'error': 'items must be a list'}), 400)
+        if len(items) > limit:
+            return None, (jsonify({'success': False, 'error': f'At most {limit} items per batch'}), 413)
+        return items, None
+
+    @bridge.route('/health', methods=['GET'])
+    def bridge_health():
+        """Bridge health check"""
+        return jsonify({
+            'status': 'healthy',
+            'services': {
+                'financial_advisor': advisor.status,
+                'savings_predictor': 'available',
+                'behavioral_analyzer': 'available'
+            }
+        })
+
+    @bridge.route('/financial-advice', methods=['POST'])
+    @admission.admitted('interactive')
+    def bridge_financial_advice():
+        """Financial advice for the Node tier"""
+        try:
+            payload, status = financial_advice_payload(advisor, request.json or {})
+            return jsonify(payload), status
+        except Exception as e:
+            print(f"Error in bridge advice endpoint: {e}")
+            return jsonify({'success': False, 'error': 'Internal server error'}), 500
+
+    @bridge.route('/financial-advice/batch', methods=['POST'])
+    @admission.admitted('batch')
+    def bridge_financial_advice_batch():
+        """Advice for several queries; submitted together so the batch scheduler can group them"""
+        items, error = batch_items(request.json or {}, MAX_GENERATION_BATCH_ITEMS)
+        if error:
+            return error
+        workers = max(1, min(len(items), advisor.max_batch_size))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda item: financial_advice_payload(advisor, item if isinstance(item, dict) else {})[0], items
+            ))
+        return jsonify({'success': True, 'results': results})
+
+    @bridge.route('/advice-results/batch', methods=['POST'])
+    @admission.admitted('batch')
+    def bridge_advice_results_batch():
+        """Structured savings plan, budget and investment results for many items
+
+        Each item is {"type": "savings_plan" | "budget_analysis" |
+        "investment_guidance", ...the endpoint's parameters}; results carry
+        typed fields and insight codes so the Node tier can localize them.
+        Set "render": true to also get the English text.
+        """
+        data = request.json or {}
+        items, error = batch_items(data)
+        if error:
+            return error
+        render = bool(data.get('render'))
+        return jsonify({'success': True, 'results': [advice_result_payload(advisor, item or {}, render) for item in items]})
+
+    @bridge.route('/goal-recommendations', methods=['POST'])
+    @admission.admitted('deterministic')
+    def bridge_goal_recommendations():
+        """Top-k goals for a user profile (age, income), from cohort statistics when an index is loaded
+
+        Recommendations for the whole user base are precomputed offline with
+        `python -m ai.goal_recommender score`; this serves users who are new
+        since the last run.
+        """
+        data = request.json or {}
+        try:
+            top_k = int(data.get('topK') or DEFAULT_TOP_K)
+        except (TypeError, ValueError):
+            top_k = 0
+        if not 0 < top_k <= len(GOAL_TYPES):
+            return jsonify({'success': False, 'error': f'topK must be an integer from 1 to {len(GOAL_TYPES)}'}), 400
+        return jsonify(advisor.recommendGoals(data.get('userProfile') or {}, top_k))
+
+    @bridge.route('/savings-prediction', methods=['POST'])
+    @admission.admitted('deterministic')
+    def bridge_savings_prediction():
+        """Goal completion prediction for one user"""
+        data = request.json or {}
+        return jsonify(predictor.predictGoalCompletion(data.get('userData') or {}))
+
+    @bridge.route('/savings-prediction/batch', methods=['POST'])
+    @admission.admitted('batch')
+    def bridge_savings_prediction_batch():
+        """Predictions for many goals
+
+        Send {"items": [userData, ...]} for per-goal results in the single
+        prediction format, or {"columns": {"goal_amount": [...], ...}} for the
+        vectorized path, which answers with columns of the same length.
+        """
+        data = request.json or {}
+        columns = data.get('columns')
+        if isinstance(columns, dict):
+            if any(isinstance(values, list) and len(values) > MAX_BATCH_ITEMS for values in columns.values()):
+                return jsonify({'success': False, 'error': f'At most {MAX_BATCH_ITEMS} values per column'}), 413
+            try:
+                result = predictor.predictGoalCompletionBatch(columns)
+            except (TypeError, ValueError) as e:
+                return jsonify({'success': False, 'error': f'Invalid columns: {e}'}), 400
+            result['expected_completion_date'] = result['expected_completion_date'].astype(str)
+            return jsonify({'success': True, 'columns': {name: values.tolist() for name, values in result.items()}})
+
+        items, error = batch_items(data)
+        if error:
+            return error
+        return jsonify({'success': True, 'results': [predictor.predictGoalCompletion(item or {}) for item in items]})
+
+    @bridge.route('/savings-forecast', methods=['POST'])
+    @admission.admitted('deterministic')
+    def bridge_savings_forecast():
+        """Monte Carlo completion forecast (P10/P50/P90 dates) for one goal
+
+        userData carries the goal fields plus its contributions; paths,
+        horizonMonths and seed are optional.
+        """
+        data = request.json or {}
+        options, error = forecast_options(data)
+        if error:
+            return jsonify(error[0]), error[1]
+        return jsonify(predictor.forecastGoalCompletion(data.get('userData') or {}, **options))
+
+    @bridge.route('/savings-forecast/batch', methods=['POST'])
+    @admission.admitted('batch')
+    def bridge_savings_forecast_batch():
+        """Forecasts for many goals, simulated together in one vectorized batch"""
+        data = request.json or {}
+        items, error = batch_items(data)
+        if error:
+            return error
+        options, error = forecast_options(data, len(items))
+        if error:
+            return jsonify(error[0]), error[1]
+        try:
+            results = predictor.forecastGoalCompletions([item or {} for item in items], **options)
+        except (AttributeError, TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': f'Invalid items: {e}'}), 400
+        return jsonify({'success': True, 'results': results})
+
+    @bridge.route('/behavioral-analysis', methods=['POST'])
+    @admission.admitted('deterministic')
+    def bridge_behavioral_analysis():
+        """Behavioral analysis of a user's text and history
+
+        Large histories can be streamed as application/x-ndjson, one event per
+        line, with the text in the userText query parameter; events are
+        analyzed as they arrive instead of being loaded as one JSON array.
+        """
+        if request.mimetype == 'application/x-ndjson':
+            return jsonify(analyzer.analyze(request.args.get('userText', ''), iter_ndjson(request.stream)))
+
+        data = request.json or {}
+        return jsonify(analyzer.analyze(data.get('userText', ''), data.get('userHistory') or []))
+
+    @bridge.route('/behavioral-analysis/incremental', methods=['POST'])
+    @admission.admitted('deterministic')
+    def bridge_behavioral_analysis_incremental():
+        """Behavioral analysis from the user's stored state plus only the events since the last call
+
+        Send {"userId", "userText", "events": [...]}, or stream the events as
+        application/x-ndjson with userId and userText in the query string.
+        """
+        if request.mimetype == 'application/x-ndjson':
+            user_id, user_text, events = request.args.get('userId'), request.args.get('userText', ''), iter_ndjson(request.stream)
+        else:
+            data = request.json or {}
+            user_id, user_text, events = data.get('userId'), data.get('userText', ''), data.get('events') or []
+
+        if not user_id:
+            return jsonify({'success': False, 'error': 'userId is required'}), 400
+        return jsonify(analyzer.analyzeIncremental(str(user_id), user_text, events))
+
+    @bridge.route('/behavioral-state/<user_id>', methods=['GET', 'PUT'])
+    @admission.admitted('deterministic')
+    def bridge_behavioral_state(user_id):
+        """Snapshot (GET) or restore (PUT) a user's aggregate behavior state"""
+        if request.method == 'GET':
+            return jsonify({'success': True, 'state': analyzer.snapshotState(user_id)})
+
+        snapshot = dict(request.json or {}, user_id=user_id)
+        try:
+            analyzer.restoreState(snapshot)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': f'Invalid state: {e}'}), 400
+        return jsonify({'success': True, 'state': analyzer.snapshotState(user_id)})
+
+    @bridge.route('/behavioral-analysis/batch', methods=['POST'])
+    @admission.admitted('batch')
+    def bridge_behavioral_analysis_batch():
+        """Behavioral analysis for many users"""
+        items, error = batch_items(request.json or {})
+        if error:
+            return error
+        return jsonify({
+            'success': True,
+            'results': [
+                analyzer.analyze(item.get('userText', ''), item.get('userHistory') or []) if isinstance(item, dict)
+                else {'success': False, 'error': 'Each item must be an object'}
+                for item in items
+            ]
+        })
+
+    return bridge
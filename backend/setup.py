@@ -4,6 +4,7 @@ LoopFund AI Setup Script
 This script helps you set up the AI Financial Advisor backend
 """
 
+import argparse
 import subprocess
 import sys
 import os
@@ -78,8 +79,42 @@ CORS_ORIGINS=http://localhost:3000,http://localhost:3001
         print(f"❌ Failed to create environment file: {e}")
         return False
 
+def warm_weight_cache(model_name, backend, cache_dir=None):
+    """Store the model in the local memory-mapped weight cache so restarts load offline in seconds"""
+    print(f"\n💾 Warming weight cache for {model_name}...")
+    try:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from ai.inference_backend import QUANTIZED_BACKENDS, resolve_backend
+        from ai.weight_cache import warm_cache
+
+        # Quantized backends are built from the bf16 checkpoint at load time
+        backend = resolve_backend(backend)
+        dtype_name = 'bf16' if backend in QUANTIZED_BACKENDS else backend
+        directory = warm_cache(model_name, dtype_name, cache_dir)
+        print(f"✅ Weights cached in {directory}")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to warm weight cache: {e}")
+        return False
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LoopFund AI backend setup")
+    parser.add_argument('--warm-cache', action='store_true',
+                        help="only download the model and store it in the local weight cache")
+    parser.add_argument('--model', default=os.getenv('AI_MODEL', 'mistralai/Mistral-7B-Instruct'),
+                        help="model to cache (default: AI_MODEL)")
+    parser.add_argument('--backend', default=os.getenv('AI_BACKEND', 'auto'),
+                        help="inference backend the cache is for (default: AI_BACKEND)")
+    parser.add_argument('--cache-dir', default=os.getenv('AI_WEIGHT_CACHE_DIR'),
+                        help="cache location (default: AI_WEIGHT_CACHE_DIR or ~/.cache/loopfund/weights)")
+    return parser.parse_args()
+
 def main():
     """Main setup function"""
+    args = parse_args()
+    if args.warm_cache:
+        sys.exit(0 if warm_weight_cache(args.model, args.backend, args.cache_dir) else 1)
+
     print("🚀 LoopFund AI Setup Script")
     print("=" * 40)
     
@@ -101,6 +136,9 @@ def main():
     # Create environment file
     create_env_file()
     
+    # Pre-download the model into the weight cache
+    warm_weight_cache(args.model, args.backend, args.cache_dir)
+    
     print("\n🎉 Setup completed successfully!")
     print("\n📋 Next steps:")
     print("1. Start the backend: python app.py")
@@ -109,8 +147,8 @@ def main():
     print("4. Integrate with your React frontend")
     
     print("\n⚠️ Important notes:")
-    print("- The first time you run the AI service, it will download the Mistral model (~14GB)")
-    print("- This may take several minutes depending on your internet connection")
+    print("- The Mistral model (~14GB) is downloaded once into the local weight cache")
+    print("- Later restarts memory-map the cached weights and work offline (re-run: python setup.py --warm-cache)")
     print("- Make sure you have enough disk space and RAM (8GB+ recommended)")
     
     print("\n🔗 Useful endpoints:")
@@ -1,12 +1,19 @@
 from transformers import pipeline
 import json
+import os
+import sys
+
+# Share the backend's memory-mapped weight cache (backend/ai/weight_cache.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from ai.weight_cache import load_model_and_tokenizer
 
 class FinancialAdvisor:
     def __init__(self):
         # Use a smaller, faster model for testing
         try:
             # Try to use a smaller model first
-            self.model = pipeline("text-generation", model="distilgpt2", max_length=100)
+            model, tokenizer = load_model_and_tokenizer("distilgpt2", "fp32")
+            self.model = pipeline("text-generation", model=model, tokenizer=tokenizer, max_length=100)
             print("✅ Using DistilGPT-2 (faster, smaller model)")
         except Exception as e:
             print(f"⚠️ Could not load AI model: {e}")
@@ -1,12 +1,65 @@
 // AI Service with Mock Data for Demo (No Python Required)
-const AI_BRIDGE_URL = process.env.AI_BRIDGE_URL || 'http://localhost:5001';
+const AI_BRIDGE_URL = process.env.AI_BRIDGE_URL || 'http://localhost:5000';
 const fetch = require('node-fetch');
+const http = require('http');
+const https = require('https');
+
+// Pooled keep-alive connections to the Python AI service (serve it with asgi.py)
+const AI_BRIDGE_MAX_SOCKETS = parseInt(process.env.AI_BRIDGE_MAX_SOCKETS || '4', 10);
+const bridgeAgents = {
+  'http:': new http.Agent({ keepAlive: true, maxSockets: AI_BRIDGE_MAX_SOCKETS }),
+  'https:': new https.Agent({ keepAlive: true, maxSockets: AI_BRIDGE_MAX_SOCKETS })
+};
 
 class AIService {
   constructor() {
     console.log('✅ AI Service initialized - using Mock Data for Demo');
   }
 
+  // Call the Python AI bridge (/ai/*) over a pooled keep-alive connection
+  async callBridge(path, payload) {
+    const url = new URL(path, AI_BRIDGE_URL);
+    const response = await fetch(url.toString(), {
+      method: payload === undefined ? 'GET' : 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: payload === undefined ? undefined : JSON.stringify(payload),
+      agent: bridgeAgents[url.protocol]
+    });
+    if (!response.ok) {
+      throw new Error(`AI bridge ${path} failed with status ${response.status}`);
+    }
+    return response.json();
+  }
+
+  // Predict completion for many goals in one bridge request
+  async predictSavingsBatch(goals) {
+    const result = await this.callBridge('/ai/savings-prediction/batch', { items: goals });
+    return result.results;
+  }
+
+  // Monte Carlo P10/P50/P90 completion dates for many goals (each with its contributions)
+  async forecastSavingsBatch(goals, options = {}) {
+    const result = await this.callBridge('/ai/savings-forecast/batch', { items: goals, ...options });
+    return result.results;
+  }
+
+  // Structured savings plan / budget / investment results (typed fields and insight codes to localize)
+  async getAdviceResultsBatch(items, render = false) {
+    const result = await this.callBridge('/ai/advice-results/batch', { items, render });
+    return result.results;
+  }
+
+  // Cohort-based goal recommendations for one user (bulk scores come from the offline batch file)
+  async recommendGoals(userProfile, topK = 3) {
+    return this.callBridge('/ai/goal-recommendations', { userProfile, topK });
+  }
+
+  // Behavioral analysis for many users in one bridge request
+  async analyzeBehaviorBatch(items) {
+    const result = await this.callBridge('/ai/behavioral-analysis/batch', { items });
+    return result.results;
+  }
+
   // Mock data for revolutionary features
   getMockData() {
     return {
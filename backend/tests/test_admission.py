@@ -0,0 +1,49 @@
+import asyncio
+
+from ai.admission import Lane
+
+def test_cancelled_waiter_leaves_the_queue():
+    """A queued coroutine that is cancelled must not take the next released slot with it"""
+    lane = Lane('test', max_concurrent=1, max_queue=4, deadline_ms=5000)
+
+    async def scenario():
+        ticket = await lane.acquire_async()
+        waiter = asyncio.ensure_future(lane.acquire_async())
+        await asyncio.sleep(0.01)
+        assert lane.stats()['queue_depth'] == 1
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert lane.stats()['queue_depth'] == 0
+
+        ticket.release()
+        assert lane.stats()['in_flight'] == 0
+        # The slot is free again for the next request
+        second = await asyncio.wait_for(lane.acquire_async(), 1)
+        second.release()
+
+    asyncio.run(scenario())
+    assert lane.stats()['in_flight'] == 0
+
+def test_cancelled_waiter_passes_on_a_handed_slot():
+    """A waiter cancelled after its slot was handed over gives the slot to the next in line"""
+    lane = Lane('test', max_concurrent=1, max_queue=4, deadline_ms=5000)
+
+    async def scenario():
+        ticket = await lane.acquire_async()
+        first = asyncio.ensure_future(lane.acquire_async())
+        second = asyncio.ensure_future(lane.acquire_async())
+        await asyncio.sleep(0.01)
+
+        # Release and cancel before the first waiter's coroutine gets to run again
+        ticket.release()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        handed = await asyncio.wait_for(second, 1)
+        assert lane.stats()['in_flight'] == 1
+        handed.release()
+
+    asyncio.run(scenario())
+    assert lane.stats()['in_flight'] == 0
+    assert lane.stats()['queue_depth'] == 0
@@ -0,0 +1,52 @@
+import threading
+import time
+
+import pytest
+
+from ai.behavior_state import BehaviorState, InMemoryStateStore, SQLiteStateStore, parse_timestamp, read_events
+
+def slow_upload(events, delay):
+    for event in events:
+        time.sleep(delay)
+        yield event
+
+@pytest.mark.parametrize('make_store', [InMemoryStateStore, lambda: SQLiteStateStore(None)], ids=['memory', 'sqlite'])
+def test_slow_stream_does_not_block_other_users(make_store, tmp_path, monkeypatch):
+    """Events are read before the lock/transaction, so other users' updates go straight through"""
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    store = make_store()
+    upload = threading.Thread(target=store.update, args=('slow', slow_upload([{'type': 'contribution'}] * 3, 0.2)))
+    upload.start()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    store.update('fast', [{'type': 'contribution'}])
+    assert time.monotonic() - start < 0.2
+    upload.join()
+    assert store.load('slow').contributions == 3
+
+def test_read_events_caps_the_delta():
+    assert read_events(iter([{}] * 2), limit=2) == [{}, {}]
+    with pytest.raises(ValueError):
+        read_events(iter([{}] * 3), limit=2)
+
+def test_status_changes_move_goals_between_tallies():
+    state = BehaviorState('u')
+    state.apply([{'type': 'goal', 'goalId': 1, 'status': 'active'}, {'type': 'goal', 'goalId': 2, 'status': 'active'}])
+    state.apply([{'type': 'goal', 'goalId': 1, 'status': 'completed'}, {'type': 'goal', 'status': 'active'}])
+    summary = state.summary()
+    assert (summary['goals'], summary['active_goals'], summary['completed_goals']) == (3, 2, 1)
+    assert BehaviorState.restore(state.snapshot()).summary() == summary
+
+def test_last_seen_orders_mixed_timestamp_formats():
+    """ISO strings with offsets or Z, epoch seconds and epoch milliseconds compare as instants"""
+    state = BehaviorState('u')
+    state.apply([
+        {'type': 'contribution', 'timestamp': '2024-05-01T12:00:00+02:00'},
+        {'type': 'contribution', 'timestamp': 1714557600},
+        {'type': 'contribution', 'timestamp': '2024-05-01T09:30:00Z'},
+        {'type': 'contribution', 'createdAt': 1714550400000}
+    ])
+    # 1714557600 is 2024-05-01T10:00:00Z, the latest of the four
+    assert state.last_seen['contribution'] == '2024-05-01T10:00:00+00:00'
+    assert parse_timestamp('not a date') is None
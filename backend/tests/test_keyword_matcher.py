@@ -0,0 +1,22 @@
+import pytest
+
+from ai.behavioral_analyzer import SPENDING_MATCHER
+from benchmarks.bench_keyword_matcher import legacy_counts
+
+@pytest.mark.parametrize('text', [
+    'planning', 'planned', 'plans', 'cutting', 'cuts', 'shopping', 'spending', 'spends',
+    'saving', 'savings', 'saved', 'budgeting', 'budgeted', 'tracked', 'tracking', 'purchases',
+    'purchased', 'expenses', 'costs', 'prices', 'priced', 'reduced', 'reducing', 'limited',
+    'limiting', 'stressed', 'treated', 'treating', 'impulses'
+])
+def test_inflected_keywords_match_like_the_substring_scan(text):
+    """Every inflection the original substring scan caught still counts in its categories
+
+    The matcher may find more ("saving" does not contain "save"), never less.
+    """
+    counts = SPENDING_MATCHER.count(text, distinct=True)
+    assert all(counts[name] >= found for name, found in legacy_counts(text).items())
+    assert any(counts.values())
+
+def test_keywords_inside_other_words_do_not_match():
+    assert SPENDING_MATCHER.count('unsaved cutlery planet overspend', distinct=True) == dict.fromkeys(SPENDING_MATCHER.categories, 0)
@@ -0,0 +1,41 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+transformers = pytest.importorskip('transformers')
+
+from ai.financial_advisor import FinancialAdvisor
+from ai.prefix_cache import PrefixKVCache
+from benchmarks.tiny_model import SAMPLE_QUERIES, build_tiny_model
+
+@pytest.fixture(scope='module')
+def tiny(tmp_path_factory):
+    path = build_tiny_model(str(tmp_path_factory.mktemp('tiny')))
+    tokenizer = transformers.AutoTokenizer.from_pretrained(path)
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = 'left'
+    return transformers.AutoModelForCausalLM.from_pretrained(path).eval(), tokenizer
+
+def test_prefix_reuse_matches_the_full_prompt(tiny):
+    """Batched prompts of different lengths decode exactly as they do without the cached prefix"""
+    model, tokenizer = tiny
+    advisor = FinancialAdvisor.__new__(FinancialAdvisor)
+    cache = PrefixKVCache(model, tokenizer, advisor._build_prompt_prefix())
+    prompts = [
+        advisor._build_context_prompt(query, {'income': 4000, 'age': 29} if i % 2 else None)
+        for i, query in enumerate(SAMPLE_QUERIES[:4])
+    ]
+    generation_kwargs = {'max_new_tokens': 8, 'do_sample': False, 'pad_token_id': tokenizer.pad_token_id}
+
+    inputs = cache.build_inputs(prompts)
+    assert inputs is not None
+    reused = cache.generate(inputs, **generation_kwargs)
+
+    encoded = tokenizer(prompts, return_tensors='pt', padding=True, return_token_type_ids=False)
+    with torch.no_grad():
+        outputs = model.generate(**encoded, **generation_kwargs)
+    assert reused == tokenizer.batch_decode(outputs[:, encoded.input_ids.shape[1]:], skip_special_tokens=True)
+
+def test_prompts_outside_the_prefix_fall_back(tiny):
+    model, tokenizer = tiny
+    cache = PrefixKVCache(model, tokenizer, FinancialAdvisor.__new__(FinancialAdvisor)._build_prompt_prefix())
+    assert cache.build_inputs(['Not the advisor prompt']) is None
@@ -0,0 +1,29 @@
+from ai.financial_advisor import FinancialAdvisor
+from ai.response_cache import ResponseCache
+
+def make_advisor():
+    return FinancialAdvisor(response_cache=ResponseCache(), semantic_cache=False)
+
+def test_equal_numbers_share_an_entry():
+    advisor = make_advisor()
+    plans = [
+        advisor.get_savings_plan(5000, 10, 4000, 3000),
+        advisor.get_savings_plan(5000.0, 10, 4000.0, 3000),
+        advisor.get_savings_plan('5000', '10', '4000', '3000')
+    ]
+    assert plans[0] == plans[1] == plans[2]
+    assert advisor.response_cache.stats()['size'] == 1
+
+def test_unused_arguments_are_not_keyed():
+    advisor = make_advisor()
+    advisor.get_investment_advice(30, 'moderate', 1000)
+    advisor.get_investment_advice(30, 'aggressive', 1000)
+    advisor.get_budget_advice(4000, {'rent': 1500}, [])
+    advisor.get_budget_advice(4000, {'rent': 1500}, [{'name': 'car'}])
+    assert advisor.response_cache.stats()['hits'] == 2
+
+def test_hits_hand_out_copies():
+    advisor = make_advisor()
+    advisor.recommendGoals({'age': 30, 'income': 50000})['recommendations'].clear()
+    assert advisor.recommendGoals({'age': 30, 'income': 50000})['recommendations']
+    assert advisor.response_cache.stats()['hits'] == 1
@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from ai.advice_results import render_savings_plan
+from ai.scenario_grid import investment_grid, render_savings_plan_cells, savings_plan_grid
+
+def test_integer_axes_reject_fractions():
+    with pytest.raises(ValueError):
+        savings_plan_grid([5000], [25.9], 4000, 3000)
+    with pytest.raises(ValueError):
+        investment_grid([1.7], [1000], [10])
+    assert savings_plan_grid([5000], [12.0], 4000, 3000)['timeline_months'].tolist() == [12]
+
+def test_rendered_cells_match_the_scalar_text():
+    grid = savings_plan_grid([5000, 1234.5], [10, 2], 4000, 3000)
+    cells = [(0, 0), (0, 1), (1, 0)]
+    assert render_savings_plan_cells(grid, cells) == [
+        render_savings_plan(5000, 10, 4000, 3000),
+        render_savings_plan(5000, 2, 4000, 3000),
+        render_savings_plan(1234.5, 10, 4000, 3000)
+    ]
@@ -0,0 +1,39 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('accelerate')
+
+from ai import weight_cache
+from benchmarks.tiny_model import build_tiny_model
+
+@pytest.fixture
+def tiny(tmp_path, monkeypatch):
+    monkeypatch.setenv('AI_WEIGHT_CACHE_DIR', str(tmp_path / 'cache'))
+    return build_tiny_model(str(tmp_path / 'model'))
+
+def test_default_mode_does_not_fill_the_cache(tiny, monkeypatch):
+    monkeypatch.delenv('AI_WEIGHT_CACHE', raising=False)
+    weight_cache.load_model_and_tokenizer(tiny, 'fp32')
+    assert not weight_cache.is_cached(weight_cache.cache_dir_for(tiny, 'fp32'))
+
+def test_changed_source_rebuilds_the_entry(tiny, monkeypatch, capsys):
+    monkeypatch.setenv('AI_WEIGHT_CACHE', 'auto')
+    directory = weight_cache.cache_dir_for(tiny, 'fp32')
+    weight_cache.load_model_and_tokenizer(tiny, 'fp32')
+    weight_cache.load_model_and_tokenizer(tiny, 'fp32')
+    assert 'from weight cache' in capsys.readouterr().out
+
+    config_path = os.path.join(tiny, 'config.json')
+    with open(config_path) as f:
+        config = json.load(f)
+    config['bos_token_id'] = 0
+    with open(config_path, 'w') as f:
+        json.dump(config, f)
+    model, _ = weight_cache.load_model_and_tokenizer(tiny, 'fp32')
+    assert 'stale' in capsys.readouterr().out
+    assert model.config.bos_token_id == 0
+    assert weight_cache.is_current(directory, weight_cache.source_fingerprint(tiny))